@@ -0,0 +1,140 @@
+"""
+Write-behind recorder for converted page access times.
+Buffers last_accessed_at touches in memory and flushes them periodically as
+one bulk UPDATE, so cache reads do not turn into per-request writes.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import and_, bindparam
+
+from database import engine
+from models import ConvertedCanvasPage
+
+logger = logging.getLogger(__name__)
+
+
+class AccessTimeRecorder:
+    """
+    Buffers (course_id, page_slug) -> last access time and writes the buffer
+    out every flush interval, or sooner once it reaches the maximum size.
+    """
+
+    def __init__(self):
+        self.flush_interval = float(os.getenv("ACCESS_TIME_FLUSH_INTERVAL", "30"))
+        self.max_buffer_size = int(os.getenv("ACCESS_TIME_MAX_BUFFER", "500"))
+
+        self._pending: Dict[Tuple[int, str], datetime] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._early_flush: Optional[asyncio.Task] = None
+
+        self.touches = 0
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.flush_errors = 0
+
+        table = ConvertedCanvasPage.__table__
+        self._update_statement = table.update().where(
+            and_(
+                table.c.course_id == bindparam("b_course_id"),
+                table.c.page_slug == bindparam("b_page_slug")
+            )
+        ).values(last_accessed_at=bindparam("b_accessed_at"))
+
+    def touch(self, course_id: int, page_slug: str) -> datetime:
+        """
+        Record an access to a converted page.
+
+        Args:
+            course_id: Canvas course ID
+            page_slug: Canvas page slug
+
+        Returns:
+            The recorded access time
+        """
+        accessed_at = datetime.now()
+        self._pending[(course_id, page_slug)] = accessed_at
+        self.touches += 1
+
+        if len(self._pending) >= self.max_buffer_size and (self._early_flush is None or self._early_flush.done()):
+            self._early_flush = asyncio.get_running_loop().create_task(self.flush())
+
+        return accessed_at
+
+    async def flush(self) -> int:
+        """
+        Write all buffered access times in a single executemany UPDATE.
+
+        Returns:
+            Number of rows written
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            pending, self._pending = self._pending, {}
+            rows = [
+                {"b_course_id": course_id, "b_page_slug": page_slug, "b_accessed_at": accessed_at}
+                for (course_id, page_slug), accessed_at in pending.items()
+            ]
+
+            try:
+                async with engine.begin() as conn:
+                    await conn.execute(self._update_statement, rows)
+            except Exception as e:
+                # Keep the touches for the next flush unless newer ones arrived
+                for key, accessed_at in pending.items():
+                    self._pending.setdefault(key, accessed_at)
+                self.flush_errors += 1
+                logger.error(f"Failed to flush {len(rows)} page access times: {e}")
+                return 0
+
+            self.flushes += 1
+            self.rows_flushed += len(rows)
+            logger.info(f"Flushed {len(rows)} page access times")
+            return len(rows)
+
+    async def _run(self):
+        """Flush the buffer every flush interval until cancelled."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self):
+        """Start the periodic flush task."""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._run())
+            logger.info(f"Access time recorder started (interval: {self.flush_interval}s, max buffer: {self.max_buffer_size})")
+
+    async def stop(self):
+        """Stop the periodic flush task and write out any pending touches."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get buffer and flush counters."""
+        return {
+            "pending": len(self._pending),
+            "touches": self.touches,
+            "flushes": self.flushes,
+            "rows_flushed": self.rows_flushed,
+            "flush_errors": self.flush_errors,
+            "flush_interval_seconds": self.flush_interval,
+            "max_buffer_size": self.max_buffer_size
+        }
+
+
+# Singleton instance for use throughout the application
+access_time_recorder = AccessTimeRecorder()
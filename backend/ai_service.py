@@ -1,15 +1,36 @@
 import os
 import json
+import hashlib
+import random
+import time
+import asyncio
 import logging
-from typing import Dict, Any, Optional
-from openai import OpenAI
+from typing import Dict, Any, AsyncIterator, Optional
+import openai
+from openai import AsyncOpenAI
 from dotenv import load_dotenv
 
+from html_chunker import CHUNKER_VERSION, split_html_into_chunks
+from html_component_parser import PARSER_VERSION, parse_html_to_components
+from html_text import html_to_text
+from json_stream import JSONArrayStreamParser
+
 # Load environment variables
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Plain text kept in fallback content when AI transformation fails
+FALLBACK_TEXT_MAX_CHARS = 2000
+
+# Errors worth retrying: timeouts, dropped connections, rate limits and 5xx
+RETRYABLE_ERRORS = (
+    asyncio.TimeoutError,
+    openai.APIConnectionError,  # includes APITimeoutError
+    openai.RateLimitError,
+    openai.InternalServerError
+)
+
 class AIService:
     """
     AI service for processing Canvas LMS data using Grok model via X.AI.
@@ -22,15 +43,257 @@ class AIService:
         if not self.xai_token:
             raise ValueError("XAI_TOKEN environment variable is required")
         
-        # Initialize OpenAI client with X.AI endpoint
-        self.client = OpenAI(
+        # Request executor settings: per-attempt timeout and retries with
+        # jittered exponential backoff
+        self.request_timeout = float(os.getenv("AI_REQUEST_TIMEOUT", "60"))
+        self.max_retries = int(os.getenv("AI_MAX_RETRIES", "3"))
+        self.retry_base_delay = float(os.getenv("AI_RETRY_BASE_DELAY", "0.5"))
+        self.retry_max_delay = float(os.getenv("AI_RETRY_MAX_DELAY", "8"))
+        self.request_stats = {"requests": 0, "retries": 0, "timeouts": 0, "failures": 0}
+        
+        # Initialize async OpenAI client with X.AI endpoint so LLM calls never
+        # block the event loop shared with every other request on the worker.
+        # Retries are handled by _create_chat_completion.
+        self.client = AsyncOpenAI(
             base_url="https://api.x.ai/v1",
             api_key=self.xai_token,
+            timeout=self.request_timeout,
+            max_retries=0,
         )
         
         self.model = "grok-3-mini"
         
-    def parse_announcement_to_json(self, html_content: str, target_json_structure: Optional[str] = None) -> Dict[str, Any]:
+        # Upper bound on concurrent in-flight LLM requests for this worker
+        self.max_concurrent_requests = int(os.getenv("AI_MAX_CONCURRENT_REQUESTS", "16"))
+        self._request_semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        
+        # Deterministic HTML-to-components parsing is used instead of the LLM
+        # when its confidence reaches this threshold
+        self.fast_path_enabled = os.getenv("AI_FAST_PATH_ENABLED", "true").lower() == "true"
+        self.fast_path_min_confidence = float(os.getenv("AI_FAST_PATH_MIN_CONFIDENCE", "0.8"))
+        self.conversion_stats = {
+            "fast_path": 0,
+            "llm": 0,
+            "low_confidence_fallbacks": 0,
+            "fast_path_ms": 0.0,
+            "llm_ms": 0.0,
+            "llm_input_chars_avoided": 0,
+            "llm_chunks": 0
+        }
+        
+        # Pages longer than this are split at headings/sections and the
+        # chunks converted concurrently
+        self.chunk_max_chars = int(os.getenv("AI_CHUNK_MAX_CHARS", "6000"))
+        
+        self._fingerprints: Dict[str, str] = {}
+        
+    async def _create_chat_completion(self, **kwargs):
+        """
+        Create a chat completion with a timeout, retries and the concurrency limit.
+        
+        Each attempt holds a request slot and is bounded by AI_REQUEST_TIMEOUT.
+        Timeouts, connection errors, rate limits and server errors are retried
+        up to AI_MAX_RETRIES times with full-jitter exponential backoff (or the
+        server's Retry-After, giving up if that exceeds AI_RETRY_MAX_DELAY);
+        the slot is released while backing off.
+        
+        Args:
+            **kwargs: Arguments forwarded to chat.completions.create
+            
+        Returns:
+            Chat completion response from the LLM
+            
+        Raises:
+            Exception: The last error once retries are exhausted, or any
+                non-retryable API error
+        """
+        attempt = 0
+        while True:
+            self.request_stats["requests"] += 1
+            try:
+                async with self._request_semaphore:
+                    return await asyncio.wait_for(
+                        self.client.chat.completions.create(**kwargs),
+                        timeout=self.request_timeout
+                    )
+            except RETRYABLE_ERRORS as e:
+                await self._back_off_or_raise(attempt, e)
+                attempt += 1
+            except Exception:
+                self.request_stats["failures"] += 1
+                raise
+    
+    async def _back_off_or_raise(self, attempt: int, error: Exception):
+        """
+        Record a failed attempt and wait before the next one.
+        
+        Args:
+            attempt: Number of retries made so far
+            error: The retryable error the attempt failed with
+            
+        Raises:
+            Exception: The error itself once retries are exhausted, or when
+                the server's Retry-After exceeds AI_RETRY_MAX_DELAY
+        """
+        if isinstance(error, (asyncio.TimeoutError, openai.APITimeoutError)):
+            self.request_stats["timeouts"] += 1
+        
+        delay = self._get_retry_delay(attempt, error)
+        if attempt >= self.max_retries or delay is None:
+            self.request_stats["failures"] += 1
+            logger.error(f"LLM request failed after {attempt + 1} attempts: {error!r}")
+            raise error
+        
+        self.request_stats["retries"] += 1
+        logger.warning(f"LLM request failed ({error!r}), retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+        await asyncio.sleep(delay)
+    
+    def _get_retry_delay(self, attempt: int, error: Exception) -> Optional[float]:
+        """
+        Full-jitter exponential backoff, honouring a Retry-After header if present.
+        
+        Returns:
+            Seconds to wait, or None if the server asked for a longer wait
+            than AI_RETRY_MAX_DELAY and the request should not be retried
+        """
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                delay = max(float(retry_after), 0.0)
+            except ValueError:
+                delay = None
+            if delay is not None:
+                # Retrying sooner than the server allows would only be rejected again
+                return delay if delay <= self.retry_max_delay else None
+        
+        return random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * (2 ** attempt)))
+    
+    async def _make_api_call(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        json_mode: bool = True,
+        temperature: float = 0.1,
+        max_tokens: Optional[int] = 4000
+    ) -> str:
+        """
+        Run a system/user prompt through the request executor.
+        
+        Args:
+            system_prompt: System message
+            user_prompt: User message
+            json_mode: Ask the model for a JSON object response. Leave off when
+                the expected top-level value is not an object (e.g. an array).
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            
+        Returns:
+            Response content with any markdown code fence removed
+            
+        Raises:
+            Exception: If the request fails or the response is empty
+        """
+        request = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            "temperature": temperature
+        }
+        if max_tokens:
+            request["max_tokens"] = max_tokens
+        if json_mode:
+            request["response_format"] = {"type": "json_object"}
+        
+        completion = await self._create_chat_completion(**request)
+        content = (completion.choices[0].message.content or "").strip()
+        
+        if not content:
+            raise Exception("AI returned empty response")
+        
+        # Remove markdown code blocks if present
+        if content.startswith("```json"):
+            content = content[7:]
+        if content.startswith("```"):
+            content = content[3:]
+        if content.endswith("```"):
+            content = content[:-3]
+        
+        return content.strip()
+    
+    def get_request_stats(self) -> Dict[str, Any]:
+        """Get request executor counters and settings."""
+        return {
+            **self.request_stats,
+            "max_concurrent_requests": self.max_concurrent_requests,
+            "timeout_seconds": self.request_timeout,
+            "max_retries": self.max_retries
+        }
+    
+    async def _stream_chat_completion(self, **kwargs) -> AsyncIterator[str]:
+        """
+        Stream a chat completion's content deltas with the same timeout,
+        retries and concurrency limit as _create_chat_completion.
+        
+        Opening the stream and each wait for the next chunk are bounded by
+        AI_REQUEST_TIMEOUT, and the request slot is held until the stream
+        ends. Retryable errors are retried only until the first content has
+        been yielded; after that a retry would repeat output, so they are raised.
+        
+        Args:
+            **kwargs: Arguments forwarded to chat.completions.create
+            
+        Yields:
+            Pieces of the response content as they arrive
+            
+        Raises:
+            Exception: The last error once retries are exhausted, any
+                non-retryable API error, or any error after content was yielded
+        """
+        attempt = 0
+        while True:
+            self.request_stats["requests"] += 1
+            started = False
+            try:
+                async with self._request_semaphore:
+                    stream = await asyncio.wait_for(
+                        self.client.chat.completions.create(stream=True, **kwargs),
+                        timeout=self.request_timeout
+                    )
+                    chunks = stream.__aiter__()
+                    try:
+                        while True:
+                            try:
+                                chunk = await asyncio.wait_for(chunks.__anext__(), timeout=self.request_timeout)
+                            except StopAsyncIteration:
+                                return
+                            if chunk.choices and chunk.choices[0].delta.content:
+                                started = True
+                                yield chunk.choices[0].delta.content
+                    finally:
+                        # Release the HTTP connection if the stream was not read to the end
+                        response = getattr(stream, "response", None)
+                        if response is not None:
+                            await response.aclose()
+            except RETRYABLE_ERRORS as e:
+                if started:
+                    self.request_stats["failures"] += 1
+                    logger.error(f"LLM stream failed after output had been sent: {e!r}")
+                    raise
+                await self._back_off_or_raise(attempt, e)
+                attempt += 1
+            except Exception:
+                self.request_stats["failures"] += 1
+                raise
+    
+    async def close(self):
+        """Close the underlying LLM HTTP client."""
+        await self.client.close()
+        logger.info("AI service client closed")
+        
+    async def parse_announcement_to_json(self, html_content: str, target_json_structure: Optional[str] = None) -> Dict[str, Any]:
         """
         Parse Canvas announcement HTML into structured JSON using Kimi K2 model.
         
@@ -90,34 +353,13 @@ class AIService:
         try:
             logger.info("Sending request to Kimi K2 model for announcement parsing")
             
-            completion = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
+            cleaned_content = await self._make_api_call(
+                system_prompt,
+                user_prompt,
                 temperature=0.0,  # Maximum predictability for data extraction
-                response_format={"type": "json_object"},
+                max_tokens=None
             )
-            
-            response_content = completion.choices[0].message.content
-            logger.info(f"AI response content: {response_content}")
-            logger.info(f"AI response length: {len(response_content) if response_content else 0}")
-            
-            if not response_content or response_content.strip() == "":
-                logger.error("AI returned empty response")
-                raise Exception("AI returned empty response")
-            
-            # Clean the response - remove markdown code blocks if present
-            cleaned_content = response_content.strip()
-            if cleaned_content.startswith("```json"):
-                cleaned_content = cleaned_content[7:]  # Remove ```json
-            if cleaned_content.startswith("```"):
-                cleaned_content = cleaned_content[3:]   # Remove ```
-            if cleaned_content.endswith("```"):
-                cleaned_content = cleaned_content[:-3]  # Remove closing ```
-            cleaned_content = cleaned_content.strip()
-            
+            logger.info(f"AI response length: {len(cleaned_content)}")
             logger.info(f"Cleaned AI response (first 200 chars): {cleaned_content[:200]}")
             
             # Parse and validate JSON
@@ -287,7 +529,7 @@ class AIService:
         
         logger.debug("JSON validation passed")
     
-    def test_connection(self) -> Dict[str, Any]:
+    async def test_connection(self) -> Dict[str, Any]:
         """
         Test the AI service connection and functionality.
         
@@ -296,7 +538,7 @@ class AIService:
         """
         try:
             # Simple test request
-            completion = self.client.chat.completions.create(
+            completion = await self._create_chat_completion(
                 model=self.model,
                 messages=[
                     {"role": "user", "content": "Return a JSON object with a 'status' field set to 'success' and a 'message' field set to 'AI service is working'."}
@@ -323,35 +565,9 @@ class AIService:
                 "model": self.model
             }
 
-    async def transform_lesson_content(self, raw_html: str, lesson_title: str = "", lesson_type: str = "") -> dict:
-        """
-        Transform raw HTML lesson content into clean, structured, readable format.
-        
-        Args:
-            raw_html: Raw HTML content from Canvas
-            lesson_title: Title of the lesson
-            lesson_type: Type of content (Page, Assignment, Discussion, etc.)
-            
-        Returns:
-            Dict with transformed content including structured sections
-        """
-        try:
-            logger.info(f"Transforming lesson content: '{lesson_title}' (type: {lesson_type})")
-            
-            if not raw_html or not raw_html.strip():
-                return {
-                    "success": False,
-                    "error": "No content provided",
-                    "content": {
-                        "title": lesson_title,
-                        "type": lesson_type,
-                        "sections": [],
-                        "summary": "No content available."
-                    }
-                }
-            
-            # Prepare the transformation prompt
-            system_prompt = """You are an expert educational content formatter. Transform the provided HTML content into a clean, structured, student-friendly format.
+    def _build_lesson_transform_system_prompt(self) -> str:
+        """Build the system prompt for lesson content transformation."""
+        return """You are an expert educational content formatter. Transform the provided HTML content into a clean, structured, student-friendly format.
 
 Your task:
 1. Parse the HTML content and extract the meaningful text and structure
@@ -392,24 +608,100 @@ Guidelines:
 - Note any embedded videos, images, or external links
 - Make the content scannable with clear headings
 - Focus on educational value and student comprehension"""
+
+    def get_conversion_fingerprint(self, kind: str) -> str:
+        """
+        Fingerprint everything that shapes a kind of conversion.
+        
+        Stored conversion results are only reused while the fingerprint is
+        unchanged, so editing a prompt, switching models, or changing the
+        chunker or (for components, which may come from the fast path) the
+        deterministic parser invalidates them.
+        
+        Args:
+            kind: "components" or "lesson_content"
+            
+        Returns:
+            SHA-256 hex digest of the model, system prompt and code versions
+        """
+        if kind in self._fingerprints:
+            return self._fingerprints[kind]
+        
+        versions = f"chunker={CHUNKER_VERSION}/{self.chunk_max_chars}"
+        if kind == "components":
+            system_prompt, _ = self._build_component_prompts("")
+            versions += f" parser={PARSER_VERSION}"
+        elif kind == "lesson_content":
+            system_prompt = self._build_lesson_transform_system_prompt()
+        else:
+            raise ValueError(f"Unknown conversion kind: {kind}")
+        
+        fingerprint = hashlib.sha256(f"{kind}\n{self.model}\n{versions}\n{system_prompt}".encode('utf-8')).hexdigest()
+        self._fingerprints[kind] = fingerprint
+        return fingerprint
+
+    async def transform_lesson_content(self, raw_html: str, lesson_title: str = "", lesson_type: str = "") -> dict:
+        """
+        Transform raw HTML lesson content into clean, structured, readable format.
+        
+        Args:
+            raw_html: Raw HTML content from Canvas
+            lesson_title: Title of the lesson
+            lesson_type: Type of content (Page, Assignment, Discussion, etc.)
+            
+        Returns:
+            Dict with transformed content including structured sections
+        """
+        try:
+            logger.info(f"Transforming lesson content: '{lesson_title}' (type: {lesson_type})")
+            
+            if not raw_html or not raw_html.strip():
+                return {
+                    "success": False,
+                    "error": "No content provided",
+                    "content": {
+                        "title": lesson_title,
+                        "type": lesson_type,
+                        "sections": [],
+                        "summary": "No content available."
+                    }
+                }
+            
+            # Prepare the transformation prompt
+            system_prompt = self._build_lesson_transform_system_prompt()
+            
+            chunks = split_html_into_chunks(raw_html, self.chunk_max_chars)
             
-            user_prompt = f"""
+            def build_user_prompt(chunk: str, index: int) -> str:
+                part_note = ""
+                if len(chunks) > 1:
+                    part_note = (f"\nThis is part {index + 1} of {len(chunks)} of the lesson, split at a section "
+                                 "boundary. Transform only the content in this part.\n")
+                
+                return f"""
 Transform this Canvas lesson content:
 
 Title: {lesson_title}
 Type: {lesson_type}
-
+{part_note}
 HTML Content:
-{raw_html[:8000]}  # Limit content to avoid token limits
+{chunk}
 
 Please transform this into a clean, student-friendly format following the JSON structure specified."""
 
-            # Make API call to Hugging Face
-            response = await self._make_api_call(system_prompt, user_prompt)
+            # Transform every chunk concurrently
+            responses = await asyncio.gather(*[
+                self._make_api_call(system_prompt, build_user_prompt(chunk, index))
+                for index, chunk in enumerate(chunks)
+            ])
             
             # Parse the response
             try:
-                parsed_content = json.loads(response)
+                parsed_parts = []
+                for response in responses:
+                    parsed_parts.append(json.loads(response))
+                
+                parsed_content = self._merge_transformed_parts(parsed_parts)
                 
                 # Validate the response structure
                 if not isinstance(parsed_content, dict):
@@ -466,6 +758,41 @@ Please transform this into a clean, student-friendly format following the JSON s
                 "content": fallback_content
             }
 
+    def _merge_transformed_parts(self, parts: list) -> Any:
+        """
+        Merge transformed lesson content produced for consecutive chunks.
+        
+        Title, type, summary and estimated time come from the first part;
+        sections, resources, objectives and key points are concatenated in
+        order. Only a value repeated across a chunk boundary (the last of one
+        part equal to the first of the next) is dropped; repeats elsewhere
+        are kept.
+        
+        Args:
+            parts: Parsed JSON responses in chunk order
+            
+        Returns:
+            Merged content, or the single part unchanged
+        """
+        if len(parts) == 1:
+            return parts[0]
+        
+        if not all(isinstance(part, dict) for part in parts):
+            raise ValueError("Response is not a valid JSON object")
+        
+        merged = dict(parts[0])
+        for field in ("sections", "resources", "learning_objectives", "key_points"):
+            merged[field] = []
+            for part in parts:
+                values = part.get(field, [])
+                if not isinstance(values, list):
+                    continue
+                if values and merged[field] and values[0] == merged[field][-1]:
+                    values = values[1:]
+                merged[field].extend(values)
+        
+        return merged
+
     def _create_fallback_content(self, raw_html: str, title: str, content_type: str) -> dict:
         """
         Create a fallback structured content when AI transformation fails.
@@ -479,27 +806,10 @@ Please transform this into a clean, student-friendly format following the JSON s
             Basic structured content dict
         """
         try:
-            # Simple HTML-to-text conversion
-            import re
-            
-            # Remove HTML tags but preserve some structure
-            text = re.sub(r'<script[^>]*>.*?</script>', '', raw_html, flags=re.DOTALL | re.IGNORECASE)
-            text = re.sub(r'<style[^>]*>.*?</style>', '', text, flags=re.DOTALL | re.IGNORECASE)
-            
-            # Convert common HTML elements to text
-            text = re.sub(r'<h[1-6][^>]*>(.*?)</h[1-6]>', r'\n## \1\n', text)
-            text = re.sub(r'<p[^>]*>(.*?)</p>', r'\1\n\n', text)
-            text = re.sub(r'<br[^>]*>', '\n', text)
-            text = re.sub(r'<li[^>]*>(.*?)</li>', r'• \1\n', text)
-            text = re.sub(r'<[^>]+>', '', text)  # Remove remaining HTML tags
-            
-            # Clean up whitespace
-            text = re.sub(r'\n\s*\n', '\n\n', text)
-            text = text.strip()
-            
-            # Truncate if too long
-            if len(text) > 2000:
-                text = text[:2000] + "... (content truncated)"
+            # Single-pass HTML-to-text conversion that stops at the output budget
+            text, truncated = html_to_text(raw_html, max_chars=FALLBACK_TEXT_MAX_CHARS)
+            if truncated:
+                text += "... (content truncated)"
             
             return {
                 "title": title or "Lesson Content",
@@ -537,30 +847,252 @@ Please transform this into a clean, student-friendly format following the JSON s
                 "estimated_time": "Unknown"
             }
 
-    def convert_html_to_components(self, html_content: str) -> list:
+    async def convert_html_to_components(self, html_content: str) -> list:
         """
-        Convert Canvas lesson HTML into structured JSON components using LLM.
+        Convert Canvas lesson HTML into structured JSON components.
         
-        This function implements Phase 1.2 of the PRD - takes raw HTML from Canvas
-        pages and converts it into a clean, renderable JSON array of components.
+        Pages are parsed deterministically first; the LLM is only called when
+        the parser's confidence is below AI_FAST_PATH_MIN_CONFIDENCE.
         
         Args:
             html_content: Raw HTML content from Canvas lesson page
             
         Returns:
-            List of component objects in the format:
-            [
-                {"type": "header", "level": 2, "content": "Topic 6 - Time"},
-                {"type": "video", "title": "...", "embed_url": "..."},
-                {"type": "resource_list", "items": [...]},
-                {"type": "instructions", "items": [...]},
-                ...
-            ]
+            List of component objects (see _convert_html_with_llm)
             
         Raises:
             Exception: If AI parsing fails or returns invalid JSON
         """
+        if self.fast_path_enabled:
+            parse_start = time.perf_counter()
+            components, confidence = parse_html_to_components(html_content)
+            parse_ms = (time.perf_counter() - parse_start) * 1000
+            
+            if confidence >= self.fast_path_min_confidence:
+                self.conversion_stats["fast_path"] += 1
+                self.conversion_stats["fast_path_ms"] += parse_ms
+                self.conversion_stats["llm_input_chars_avoided"] += len(html_content)
+                logger.info(f"Converted HTML to {len(components)} components without LLM "
+                            f"(confidence {confidence}, {parse_ms:.1f}ms)")
+                return components
+            
+            self.conversion_stats["low_confidence_fallbacks"] += 1
+            logger.info(f"Parser confidence {confidence} below {self.fast_path_min_confidence}, using LLM")
+        
+        llm_start = time.perf_counter()
+        components = await self._convert_html_with_llm(html_content)
+        self.conversion_stats["llm"] += 1
+        self.conversion_stats["llm_ms"] += (time.perf_counter() - llm_start) * 1000
+        return components
+
+    async def stream_html_to_components(self, html_content: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Convert Canvas lesson HTML into components, yielding each one as soon
+        as it is available.
+        
+        Confidently parsed pages are yielded straight from the parser.
+        Otherwise every chunk is streamed from the LLM concurrently and
+        components are yielded in page order: the first chunk as it
+        generates, later chunks from what they have buffered meanwhile.
+        Chunks are stitched as in _convert_html_with_llm.
         
+        Args:
+            html_content: Raw HTML content from Canvas lesson page
+            
+        Yields:
+            Component objects in page order
+            
+        Raises:
+            Exception: If AI parsing fails or returns invalid JSON
+        """
+        if self.fast_path_enabled:
+            parse_start = time.perf_counter()
+            components, confidence = parse_html_to_components(html_content)
+            
+            if confidence >= self.fast_path_min_confidence:
+                self.conversion_stats["fast_path"] += 1
+                self.conversion_stats["fast_path_ms"] += (time.perf_counter() - parse_start) * 1000
+                self.conversion_stats["llm_input_chars_avoided"] += len(html_content)
+                for component in components:
+                    yield component
+                return
+            
+            self.conversion_stats["low_confidence_fallbacks"] += 1
+        
+        llm_start = time.perf_counter()
+        chunks = split_html_into_chunks(html_content, self.chunk_max_chars) or [html_content]
+        self.conversion_stats["llm_chunks"] += len(chunks)
+        queues = [asyncio.Queue() for _ in chunks]
+        
+        async def produce(index: int, chunk: str):
+            part = (index + 1, len(chunks)) if len(chunks) > 1 else None
+            try:
+                async for component in self._stream_html_chunk_with_llm(chunk, part):
+                    queues[index].put_nowait(("component", component))
+                queues[index].put_nowait(("done", None))
+            except Exception as e:
+                queues[index].put_nowait(("error", e))
+        
+        producers = [asyncio.ensure_future(produce(index, chunk)) for index, chunk in enumerate(chunks)]
+        # A trailing resource list is held back until the next component
+        # shows whether the following chunk continues it (see _stitch_components)
+        held = None
+        try:
+            for queue in queues:
+                at_boundary = held is not None
+                while True:
+                    kind, value = await queue.get()
+                    if kind == "done":
+                        break
+                    if kind == "error":
+                        raise Exception(f"Failed to convert HTML to components: {value}")
+                    
+                    if at_boundary:
+                        ready = self._stitch_components([[held], [value]])
+                    else:
+                        ready = [held, value] if held is not None else [value]
+                    at_boundary = False
+                    held = ready.pop() if ready[-1].get('type') == 'resource_list' else None
+                    for component in ready:
+                        yield component
+            
+            if held is not None:
+                yield held
+        finally:
+            for producer in producers:
+                producer.cancel()
+        
+        self.conversion_stats["llm"] += 1
+        self.conversion_stats["llm_ms"] += (time.perf_counter() - llm_start) * 1000
+
+    async def _stream_html_chunk_with_llm(self, html_content: str, part: Optional[tuple] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream one chunk's conversion from the LLM, yielding each component
+        as soon as its JSON object is complete.
+        
+        Args:
+            html_content: Raw HTML content (or one chunk of it)
+            part: Optional (part number, total parts) for a chunk
+            
+        Yields:
+            Component objects in order
+            
+        Raises:
+            Exception: If the response is not a valid, complete JSON array
+        """
+        system_prompt, user_prompt = self._build_component_prompts(html_content, part)
+        parser = JSONArrayStreamParser()
+        
+        try:
+            async for delta in self._stream_chat_completion(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=0.1,
+                max_tokens=4000
+            ):
+                for component in parser.feed(delta):
+                    if not isinstance(component, dict) or 'type' not in component:
+                        raise ValueError("Invalid component structure in AI response")
+                    yield component
+        except json.JSONDecodeError as e:
+            raise Exception(f"AI returned invalid JSON: {e}")
+        
+        if not parser.finished:
+            raise Exception("AI response ended before the component array was complete")
+
+    def get_conversion_stats(self) -> Dict[str, Any]:
+        """Get per-path conversion counters and the estimated LLM latency avoided."""
+        stats = self.conversion_stats
+        average_llm_ms = stats["llm_ms"] / stats["llm"] if stats["llm"] else None
+        conversions = stats["fast_path"] + stats["llm"]
+        
+        return {
+            "fast_path": stats["fast_path"],
+            "llm": stats["llm"],
+            "low_confidence_fallbacks": stats["low_confidence_fallbacks"],
+            "fast_path_rate": round(stats["fast_path"] / conversions, 4) if conversions else 0.0,
+            "average_fast_path_ms": round(stats["fast_path_ms"] / stats["fast_path"], 2) if stats["fast_path"] else None,
+            "average_llm_ms": round(average_llm_ms, 2) if average_llm_ms is not None else None,
+            "llm_calls_avoided": stats["fast_path"],
+            "estimated_llm_ms_avoided": round(average_llm_ms * stats["fast_path"]) if average_llm_ms is not None else None,
+            # Roughly four characters per prompt token
+            "estimated_llm_input_tokens_avoided": stats["llm_input_chars_avoided"] // 4,
+            "min_confidence": self.fast_path_min_confidence,
+            "llm_chunks": stats["llm_chunks"],
+            "chunk_max_chars": self.chunk_max_chars
+        }
+
+    async def _convert_html_with_llm(self, html_content: str) -> list:
+        """
+        Convert Canvas lesson HTML into components using LLM, in parallel chunks.
+        
+        Pages longer than AI_CHUNK_MAX_CHARS are split at structural boundaries,
+        every chunk is converted concurrently and the component arrays are
+        concatenated in page order.
+        
+        Args:
+            html_content: Raw HTML content from Canvas lesson page
+            
+        Returns:
+            List of component objects (see _convert_html_chunk_with_llm)
+            
+        Raises:
+            Exception: If conversion of any chunk fails
+        """
+        chunks = split_html_into_chunks(html_content, self.chunk_max_chars) or [html_content]
+        self.conversion_stats["llm_chunks"] += len(chunks)
+        
+        if len(chunks) == 1:
+            return await self._convert_html_chunk_with_llm(chunks[0])
+        
+        logger.info(f"Converting {len(html_content)} chars of HTML in {len(chunks)} parallel chunks")
+        chunk_components = await asyncio.gather(*[
+            self._convert_html_chunk_with_llm(chunk, part=(index + 1, len(chunks)))
+            for index, chunk in enumerate(chunks)
+        ])
+        
+        return self._stitch_components(chunk_components)
+
+    def _stitch_components(self, chunk_components: list) -> list:
+        """
+        Concatenate per-chunk component arrays in order.
+        
+        A resource list cut in two by a chunk boundary is merged back into one.
+        
+        Args:
+            chunk_components: Component arrays in chunk order
+            
+        Returns:
+            Combined list of components
+        """
+        components = []
+        for chunk in chunk_components:
+            for index, component in enumerate(chunk):
+                if (index == 0 and components
+                        and component.get('type') == 'resource_list'
+                        and components[-1].get('type') == 'resource_list'):
+                    components[-1] = {
+                        **components[-1],
+                        "items": list(components[-1].get('items', [])) + list(component.get('items', []))
+                    }
+                else:
+                    components.append(component)
+        return components
+
+    def _build_component_prompts(self, html_content: str, part: Optional[tuple] = None) -> tuple:
+        """
+        Build the system and user prompts for HTML-to-component conversion.
+        
+        Args:
+            html_content: Raw HTML content (or one chunk of it)
+            part: Optional (part number, total parts) for a chunk
+            
+        Returns:
+            Tuple of (system_prompt, user_prompt)
+        """
         # Create detailed prompt for HTML-to-component conversion
         system_prompt = """You are an expert at converting Canvas LMS lesson HTML into clean, structured JSON components.
 
@@ -602,38 +1134,58 @@ Your task is to analyze the HTML content and extract meaningful educational comp
 **Expected Output:**
 A JSON array of component objects that represents the educational content structure."""
 
-        user_prompt = f"""Convert this Canvas lesson HTML into structured JSON components:
+        part_note = ""
+        if part:
+            part_note = (f"This is part {part[0]} of {part[1]} of a longer page, split at a section boundary. "
+                         "Convert only the content in this part.\n\n")
+        
+        user_prompt = f"""{part_note}Convert this Canvas lesson HTML into structured JSON components:
 
 {html_content}
 
 Return only the JSON array of components."""
 
+        return system_prompt, user_prompt
+
+    async def _convert_html_chunk_with_llm(self, html_content: str, part: Optional[tuple] = None) -> list:
+        """
+        Convert Canvas lesson HTML into structured JSON components using LLM.
+        
+        This function implements Phase 1.2 of the PRD - takes raw HTML from Canvas
+        pages and converts it into a clean, renderable JSON array of components.
+        
+        Args:
+            html_content: Raw HTML content from Canvas lesson page
+            part: Optional (part number, total parts) when html_content is one
+                chunk of a longer page
+            
+        Returns:
+            List of component objects in the format:
+            [
+                {"type": "header", "level": 2, "content": "Topic 6 - Time"},
+                {"type": "video", "title": "...", "embed_url": "..."},
+                {"type": "resource_list", "items": [...]},
+                {"type": "instructions", "items": [...]},
+                ...
+            ]
+            
+        Raises:
+            Exception: If AI parsing fails or returns invalid JSON
+        """
+        
+        system_prompt, user_prompt = self._build_component_prompts(html_content, part)
+
         try:
             logger.info("Converting HTML to structured components using AI")
             
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.1,  # Low temperature for consistent structure
-                max_tokens=4000
+            # The expected response is a JSON array, so JSON object mode is not used
+            ai_response = await self._make_api_call(
+                system_prompt,
+                user_prompt,
+                json_mode=False,
+                temperature=0.1  # Low temperature for consistent structure
             )
             
-            # Extract and parse the JSON response
-            ai_response = response.choices[0].message.content.strip()
-            
-            # Remove markdown code blocks if present
-            if ai_response.startswith('```json'):
-                ai_response = ai_response[7:]
-            if ai_response.startswith('```'):
-                ai_response = ai_response[3:]
-            if ai_response.endswith('```'):
-                ai_response = ai_response[:-3]
-            
-            ai_response = ai_response.strip()
-            
             # Parse the JSON response
             components = json.loads(ai_response)
             
@@ -0,0 +1,60 @@
+"""
+Micro-benchmark: single-pass html_to_text against the previous multi-pass
+re.sub fallback extraction, on a synthetic large Canvas page.
+
+Usage: python benchmark_html_to_text.py [sections] [repeats]
+"""
+
+import re
+import sys
+import timeit
+
+from html_text import html_to_text
+
+
+def legacy_html_to_text(raw_html: str) -> str:
+    """The fallback extraction previously inlined in AIService._create_fallback_content."""
+    text = re.sub(r'<script[^>]*>.*?</script>', '', raw_html, flags=re.DOTALL | re.IGNORECASE)
+    text = re.sub(r'<style[^>]*>.*?</style>', '', text, flags=re.DOTALL | re.IGNORECASE)
+    text = re.sub(r'<h[1-6][^>]*>(.*?)</h[1-6]>', r'\n## \1\n', text)
+    text = re.sub(r'<p[^>]*>(.*?)</p>', r'\1\n\n', text)
+    text = re.sub(r'<br[^>]*>', '\n', text)
+    text = re.sub(r'<li[^>]*>(.*?)</li>', r'• \1\n', text)
+    text = re.sub(r'<[^>]+>', '', text)
+    text = re.sub(r'\n\s*\n', '\n\n', text)
+    text = text.strip()
+    if len(text) > 2000:
+        text = text[:2000] + "... (content truncated)"
+    return text
+
+
+def build_page(sections: int) -> str:
+    """Build a Canvas-like page with headings, paragraphs, lists, media and scripts."""
+    section = (
+        '<div class="section"><h2 style="color: #2d3b45;">Lesson section {i}</h2>'
+        '<p>Read the passage carefully and answer the questions in your workbook. '
+        'Use <strong>full sentences</strong> and check your spelling.</p>'
+        '<ul><li>Watch the video</li><li>Complete <a href="/courses/1/files/{i}">worksheet {i}</a></li></ul>'
+        '<iframe src="https://example.instructuremedia.com/embed/{i}" title="Video {i}"></iframe>'
+        '<script>window.ENV = {{"section": {i}}};</script><style>.section {{ margin: 0; }}</style></div>'
+    )
+    return "<html><body>" + "".join(section.format(i=i) for i in range(sections)) + "</body></html>"
+
+
+def main():
+    sections = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    page = build_page(sections)
+
+    legacy = min(timeit.repeat(lambda: legacy_html_to_text(page), number=1, repeat=repeats))
+    full = min(timeit.repeat(lambda: html_to_text(page), number=1, repeat=repeats))
+    budget = min(timeit.repeat(lambda: html_to_text(page, max_chars=2000), number=1, repeat=repeats))
+
+    print(f"Page size: {len(page):,} chars ({sections} sections), best of {repeats}")
+    print(f"  legacy multi-pass re.sub:    {legacy * 1000:8.2f} ms")
+    print(f"  html_to_text (no budget):    {full * 1000:8.2f} ms  ({legacy / full:.1f}x)")
+    print(f"  html_to_text (2000 chars):   {budget * 1000:8.2f} ms  ({legacy / budget:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
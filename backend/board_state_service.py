@@ -2,11 +2,10 @@ import logging
 import uuid
 from datetime import datetime
 from typing import Dict, Any, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, select
 
 from models import BoardState, WeeklyPlan
-from database import get_db
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +28,7 @@ class BoardStateService:
         """
         return str(uuid.uuid4())
     
-    def ensure_weekly_plan_exists(self, db: Session, weekly_plan_id: int) -> WeeklyPlan:
+    async def ensure_weekly_plan_exists(self, db: AsyncSession, weekly_plan_id: int) -> WeeklyPlan:
         """
         Ensure a weekly plan exists, creating a default one if needed.
         
@@ -40,7 +39,7 @@ class BoardStateService:
         Returns:
             WeeklyPlan instance
         """
-        existing_plan = db.query(WeeklyPlan).filter(WeeklyPlan.id == weekly_plan_id).first()
+        existing_plan = await db.get(WeeklyPlan, weekly_plan_id)
         
         if existing_plan:
             return existing_plan
@@ -61,13 +60,26 @@ class BoardStateService:
         )
         
         db.add(default_plan)
-        db.commit()
-        db.refresh(default_plan)
+        await db.commit()
+        await db.refresh(default_plan)
         
         logger.info(f"Created default weekly plan with ID {weekly_plan_id}")
         return default_plan
     
-    async def save_board_state(self, db: Session, weekly_plan_id: int, 
+    async def _get_board_state(self, db: AsyncSession, weekly_plan_id: int,
+                               user_session: str) -> Optional[BoardState]:
+        """Get the board state row for a user and weekly plan, if any."""
+        result = await db.execute(
+            select(BoardState).where(
+                and_(
+                    BoardState.weekly_plan_id == weekly_plan_id,
+                    BoardState.user_session == user_session
+                )
+            )
+        )
+        return result.scalars().first()
+    
+    async def save_board_state(self, db: AsyncSession, weekly_plan_id: int, 
                              user_session: str, board_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Save or update the board state for a user and weekly plan.
@@ -89,15 +101,10 @@ class BoardStateService:
             logger.info(f"Saving board state for session {user_session} and plan {weekly_plan_id}")
             
             # Ensure the weekly plan exists
-            self.ensure_weekly_plan_exists(db, weekly_plan_id)
+            await self.ensure_weekly_plan_exists(db, weekly_plan_id)
             
             # Check if board state already exists for this user/plan combination
-            existing_state = db.query(BoardState).filter(
-                and_(
-                    BoardState.weekly_plan_id == weekly_plan_id,
-                    BoardState.user_session == user_session
-                )
-            ).first()
+            existing_state = await self._get_board_state(db, weekly_plan_id, user_session)
             
             if existing_state:
                 # Update existing board state
@@ -116,7 +123,7 @@ class BoardStateService:
                 db.add(new_state)
                 logger.info(f"Created new board state for session {user_session}")
             
-            db.commit()
+            await db.commit()
             
             return {
                 "status": "success",
@@ -126,10 +133,10 @@ class BoardStateService:
             
         except Exception as e:
             logger.error(f"Failed to save board state: {e}")
-            db.rollback()
+            await db.rollback()
             raise Exception(f"Unable to save board state: {e}")
     
-    async def load_board_state(self, db: Session, weekly_plan_id: int, 
+    async def load_board_state(self, db: AsyncSession, weekly_plan_id: int, 
                              user_session: str) -> Optional[Dict[str, Any]]:
         """
         Load the saved board state for a user and weekly plan.
@@ -146,12 +153,7 @@ class BoardStateService:
         try:
             logger.info(f"Loading board state for session {user_session} and plan {weekly_plan_id}")
             
-            board_state = db.query(BoardState).filter(
-                and_(
-                    BoardState.weekly_plan_id == weekly_plan_id,
-                    BoardState.user_session == user_session
-                )
-            ).first()
+            board_state = await self._get_board_state(db, weekly_plan_id, user_session)
             
             if board_state:
                 logger.info(f"Found saved board state from {board_state.last_updated}")
@@ -168,7 +170,7 @@ class BoardStateService:
             logger.error(f"Failed to load board state: {e}")
             return None
     
-    async def get_or_create_session_board_state(self, db: Session, weekly_plan_id: int, 
+    async def get_or_create_session_board_state(self, db: AsyncSession, weekly_plan_id: int, 
                                               user_session: str, default_board_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Get existing board state or create with default data if none exists.
@@ -195,7 +197,7 @@ class BoardStateService:
         
         return default_board_data
     
-    async def clear_board_state(self, db: Session, weekly_plan_id: int, 
+    async def clear_board_state(self, db: AsyncSession, weekly_plan_id: int, 
                               user_session: str) -> Dict[str, Any]:
         """
         Clear/reset the board state for a user and weekly plan.
@@ -212,16 +214,11 @@ class BoardStateService:
         try:
             logger.info(f"Clearing board state for session {user_session} and plan {weekly_plan_id}")
             
-            board_state = db.query(BoardState).filter(
-                and_(
-                    BoardState.weekly_plan_id == weekly_plan_id,
-                    BoardState.user_session == user_session
-                )
-            ).first()
+            board_state = await self._get_board_state(db, weekly_plan_id, user_session)
             
             if board_state:
-                db.delete(board_state)
-                db.commit()
+                await db.delete(board_state)
+                await db.commit()
                 logger.info(f"Cleared board state for session {user_session}")
                 
                 return {
@@ -236,10 +233,10 @@ class BoardStateService:
             
         except Exception as e:
             logger.error(f"Failed to clear board state: {e}")
-            db.rollback()
+            await db.rollback()
             raise Exception(f"Unable to clear board state: {e}")
     
-    def get_board_state_summary(self, db: Session, weekly_plan_id: int) -> Dict[str, Any]:
+    async def get_board_state_summary(self, db: AsyncSession, weekly_plan_id: int) -> Dict[str, Any]:
         """
         Get summary of all board states for a weekly plan (for debugging/admin).
         
@@ -252,9 +249,10 @@ class BoardStateService:
         """
         
         try:
-            board_states = db.query(BoardState).filter(
-                BoardState.weekly_plan_id == weekly_plan_id
-            ).all()
+            result = await db.execute(
+                select(BoardState).where(BoardState.weekly_plan_id == weekly_plan_id)
+            )
+            board_states = result.scalars().all()
             
             summary = {
                 "weekly_plan_id": weekly_plan_id,
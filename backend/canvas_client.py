@@ -1,10 +1,16 @@
 import os
+import asyncio
+import hashlib
 import httpx
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any
 from datetime import datetime, timedelta
 import logging
 from dotenv import load_dotenv
 
+from canvas_scheduler import CanvasRequestScheduler
+from memory_cache import LRUCache
+from module_item_index import module_item_index
+
 # Load environment variables
 load_dotenv()
 
@@ -31,14 +37,98 @@ class CanvasClient:
             "Content-Type": "application/json"
         }
         
-        # Create async HTTP client with proper configuration
+        # Connection pool settings for the shared transport. Every Canvas call
+        # goes to the same host, so the pool limits double as per-host caps.
+        self.max_connections = int(os.getenv("CANVAS_MAX_CONNECTIONS", "20"))
+        self.max_keepalive_connections = int(os.getenv("CANVAS_MAX_KEEPALIVE_CONNECTIONS", "10"))
+        self.keepalive_expiry = float(os.getenv("CANVAS_KEEPALIVE_EXPIRY", "30"))
+        self.request_timeout = float(os.getenv("CANVAS_REQUEST_TIMEOUT", "30"))
+        self.http2 = os.getenv("CANVAS_HTTP2", "true").lower() == "true" and self._http2_available()
+        
+        # Create one long-lived async HTTP client shared by every Canvas call
         self.client = httpx.AsyncClient(
-            timeout=30.0,
+            timeout=self.request_timeout,
             follow_redirects=True,
-            headers=self.headers
+            headers=self.headers,
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry
+            )
         )
         
-        logger.info(f"Canvas client initialized with user ID: {self.user_id}")
+        # Validators (ETag / Last-Modified) remembered per page URL so repeat
+        # fetches can be revalidated with conditional requests
+        self._validators = LRUCache(
+            max_entries=int(os.getenv("CANVAS_VALIDATOR_CACHE_SIZE", "2048")),
+            ttl_seconds=float(os.getenv("CANVAS_VALIDATOR_TTL", "86400"))
+        )
+        self.conditional_stats = {"not_modified": 0, "modified": 0, "unconditional": 0, "updated_at_unchanged": 0}
+        
+        # Admits requests by priority within Canvas's per-token rate limit
+        self.scheduler = CanvasRequestScheduler()
+        
+        logger.info(f"Canvas client initialized with user ID: {self.user_id} (http2: {self.http2})")
+    
+    @staticmethod
+    def _http2_available() -> bool:
+        """Check whether the optional h2 package needed for HTTP/2 is installed."""
+        try:
+            import h2  # noqa: F401
+            return True
+        except ImportError:
+            logger.warning("h2 package not installed - Canvas client falling back to HTTP/1.1")
+            return False
+    
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send a request to Canvas through the shared pooled client.
+        
+        Args:
+            method: HTTP method
+            url: Fully qualified request URL
+            **kwargs: Extra arguments forwarded to httpx (params, json, ...)
+            
+        Returns:
+            The successful httpx response
+            
+        Raises:
+            httpx.HTTPStatusError: If Canvas returns an error status
+        """
+        response = await self._send(method, url, **kwargs)
+        response.raise_for_status()
+        return response
+    
+    async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send a request once the rate-limit scheduler admits it, retrying
+        requests Canvas throttles with a 403.
+        
+        Args:
+            method: HTTP method
+            url: Fully qualified request URL
+            **kwargs: Extra arguments forwarded to httpx (params, json, headers, ...)
+            
+        Returns:
+            The httpx response, whatever its status
+        """
+        attempt = 0
+        while True:
+            await self.scheduler.acquire()
+            response = None
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            finally:
+                throttled = self.scheduler.release(response)
+            
+            if not throttled or attempt >= self.scheduler.throttle_retries:
+                return response
+            
+            delay = self.scheduler.get_retry_delay(attempt)
+            attempt += 1
+            logger.warning(f"Canvas throttled {method} {url}, retry {attempt}/{self.scheduler.throttle_retries} in {delay:.2f}s")
+            await asyncio.sleep(delay)
     
     async def _get(self, endpoint: str, params: dict = None) -> dict:
         """
@@ -57,8 +147,7 @@ class CanvasClient:
         url = f"{self.base_url}{endpoint}"
         
         try:
-            response = await self.client.get(url, params=params)
-            response.raise_for_status()
+            response = await self._request("GET", url, params=params)
             return response.json()
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error in _get: {e.response.status_code} - {e.response.text}")
@@ -106,8 +195,7 @@ class CanvasClient:
         try:
             logger.info(f"Fetching latest announcement for course {course_id}")
             
-            response = await self.client.get(url, params=params)
-            response.raise_for_status()
+            response = await self._request("GET", url, params=params)
             
             announcements = response.json()
             
@@ -125,6 +213,62 @@ class CanvasClient:
             logger.error(f"Error fetching latest announcement: {e}")
             raise Exception(f"Failed to fetch announcement: {e}")
     
+    async def paginate(self, url: str, params: dict = None,
+                       max_pages: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream every item of a paginated Canvas list endpoint.
+        
+        Follows the Link: rel="next" header Canvas returns on list endpoints.
+        The next page is requested as soon as the current one arrives, so the
+        round-trip overlaps with the caller consuming the current page.
+        
+        Args:
+            url: Fully qualified URL of the first page
+            params: Optional query parameters for the first page
+            max_pages: Optional safety limit on the number of pages fetched
+            
+        Yields:
+            Individual objects from each page, in Canvas order
+            
+        Raises:
+            httpx.HTTPStatusError: If any page request fails
+        """
+        next_page = asyncio.ensure_future(self._request("GET", url, params=params))
+        pages_fetched = 0
+        
+        try:
+            while next_page is not None:
+                response = await next_page
+                pages_fetched += 1
+                
+                # Canvas next links already carry every query parameter
+                next_url = response.links.get("next", {}).get("url")
+                if next_url and (max_pages is None or pages_fetched < max_pages):
+                    next_page = asyncio.ensure_future(self._request("GET", next_url))
+                else:
+                    next_page = None
+                
+                for item in response.json():
+                    yield item
+        finally:
+            if next_page is not None and not next_page.done():
+                next_page.cancel()
+    
+    async def get_all_pages(self, url: str, params: dict = None,
+                            max_pages: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Collect every item of a paginated Canvas list endpoint into a list.
+        
+        Args:
+            url: Fully qualified URL of the first page
+            params: Optional query parameters for the first page
+            max_pages: Optional safety limit on the number of pages fetched
+            
+        Returns:
+            List of all objects across every page
+        """
+        return [item async for item in self.paginate(url, params, max_pages)]
+    
     async def get_courses(self) -> List[Dict[str, Any]]:
         """
         Fetch all courses for the authenticated user.
@@ -146,10 +290,7 @@ class CanvasClient:
         try:
             logger.info("Fetching user courses")
             
-            response = await self.client.get(url, params=params)
-            response.raise_for_status()
-            
-            courses = response.json()
+            courses = await self.get_all_pages(url, params)
             logger.info(f"Found {len(courses)} courses")
             
             return courses
@@ -163,7 +304,7 @@ class CanvasClient:
     
     async def get_course_modules(self, course_id: int) -> List[Dict[str, Any]]:
         """
-        Fetch all modules for a specific course.
+        Get all modules for a course.
         
         Args:
             course_id: Canvas course ID
@@ -174,71 +315,60 @@ class CanvasClient:
         Raises:
             Exception: If API call fails
         """
-        
         url = self._build_url(f"courses/{course_id}/modules")
         
         params = {
-            "include[]": ["items"],
-            "per_page": "100"
+            "per_page": "100",
+            "include[]": ["items"]
         }
         
         try:
             logger.info(f"Fetching modules for course {course_id}")
             
-            response = await self.client.get(url, params=params)
-            response.raise_for_status()
-            
-            modules = response.json()
+            modules = await self.get_all_pages(url, params)
             logger.info(f"Found {len(modules)} modules")
             
+            await module_item_index.record_course_modules(course_id, modules)
+            
             return modules
             
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error fetching modules: {e.response.status_code} - {e.response.text}")
-            raise Exception(f"Canvas API error: {e.response.status_code}")
         except Exception as e:
-            logger.error(f"Error fetching course modules: {e}")
-            raise Exception(f"Failed to fetch course modules: {e}")
+            logger.error(f"Failed to fetch modules for course {course_id}: {e}")
+            raise Exception(f"Canvas modules API error: {e}")
     
     async def get_module_items(self, course_id: int, module_id: int) -> List[Dict[str, Any]]:
         """
-        Fetch all items for a specific module.
+        Get all items (lessons) in a specific module.
         
         Args:
             course_id: Canvas course ID
             module_id: Canvas module ID
             
         Returns:
-            List of module item objects
+            List of module item objects with html_url for each lesson
             
         Raises:
             Exception: If API call fails
         """
-        
         url = self._build_url(f"courses/{course_id}/modules/{module_id}/items")
         
         params = {
-            "include[]": ["content_details", "mastery_paths", "completion_requirements"],
             "per_page": "100"
         }
         
         try:
             logger.info(f"Fetching items for module {module_id} in course {course_id}")
             
-            response = await self.client.get(url, params=params)
-            response.raise_for_status()
+            items = await self.get_all_pages(url, params)
+            logger.info(f"Found {len(items)} items in module {module_id}")
             
-            items = response.json()
-            logger.info(f"Found {len(items)} module items")
+            await module_item_index.record_module_items(course_id, module_id, items)
             
             return items
             
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error fetching module items: {e.response.status_code} - {e.response.text}")
-            raise Exception(f"Canvas API error: {e.response.status_code}")
         except Exception as e:
-            logger.error(f"Error fetching module items: {e}")
-            raise Exception(f"Failed to fetch module items: {e}")
+            logger.error(f"Failed to fetch items for module {module_id}: {e}")
+            raise Exception(f"Canvas module items API error: {e}")
     
     async def get_calendar_events(self, start_date: datetime, end_date: datetime, 
                                   course_ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
@@ -273,10 +403,7 @@ class CanvasClient:
         try:
             logger.info(f"Fetching calendar events from {start_date} to {end_date}")
             
-            response = await self.client.get(url, params=params)
-            response.raise_for_status()
-            
-            events = response.json()
+            events = await self.get_all_pages(url, params)
             logger.info(f"Found {len(events)} calendar events")
             
             return events
@@ -308,8 +435,7 @@ class CanvasClient:
             
             logger.info(f"Fetching upcoming events from {start_date} to {end_date}")
             
-            response = await self.client.get(url, params=params)
-            response.raise_for_status()
+            response = await self._request("GET", url, params=params)
             
             events = response.json()
             # Filter for assignment events only
@@ -344,10 +470,10 @@ class CanvasClient:
         try:
             logger.info(f"Fetching page content for {page_url} in course {course_id}")
             
-            response = await self.client.get(url)
-            response.raise_for_status()
+            response = await self._request("GET", url)
             
             page = response.json()
+            self._remember_validators(url, response, page)
             logger.info(f"Retrieved page: {page.get('title', 'Untitled')}")
             
             return page
@@ -359,6 +485,119 @@ class CanvasClient:
             logger.error(f"Error fetching page content: {e}")
             raise Exception(f"Failed to fetch page content: {e}")
     
+    async def get_page_content_conditional(self, course_id: int, page_url: str) -> Dict[str, Any]:
+        """
+        Fetch a page, revalidating with If-None-Match / If-Modified-Since when
+        validators from an earlier fetch are known.
+        
+        Args:
+            course_id: Canvas course ID
+            page_url: Page URL slug
+            
+        Returns:
+            Dict with "not_modified", "content_hash" and "page". On a 304 "page"
+            holds the metadata from the last full fetch without its body. When
+            Canvas sent no validators, a full response whose updated_at matches
+            the last fetch also counts as not modified; "page" then has its body.
+            
+        Raises:
+            Exception: If API call fails
+        """
+        
+        url = self._build_url(f"courses/{course_id}/pages/{page_url}")
+        validator = self._validators.get(url)
+        
+        headers = {}
+        if validator:
+            if validator["etag"]:
+                headers["If-None-Match"] = validator["etag"]
+            if validator["last_modified"]:
+                headers["If-Modified-Since"] = validator["last_modified"]
+        
+        try:
+            logger.info(f"Revalidating page {page_url} in course {course_id} (conditional: {bool(headers)})")
+            
+            response = await self._send("GET", url, headers=headers)
+            
+            if response.status_code == 304 and validator:
+                self.conditional_stats["not_modified"] += 1
+                return {
+                    "not_modified": True,
+                    "content_hash": validator["content_hash"],
+                    "page": dict(validator["page"])
+                }
+            
+            response.raise_for_status()
+            self.conditional_stats["modified" if headers else "unconditional"] += 1
+            
+            page = response.json()
+            if (not headers and validator and validator["updated_at"]
+                    and page.get("body") and page.get("updated_at") == validator["updated_at"]):
+                # No ETag or Last-Modified to revalidate with; the page's own
+                # timestamp shows the body is the one already hashed
+                self.conditional_stats["updated_at_unchanged"] += 1
+                return {
+                    "not_modified": True,
+                    "content_hash": validator["content_hash"],
+                    "page": page
+                }
+            
+            return {
+                "not_modified": False,
+                "content_hash": self._remember_validators(url, response, page),
+                "page": page
+            }
+            
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error revalidating page: {e.response.status_code} - {e.response.text}")
+            raise Exception(f"Canvas API error: {e.response.status_code}")
+        except Exception as e:
+            logger.error(f"Error revalidating page content: {e}")
+            raise Exception(f"Failed to fetch page content: {e}")
+    
+    def _remember_validators(self, url: str, response: httpx.Response, page: Dict[str, Any]) -> Optional[str]:
+        """
+        Store a page response's validators and body hash for later revalidation.
+        
+        Args:
+            url: Page API URL
+            response: Successful page response
+            page: Parsed page object
+            
+        Returns:
+            SHA-256 hash of the page body (matching ConvertedPageService.get_content_hash),
+            or None if the page has no body
+        """
+        body = page.get("body") or ""
+        if not body:
+            self._validators.invalidate(url)
+            return None
+        
+        content_hash = hashlib.sha256(body.encode('utf-8')).hexdigest()
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        
+        # updated_at is the fallback check when Canvas sends neither header
+        if etag or last_modified or page.get("updated_at"):
+            self._validators.set(url, {
+                "etag": etag,
+                "last_modified": last_modified,
+                "updated_at": page.get("updated_at"),
+                "content_hash": content_hash,
+                "page": {key: value for key, value in page.items() if key != "body"}
+            })
+        
+        return content_hash
+    
+    def get_conditional_stats(self) -> Dict[str, Any]:
+        """Get conditional page request counters."""
+        revalidated = self.conditional_stats["not_modified"] + self.conditional_stats["modified"]
+        return {
+            **self.conditional_stats,
+            "validators_stored": len(self._validators),
+            "not_modified_rate": round(self.conditional_stats["not_modified"] / revalidated, 4) if revalidated else 0.0
+        }
+    
     async def mark_item_done(self, course_id: int, module_id: int, item_id: int) -> bool:
         """
         Mark a module item as done.
@@ -380,8 +619,7 @@ class CanvasClient:
         try:
             logger.info(f"Marking item {item_id} as done")
             
-            response = await self.client.put(url)
-            response.raise_for_status()
+            response = await self._request("PUT", url)
             
             logger.info(f"Successfully marked item {item_id} as done")
             return True
@@ -414,8 +652,7 @@ class CanvasClient:
         try:
             logger.info(f"Marking item {item_id} as read")
             
-            response = await self.client.post(url)
-            response.raise_for_status()
+            response = await self._request("POST", url)
             
             logger.info(f"Successfully marked item {item_id} as read")
             return True
@@ -459,7 +696,10 @@ class CanvasClient:
                 "base_url": self.base_url,
                 "bearer_token_configured": bool(self.bearer_token),
                 "headers_configured": bool(self.headers),
-                "client_initialized": self.client is not None
+                "client_initialized": self.client is not None,
+                "http2": self.http2,
+                "max_connections": self.max_connections,
+                "max_keepalive_connections": self.max_keepalive_connections
             }
             
             return {
@@ -512,76 +752,6 @@ class CanvasClient:
                 "message": f"Failed to generate test URLs: {e}"
             }
     
-    async def get_course_modules(self, course_id: int) -> List[Dict[str, Any]]:
-        """
-        Get all modules for a course.
-        
-        Args:
-            course_id: Canvas course ID
-            
-        Returns:
-            List of module objects
-            
-        Raises:
-            Exception: If API call fails
-        """
-        url = self._build_url(f"courses/{course_id}/modules")
-        
-        params = {
-            "per_page": "100",
-            "include[]": ["items"]
-        }
-        
-        try:
-            logger.info(f"Fetching modules for course {course_id}")
-            
-            response = await self.client.get(url, params=params)
-            response.raise_for_status()
-            
-            modules = response.json()
-            logger.info(f"Found {len(modules)} modules")
-            
-            return modules
-            
-        except Exception as e:
-            logger.error(f"Failed to fetch modules for course {course_id}: {e}")
-            raise Exception(f"Canvas modules API error: {e}")
-    
-    async def get_module_items(self, course_id: int, module_id: int) -> List[Dict[str, Any]]:
-        """
-        Get all items (lessons) in a specific module.
-        
-        Args:
-            course_id: Canvas course ID
-            module_id: Canvas module ID
-            
-        Returns:
-            List of module item objects with html_url for each lesson
-            
-        Raises:
-            Exception: If API call fails
-        """
-        url = self._build_url(f"courses/{course_id}/modules/{module_id}/items")
-        
-        params = {
-            "per_page": "50"
-        }
-        
-        try:
-            logger.info(f"Fetching items for module {module_id} in course {course_id}")
-            
-            response = await self.client.get(url, params=params)
-            response.raise_for_status()
-            
-            items = response.json()
-            logger.info(f"Found {len(items)} items in module {module_id}")
-            
-            return items
-            
-        except Exception as e:
-            logger.error(f"Failed to fetch items for module {module_id}: {e}")
-            raise Exception(f"Canvas module items API error: {e}")
-    
     async def close(self):
         """Close the HTTP client connection."""
         if self.client:
@@ -605,95 +775,86 @@ class CanvasClient:
             # First get the module item details to understand its type
             item_url = f"{self.base_url}/api/v1/courses/{course_id}/modules/items/{module_item_id}"
             
-            async with httpx.AsyncClient() as client:
-                headers = {"Authorization": f"Bearer {self.bearer_token}"}
-                
-                # Get module item metadata
-                response = await client.get(item_url, headers=headers)
-                response.raise_for_status()
-                module_item = response.json()
-                
-                content_result = {
-                    "item_id": module_item_id,
-                    "title": module_item.get("title", ""),
-                    "type": module_item.get("type", ""),
-                    "html_url": module_item.get("html_url", ""),
-                    "content_id": module_item.get("content_id"),
-                    "url": module_item.get("url"),
-                    "content": None,
-                    "body": None
-                }
-                
-                # Handle different types of content
-                if module_item.get("type") == "Page":
-                    # Fetch page content
-                    page_url = module_item.get("page_url")
-                    if page_url:
-                        page_content_url = f"{self.base_url}/api/v1/courses/{course_id}/pages/{page_url}"
-                        page_response = await client.get(page_content_url, headers=headers)
-                        page_response.raise_for_status()
-                        page_data = page_response.json()
-                        content_result["content"] = page_data.get("body", "")
-                        content_result["body"] = page_data.get("body", "")
-                        
-                elif module_item.get("type") == "Assignment":
-                    # Fetch assignment details
-                    assignment_id = module_item.get("content_id")
-                    if assignment_id:
-                        assignment_url = f"{self.base_url}/api/v1/courses/{course_id}/assignments/{assignment_id}"
-                        assignment_response = await client.get(assignment_url, headers=headers)
-                        assignment_response.raise_for_status()
-                        assignment_data = assignment_response.json()
-                        content_result["content"] = assignment_data.get("description", "")
-                        content_result["body"] = assignment_data.get("description", "")
-                        content_result["due_date"] = assignment_data.get("due_at")
-                        content_result["points_possible"] = assignment_data.get("points_possible")
-                        
-                elif module_item.get("type") == "Discussion":
-                    # Fetch discussion topic
-                    discussion_id = module_item.get("content_id")
-                    if discussion_id:
-                        discussion_url = f"{self.base_url}/api/v1/courses/{course_id}/discussion_topics/{discussion_id}"
-                        discussion_response = await client.get(discussion_url, headers=headers)
-                        discussion_response.raise_for_status()
-                        discussion_data = discussion_response.json()
-                        content_result["content"] = discussion_data.get("message", "")
-                        content_result["body"] = discussion_data.get("message", "")
-                        
-                elif module_item.get("type") == "ExternalUrl":
-                    # External URL - just provide the URL
-                    content_result["content"] = f"External link: {module_item.get('external_url', '')}"
-                    content_result["external_url"] = module_item.get("external_url", "")
-                    
-                elif module_item.get("type") == "File":
-                    # File - provide download information
-                    file_id = module_item.get("content_id")
-                    if file_id:
-                        file_url = f"{self.base_url}/api/v1/courses/{course_id}/files/{file_id}"
-                        file_response = await client.get(file_url, headers=headers)
-                        file_response.raise_for_status()
-                        file_data = file_response.json()
-                        content_result["content"] = f"File: {file_data.get('display_name', '')} ({file_data.get('content-type', '')})"
-                        content_result["file_url"] = file_data.get("url", "")
-                        content_result["filename"] = file_data.get("display_name", "")
-                        content_result["size"] = file_data.get("size", 0)
-                        
-                else:
-                    # Generic content - try to fetch from URL if available
-                    item_url = module_item.get("url")
-                    if item_url:
-                        try:
-                            item_response = await client.get(item_url, headers=headers)
-                            item_response.raise_for_status()
-                            item_data = item_response.json()
-                            content_result["content"] = str(item_data)
-                        except Exception as e:
-                            logger.warning(f"Could not fetch generic content for item {module_item_id}: {e}")
-                            content_result["content"] = f"Content type '{module_item.get('type')}' not directly viewable."
-                
-                logger.info(f"Successfully fetched content for module item {module_item_id}")
-                return content_result
+            # Get module item metadata
+            response = await self._request("GET", item_url)
+            module_item = response.json()
+            
+            content_result = {
+                "item_id": module_item_id,
+                "title": module_item.get("title", ""),
+                "type": module_item.get("type", ""),
+                "html_url": module_item.get("html_url", ""),
+                "content_id": module_item.get("content_id"),
+                "url": module_item.get("url"),
+                "content": None,
+                "body": None
+            }
+            
+            # Handle different types of content
+            if module_item.get("type") == "Page":
+                # Fetch page content
+                page_url = module_item.get("page_url")
+                if page_url:
+                    page_content_url = f"{self.base_url}/api/v1/courses/{course_id}/pages/{page_url}"
+                    page_response = await self._request("GET", page_content_url)
+                    page_data = page_response.json()
+                    content_result["content"] = page_data.get("body", "")
+                    content_result["body"] = page_data.get("body", "")
+            
+            elif module_item.get("type") == "Assignment":
+                # Fetch assignment details
+                assignment_id = module_item.get("content_id")
+                if assignment_id:
+                    assignment_url = f"{self.base_url}/api/v1/courses/{course_id}/assignments/{assignment_id}"
+                    assignment_response = await self._request("GET", assignment_url)
+                    assignment_data = assignment_response.json()
+                    content_result["content"] = assignment_data.get("description", "")
+                    content_result["body"] = assignment_data.get("description", "")
+                    content_result["due_date"] = assignment_data.get("due_at")
+                    content_result["points_possible"] = assignment_data.get("points_possible")
+            
+            elif module_item.get("type") == "Discussion":
+                # Fetch discussion topic
+                discussion_id = module_item.get("content_id")
+                if discussion_id:
+                    discussion_url = f"{self.base_url}/api/v1/courses/{course_id}/discussion_topics/{discussion_id}"
+                    discussion_response = await self._request("GET", discussion_url)
+                    discussion_data = discussion_response.json()
+                    content_result["content"] = discussion_data.get("message", "")
+                    content_result["body"] = discussion_data.get("message", "")
+            
+            elif module_item.get("type") == "ExternalUrl":
+                # External URL - just provide the URL
+                content_result["content"] = f"External link: {module_item.get('external_url', '')}"
+                content_result["external_url"] = module_item.get("external_url", "")
+            
+            elif module_item.get("type") == "File":
+                # File - provide download information
+                file_id = module_item.get("content_id")
+                if file_id:
+                    file_url = f"{self.base_url}/api/v1/courses/{course_id}/files/{file_id}"
+                    file_response = await self._request("GET", file_url)
+                    file_data = file_response.json()
+                    content_result["content"] = f"File: {file_data.get('display_name', '')} ({file_data.get('content-type', '')})"
+                    content_result["file_url"] = file_data.get("url", "")
+                    content_result["filename"] = file_data.get("display_name", "")
+                    content_result["size"] = file_data.get("size", 0)
+            
+            else:
+                # Generic content - try to fetch from URL if available
+                item_url = module_item.get("url")
+                if item_url:
+                    try:
+                        item_response = await self._request("GET", item_url)
+                        item_data = item_response.json()
+                        content_result["content"] = str(item_data)
+                    except Exception as e:
+                        logger.warning(f"Could not fetch generic content for item {module_item_id}: {e}")
+                        content_result["content"] = f"Content type '{module_item.get('type')}' not directly viewable."
                 
+            logger.info(f"Successfully fetched content for module item {module_item_id}")
+            return content_result
+        
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error fetching module item content {module_item_id}: {e}")
             raise Exception(f"Canvas API error: {e.response.status_code}")
@@ -716,15 +877,10 @@ class CanvasClient:
             
             url = f"{self.base_url}/api/v1/courses/{course_id}/pages"
             
-            async with httpx.AsyncClient() as client:
-                headers = {"Authorization": f"Bearer {self.bearer_token}"}
-                response = await client.get(url, headers=headers)
-                response.raise_for_status()
-                
-                pages = response.json()
-                logger.info(f"Found {len(pages)} pages for course {course_id}")
-                return pages
-                
+            pages = await self.get_all_pages(url, {"per_page": "100"})
+            logger.info(f"Found {len(pages)} pages for course {course_id}")
+            return pages
+        
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error fetching course pages: {e}")
             raise Exception(f"Canvas API error: {e.response.status_code}")
@@ -750,27 +906,22 @@ class CanvasClient:
             # Canvas API endpoint for module item completion
             url = f"{self.base_url}/api/v1/courses/{course_id}/modules/items/{module_item_id}/done"
             
-            async with httpx.AsyncClient() as client:
-                headers = {"Authorization": f"Bearer {self.bearer_token}"}
-                
-                if completed:
-                    # PUT request to mark as done
-                    response = await client.put(url, headers=headers)
-                else:
-                    # DELETE request to mark as not done
-                    response = await client.delete(url, headers=headers)
-                
-                response.raise_for_status()
-                
-                logger.info(f"Successfully marked lesson {module_item_id} as {'complete' if completed else 'incomplete'}")
-                
-                return {
-                    "success": True,
-                    "module_item_id": module_item_id,
-                    "completed": completed,
-                    "canvas_response": response.status_code
-                }
+            if completed:
+                # PUT request to mark as done
+                response = await self._request("PUT", url)
+            else:
+                # DELETE request to mark as not done
+                response = await self._request("DELETE", url)
                 
+            logger.info(f"Successfully marked lesson {module_item_id} as {'complete' if completed else 'incomplete'}")
+            
+            return {
+                "success": True,
+                "module_item_id": module_item_id,
+                "completed": completed,
+                "canvas_response": response.status_code
+            }
+        
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error marking lesson completion: {e}")
             return {
@@ -788,6 +939,40 @@ class CanvasClient:
                 "completed": completed
             }
 
+    async def _locate_module_item(self, course_id: int, module_item_id: int) -> Optional[int]:
+        """
+        Find the module containing an item, using the module item index first.
+        
+        On an index miss the course's modules are listed once with their items
+        embedded (which refreshes the index); only modules Canvas did not
+        expand are fetched individually.
+        
+        Args:
+            course_id: Canvas course ID
+            module_item_id: Canvas module item ID
+            
+        Returns:
+            Module ID, or None if the item is not in the course
+        """
+        module_id = await module_item_index.lookup(course_id, module_item_id)
+        if module_id:
+            return module_id
+        
+        logger.info(f"Module index miss for item {module_item_id}, listing modules for course {course_id}")
+        modules = await self.get_course_modules(course_id)
+        
+        module_id = await module_item_index.lookup(course_id, module_item_id)
+        if module_id:
+            return module_id
+        
+        for module in modules:
+            if module.get("items") is None:
+                items = await self.get_module_items(course_id, module["id"])
+                if any(item["id"] == module_item_id for item in items):
+                    return module["id"]
+        
+        return None
+
     async def get_lesson_completion_status(self, course_id: int, module_item_id: int, module_id: int = None) -> dict:
         """
         Get the completion status of a specific lesson from Canvas.
@@ -803,19 +988,10 @@ class CanvasClient:
         try:
             logger.info(f"Getting completion status for lesson {module_item_id}")
             
+            indexed = False
             if not module_id:
-                # If module_id not provided, we need to find it by searching through modules
-                # This is less efficient but provides fallback
-                modules = await self.get_course_modules(course_id)
-                module_id = None
-                for module in modules:
-                    items = await self.get_module_items(course_id, module['id'])
-                    for item in items:
-                        if item['id'] == module_item_id:
-                            module_id = module['id']
-                            break
-                    if module_id:
-                        break
+                module_id = await self._locate_module_item(course_id, module_item_id)
+                indexed = True
                 
                 if not module_id:
                     return {
@@ -829,8 +1005,7 @@ class CanvasClient:
             params = {"include[]": "content_details"}
             
             # Use the configured client instead of creating a new one
-            response = await self.client.get(url, params=params)
-            response.raise_for_status()
+            response = await self._request("GET", url, params=params)
             
             module_item = response.json()
             
@@ -851,6 +1026,9 @@ class CanvasClient:
             
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error getting completion status: {e}")
+            if indexed and e.response.status_code == 404:
+                # The item has moved since it was indexed
+                await module_item_index.invalidate(module_item_id)
             return {
                 "success": False,
                 "error": f"Canvas API error: {e.response.status_code}",
@@ -864,6 +1042,102 @@ class CanvasClient:
                 "module_item_id": module_item_id
             }
 
+    async def get_bulk_completion_status(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Get the completion status of many lessons with one modules fetch per course.
+        
+        Items are grouped by course and answered from a single
+        modules?include[]=items listing per course, with courses fetched
+        concurrently. Only modules whose items Canvas did not embed are
+        fetched separately.
+        
+        Args:
+            items: Dicts with course_id, module_item_id and optional module_id
+            
+        Returns:
+            List of completion status dicts in the same order as the input
+        """
+        items_by_course: Dict[int, List[Dict[str, Any]]] = {}
+        for item in items:
+            items_by_course.setdefault(int(item["course_id"]), []).append(item)
+        
+        logger.info(f"Getting completion status for {len(items)} lessons across {len(items_by_course)} courses")
+        
+        async def course_statuses(course_id: int, course_items: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+            try:
+                modules = await self.get_course_modules(course_id)
+                
+                # module_item_id -> (module_id, module item)
+                located: Dict[int, Any] = {}
+                unexpanded_modules = []
+                for module in modules:
+                    if module.get("items") is None:
+                        unexpanded_modules.append(module["id"])
+                        continue
+                    for module_item in module["items"]:
+                        located[module_item["id"]] = (module["id"], module_item)
+                
+                # Canvas skips embedding items for very large modules; fetch only
+                # those modules that still hold a requested item
+                missing = [i for i in course_items if int(i["module_item_id"]) not in located]
+                if missing and unexpanded_modules:
+                    hinted = {int(i["module_id"]) for i in missing if i.get("module_id")}
+                    to_fetch = [m for m in unexpanded_modules if not hinted or m in hinted]
+                    fetched = await asyncio.gather(
+                        *(self.get_module_items(course_id, module_id) for module_id in to_fetch)
+                    )
+                    for module_id, module_items in zip(to_fetch, fetched):
+                        for module_item in module_items:
+                            located[module_item["id"]] = (module_id, module_item)
+                
+                results = {}
+                for item in course_items:
+                    module_item_id = int(item["module_item_id"])
+                    if module_item_id not in located:
+                        results[module_item_id] = {
+                            "success": False,
+                            "error": "Could not find module containing this item",
+                            "course_id": course_id,
+                            "module_item_id": module_item_id
+                        }
+                        continue
+                    
+                    module_id, module_item = located[module_item_id]
+                    completion_requirement = module_item.get("completion_requirement") or {}
+                    results[module_item_id] = {
+                        "success": True,
+                        "course_id": course_id,
+                        "module_id": module_id,
+                        "module_item_id": module_item_id,
+                        "completed": completion_requirement.get("completed", False),
+                        "completion_requirement": completion_requirement.get("type"),
+                        "title": module_item.get("title", ""),
+                        "type": module_item.get("type", "")
+                    }
+                return results
+            
+            except Exception as e:
+                logger.error(f"Error getting bulk completion status for course {course_id}: {e}")
+                return {
+                    int(item["module_item_id"]): {
+                        "success": False,
+                        "error": str(e),
+                        "course_id": course_id,
+                        "module_item_id": int(item["module_item_id"])
+                    }
+                    for item in course_items
+                }
+        
+        per_course = await asyncio.gather(
+            *(course_statuses(course_id, course_items) for course_id, course_items in items_by_course.items())
+        )
+        statuses = dict(zip(items_by_course.keys(), per_course))
+        
+        return [
+            statuses[int(item["course_id"])][int(item["module_item_id"])]
+            for item in items
+        ]
+
     async def mark_assignment_complete(self, course_id: int, assignment_id: int, user_id: int = None) -> dict:
         """
         Submit or mark an assignment as complete in Canvas.
@@ -893,26 +1167,20 @@ class CanvasClient:
             if user_id:
                 submission_data["submission"]["user_id"] = user_id
             
-            async with httpx.AsyncClient() as client:
-                headers = {
-                    "Authorization": f"Bearer {self.bearer_token}",
-                    "Content-Type": "application/json"
-                }
-                response = await client.post(url, headers=headers, json=submission_data)
-                response.raise_for_status()
-                
-                submission = response.json()
-                
-                logger.info(f"Successfully submitted assignment {assignment_id}")
-                
-                return {
-                    "success": True,
-                    "assignment_id": assignment_id,
-                    "submission_id": submission.get("id"),
-                    "submitted_at": submission.get("submitted_at"),
-                    "workflow_state": submission.get("workflow_state")
-                }
-                
+            response = await self._request("POST", url, json=submission_data)
+            
+            submission = response.json()
+            
+            logger.info(f"Successfully submitted assignment {assignment_id}")
+            
+            return {
+                "success": True,
+                "assignment_id": assignment_id,
+                "submission_id": submission.get("id"),
+                "submitted_at": submission.get("submitted_at"),
+                "workflow_state": submission.get("workflow_state")
+            }
+        
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error submitting assignment: {e}")
             return {
@@ -948,21 +1216,18 @@ class CanvasClient:
             else:
                 url = f"{self.base_url}/api/v1/courses/{course_id}/users/self/progress"
             
-            async with httpx.AsyncClient() as client:
-                headers = {"Authorization": f"Bearer {self.bearer_token}"}
-                response = await client.get(url, headers=headers)
-                response.raise_for_status()
-                
-                progress_data = response.json()
-                
-                logger.info(f"Successfully retrieved user progress for course {course_id}")
-                
-                return {
-                    "success": True,
-                    "course_id": course_id,
-                    "progress": progress_data
-                }
-                
+            response = await self._request("GET", url)
+            
+            progress_data = response.json()
+            
+            logger.info(f"Successfully retrieved user progress for course {course_id}")
+            
+            return {
+                "success": True,
+                "course_id": course_id,
+                "progress": progress_data
+            }
+        
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error getting user progress: {e}")
             return {
@@ -1,4 +1,5 @@
-from typing import Dict, List, Any, Optional
+import os
+from typing import Awaitable, Callable, Dict, List, Any, Optional
 import asyncio
 from loguru import logger
 from canvas_client import CanvasClient
@@ -15,13 +16,19 @@ class CanvasModuleService:
         self._course_cache: Dict[str, int] = {}  # subject_name -> course_id
         self._module_cache: Dict[int, List[Dict]] = {}  # course_id -> modules
         self._items_cache: Dict[str, List[Dict]] = {}  # "{course_id}_{module_id}" -> items
+        self._inflight: Dict[str, asyncio.Future] = {}  # cache key -> fetch already in progress
+        
+        # Maximum number of subjects enhanced concurrently
+        self.max_concurrent_subjects = int(os.getenv("CANVAS_ENHANCE_CONCURRENCY", "6"))
     
-    async def enhance_classwork_with_canvas_data(self, classwork: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    async def enhance_classwork_with_canvas_data(self, classwork: List[Dict[str, Any]],
+                                                 courses: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
         """
         Enhance classwork data with proper Canvas URLs and metadata following fixlinksanddata.md flow.
         
         Args:
             classwork: List of subject data from AI parsing (announcement payload)
+            courses: Course list if already fetched; fetched here when None
             
         Returns:
             Enhanced classwork with canvas_urls, completion_status, and lesson_api_urls
@@ -30,17 +37,29 @@ class CanvasModuleService:
             logger.info("🔄 Starting Canvas data enhancement following fixlinksanddata.md flow")
             
             # Step 1: Get all courses to match subjects to course IDs
-            logger.info("📚 Step 1: Fetching all courses for subject matching")
-            courses = await self.canvas_client.get_courses()
+            if courses is None:
+                logger.info("📚 Step 1: Fetching all courses for subject matching")
+                courses = await self.canvas_client.get_courses()
             course_map = self._build_course_map(courses)
             
-            # Step 2: Process each subject in classwork
-            enhanced_classwork = []
+            # Step 2: Process subjects concurrently, bounded by the scheduler limit
+            semaphore = asyncio.Semaphore(self.max_concurrent_subjects)
+            
+            async def enhance_subject(subject_data: Dict[str, Any]) -> Dict[str, Any]:
+                async with semaphore:
+                    logger.info(f"🎯 Processing subject: {subject_data.get('subject')}")
+                    try:
+                        return await self._enhance_subject_data(subject_data, course_map)
+                    except Exception as e:
+                        # Isolate the failure so the other subjects still get real URLs
+                        logger.error(f"❌ Failed to enhance subject '{subject_data.get('subject')}': {e}")
+                        return self._add_fallback_urls([subject_data])[0]
             
-            for subject_data in classwork:
-                logger.info(f"🎯 Processing subject: {subject_data.get('subject')}")
-                enhanced_subject = await self._enhance_subject_data(subject_data, course_map)
-                enhanced_classwork.append(enhanced_subject)
+            # gather preserves classwork order regardless of completion order
+            enhanced_classwork = await asyncio.gather(
+                *(enhance_subject(subject_data) for subject_data in classwork)
+            )
+            enhanced_classwork = list(enhanced_classwork)
             
             logger.info(f"✅ Canvas data enhancement complete for {len(enhanced_classwork)} subjects")
             return enhanced_classwork
@@ -216,6 +235,23 @@ class CanvasModuleService:
         
         return None
     
+    async def _fetch_once(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run a fetch, collapsing concurrent requests for the same key into one.
+        
+        Subjects that map to the same course or module await the fetch that is
+        already in flight instead of issuing a duplicate Canvas request.
+        """
+        if key in self._inflight:
+            return await asyncio.shield(self._inflight[key])
+        
+        future = asyncio.ensure_future(fetch())
+        self._inflight[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            self._inflight.pop(key, None)
+    
     async def _get_course_modules(self, course_id: int) -> List[Dict[str, Any]]:
         """
         Get modules for a course, with caching.
@@ -224,7 +260,10 @@ class CanvasModuleService:
             return self._module_cache[course_id]
         
         try:
-            modules = await self.canvas_client.get_course_modules(course_id)
+            modules = await self._fetch_once(
+                f"modules_{course_id}",
+                lambda: self.canvas_client.get_course_modules(course_id)
+            )
             self._module_cache[course_id] = modules
             logger.info(f"📦 Fetched {len(modules)} modules for course {course_id}")
             return modules
@@ -308,8 +347,18 @@ class CanvasModuleService:
         if cache_key in self._items_cache:
             return self._items_cache[cache_key]
         
+        # Modules are fetched with include[]=items, so reuse the embedded items
+        # when Canvas returned them instead of making another round-trip
+        for module in self._module_cache.get(course_id, []):
+            if module.get('id') == module_id and module.get('items') is not None:
+                self._items_cache[cache_key] = module['items']
+                return module['items']
+        
         try:
-            items = await self.canvas_client.get_module_items(course_id, module_id)
+            items = await self._fetch_once(
+                f"items_{cache_key}",
+                lambda: self.canvas_client.get_module_items(course_id, module_id)
+            )
             self._items_cache[cache_key] = items
             logger.info(f"📝 Fetched {len(items)} items for module {module_id} in course {course_id}")
             return items
@@ -0,0 +1,245 @@
+"""
+Rate-limit-aware admission of Canvas API requests.
+Canvas throttles each token with a leaky bucket and reports its state on
+every response (X-Rate-Limit-Remaining, X-Request-Cost). The scheduler
+mirrors that bucket locally, adapts how many requests run at once from the
+reported quota, and admits queued requests by priority so interactive lesson
+loads go ahead of background prefetch and sync work.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Request priorities, lower runs first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_SYNC = 1
+PRIORITY_PREFETCH = 2
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_SYNC: "sync", PRIORITY_PREFETCH: "prefetch"}
+
+# Priority of Canvas requests made from the current task; tasks started from
+# it (gather, create_task) inherit it
+request_priority: ContextVar[int] = ContextVar("canvas_request_priority", default=PRIORITY_INTERACTIVE)
+
+
+@contextmanager
+def canvas_priority(priority: int):
+    """
+    Run the Canvas requests made inside the block at the given priority.
+
+    Args:
+        priority: One of the PRIORITY_* constants
+    """
+    token = request_priority.set(priority)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+
+class CanvasRequestScheduler:
+    """
+    Priority queue of Canvas requests gated by an AIMD concurrency limit and a
+    local token bucket.
+
+    The bucket is resynchronised from X-Rate-Limit-Remaining on every
+    response and refills at Canvas's leak rate in between. The concurrency
+    limit grows by one request per round of successful responses and halves
+    when the reported quota drops below the low-water mark or Canvas answers
+    with a throttled 403. Requests below interactive priority are held back
+    while the quota is under the background reserve, leaving headroom for
+    lesson loads.
+    """
+
+    def __init__(self):
+        self.max_concurrency = int(os.getenv("CANVAS_MAX_CONCURRENCY", "8"))
+        self.bucket_capacity = float(os.getenv("CANVAS_RATE_LIMIT_CAPACITY", "700"))
+        self.refill_rate = float(os.getenv("CANVAS_RATE_LIMIT_REFILL_RATE", "10"))
+        self.low_water = float(os.getenv("CANVAS_RATE_LIMIT_LOW_WATER", "100"))
+        self.background_reserve = float(os.getenv("CANVAS_RATE_LIMIT_BACKGROUND_RESERVE", "200"))
+        self.throttle_retries = int(os.getenv("CANVAS_THROTTLE_RETRIES", "3"))
+        self.throttle_retry_delay = float(os.getenv("CANVAS_THROTTLE_RETRY_DELAY", "1.0"))
+
+        self.concurrency = float(self.max_concurrency)
+        self._in_flight = 0
+        self._tokens = self.bucket_capacity
+        self._refilled_at = time.monotonic()
+        self._estimated_cost = 1.0  # moving average of X-Request-Cost
+        self._last_decrease = 0.0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []  # heap of (priority, sequence, future)
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+        self.last_remaining: Optional[float] = None
+        self.stats = {"requests": 0, "queued": 0, "throttled": 0, "decreases": 0}
+        self.dispatched = {name: 0 for name in PRIORITY_NAMES.values()}
+
+    async def acquire(self, priority: Optional[int] = None):
+        """
+        Wait for a request slot.
+
+        Args:
+            priority: Request priority (defaults to the current task's priority)
+        """
+        priority = request_priority.get() if priority is None else priority
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self._dispatch()
+
+        if future.done():
+            return
+
+        self.stats["queued"] += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Hand the slot on if it was granted just before cancellation
+            if future.done() and not future.cancelled():
+                self._in_flight -= 1
+                self._tokens += self._estimated_cost
+            future.cancel()
+            self._dispatch()
+            raise
+
+    def release(self, response: Optional[httpx.Response]) -> bool:
+        """
+        Return a request slot and learn from the response's rate-limit headers.
+
+        Args:
+            response: Canvas response, or None if the request failed
+
+        Returns:
+            True if Canvas throttled the request and it should be retried
+        """
+        self._in_flight -= 1
+        self.stats["requests"] += 1
+        throttled = response is not None and self.is_throttled(response)
+
+        if response is not None:
+            self._observe(response)
+
+        if throttled:
+            self.stats["throttled"] += 1
+            if self.last_remaining is None:
+                self._tokens = 0.0
+            self._decrease()
+        elif self.last_remaining is not None and self.last_remaining < self.low_water:
+            self._decrease()
+        elif response is not None:
+            # Additive increase: about one extra slot per round of responses
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1 / self.concurrency)
+
+        self._dispatch()
+        return throttled
+
+    @staticmethod
+    def is_throttled(response: httpx.Response) -> bool:
+        """Check for Canvas's 403 Forbidden (Rate Limit Exceeded) response."""
+        return response.status_code == 403 and "rate limit exceeded" in response.text.lower()
+
+    def get_retry_delay(self, attempt: int) -> float:
+        """Jittered exponential backoff before retrying a throttled request."""
+        return self.throttle_retry_delay * (2 ** attempt) * random.uniform(0.5, 1.0)
+
+    def _observe(self, response: httpx.Response):
+        """Resynchronise the bucket from the response's rate-limit headers."""
+        cost = response.headers.get("X-Request-Cost")
+        remaining = response.headers.get("X-Rate-Limit-Remaining")
+
+        try:
+            if cost is not None:
+                self._estimated_cost = 0.8 * self._estimated_cost + 0.2 * float(cost)
+            if remaining is not None:
+                self.last_remaining = float(remaining)
+                self._tokens = min(self.bucket_capacity, self.last_remaining)
+                self._refilled_at = time.monotonic()
+        except ValueError:
+            logger.warning(f"Unparseable Canvas rate-limit headers: cost={cost!r} remaining={remaining!r}")
+
+    def _decrease(self):
+        """Halve the concurrency limit, at most once per second."""
+        now = time.monotonic()
+        if now - self._last_decrease < 1.0:
+            return
+
+        self._last_decrease = now
+        self.concurrency = max(1.0, self.concurrency / 2)
+        self.stats["decreases"] += 1
+        logger.warning(
+            f"Canvas quota low (remaining: {self.last_remaining}), "
+            f"reducing request concurrency to {int(self.concurrency)}"
+        )
+
+    def _refill(self):
+        """Credit the quota Canvas has leaked back since the last update."""
+        now = time.monotonic()
+        self._tokens = min(self.bucket_capacity, self._tokens + (now - self._refilled_at) * self.refill_rate)
+        self._refilled_at = now
+
+    def _dispatch(self):
+        """Grant slots to waiters in priority order while limits allow."""
+        while self._waiters:
+            priority, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)  # cancelled while waiting
+                continue
+
+            if self._in_flight >= int(self.concurrency):
+                return
+
+            self._refill()
+            needed = self._estimated_cost
+            if priority > PRIORITY_INTERACTIVE:
+                needed += self.background_reserve
+            if self._tokens < needed:
+                self._schedule_wakeup((needed - self._tokens) / self.refill_rate)
+                return
+
+            heapq.heappop(self._waiters)
+            self._tokens -= self._estimated_cost
+            self._in_flight += 1
+            name = PRIORITY_NAMES.get(priority, str(priority))
+            self.dispatched[name] = self.dispatched.get(name, 0) + 1
+            future.set_result(None)
+
+    def _schedule_wakeup(self, delay: float):
+        """Re-run dispatch once the bucket has refilled enough."""
+        if self._wakeup is not None:
+            return
+
+        def wakeup():
+            self._wakeup = None
+            self._dispatch()
+
+        self._wakeup = asyncio.get_running_loop().call_later(max(delay, 0.01), wakeup)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the current limits, quota estimate and counters."""
+        waiting = {name: 0 for name in PRIORITY_NAMES.values()}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                name = PRIORITY_NAMES.get(priority, str(priority))
+                waiting[name] = waiting.get(name, 0) + 1
+
+        return {
+            "concurrency_limit": int(self.concurrency),
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._in_flight,
+            "estimated_quota": round(self._tokens, 1),
+            "last_remaining": self.last_remaining,
+            "estimated_request_cost": round(self._estimated_cost, 2),
+            "waiting": waiting,
+            "dispatched": dict(self.dispatched),
+            **self.stats
+        }
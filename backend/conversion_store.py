@@ -0,0 +1,213 @@
+"""
+Content-addressed store of AI conversion results.
+Results are keyed by the hash of the converted HTML, the kind of conversion
+and a fingerprint of the prompt/model that produced them, so byte-identical
+content reached through another course, page slug or module item is only
+ever converted once.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import and_, bindparam, select
+from sqlalchemy.dialects.postgresql import insert
+
+from database import SessionLocal, engine
+from memory_cache import LRUCache
+from models import ContentConversion
+
+logger = logging.getLogger(__name__)
+
+
+class ConversionStore:
+    """
+    Conversion results in the content_conversions table, fronted by an
+    in-process LRU tier. Database access is best effort: a failed lookup is
+    treated as a miss and a failed write is only logged. Reuses are counted
+    in memory and written back in batches, so lookups stay read-only.
+    """
+
+    def __init__(self):
+        self._memory = LRUCache(
+            max_entries=int(os.getenv("CONVERSION_STORE_CACHE_SIZE", "512")),
+            ttl_seconds=float(os.getenv("CONVERSION_STORE_CACHE_TTL", "3600"))
+        )
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+        # (content_hash, kind, fingerprint) -> (reuses since the last flush, last reuse time)
+        self._pending_reuses: Dict[Tuple[str, str, str], Tuple[int, datetime]] = {}
+        self.flush_interval = float(os.getenv("CONVERSION_STORE_FLUSH_INTERVAL", "30"))
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self.reuse_flushes = 0
+        self.reuse_flush_errors = 0
+
+        table = ContentConversion.__table__
+        self._reuse_statement = table.update().where(
+            and_(
+                table.c.content_hash == bindparam("b_content_hash"),
+                table.c.kind == bindparam("b_kind"),
+                table.c.fingerprint == bindparam("b_fingerprint")
+            )
+        ).values(
+            use_count=table.c.use_count + bindparam("b_reuses"),
+            last_used_at=bindparam("b_last_used_at")
+        )
+
+    async def get(self, content_hash: str, kind: str, fingerprint: str) -> Optional[Any]:
+        """
+        Look up a stored conversion result.
+
+        Args:
+            content_hash: SHA-256 of the converted HTML
+            kind: Conversion kind, e.g. "components" or "lesson_content"
+            fingerprint: Fingerprint of the prompt and model used
+
+        Returns:
+            Stored result, or None if this content has not been converted
+        """
+        key = (content_hash, kind, fingerprint)
+        result = self._memory.get(key)
+
+        if result is None:
+            result = await self._load(content_hash, kind, fingerprint)
+            if result is not None:
+                self._memory.set(key, result)
+
+        if result is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        count, _ = self._pending_reuses.get(key, (0, None))
+        self._pending_reuses[key] = (count + 1, datetime.now())
+        logger.info(f"Reusing stored {kind} conversion for content {content_hash[:12]}")
+        return result
+
+    async def put(self, content_hash: str, kind: str, fingerprint: str, result: Any):
+        """
+        Store a successful conversion result.
+
+        Args:
+            content_hash: SHA-256 of the converted HTML
+            kind: Conversion kind
+            fingerprint: Fingerprint of the prompt and model used
+            result: JSON-serializable conversion result
+        """
+        self._memory.set((content_hash, kind, fingerprint), result)
+        self.stores += 1
+
+        try:
+            async with SessionLocal() as db:
+                statement = insert(ContentConversion).values(
+                    content_hash=content_hash,
+                    kind=kind,
+                    fingerprint=fingerprint,
+                    result=result
+                )
+                await db.execute(statement.on_conflict_do_nothing(
+                    index_elements=[ContentConversion.content_hash, ContentConversion.kind, ContentConversion.fingerprint]
+                ))
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"Failed to store {kind} conversion for content {content_hash[:12]}: {e}")
+
+    async def flush_reuses(self) -> int:
+        """
+        Add the buffered reuse counts to the stored rows in a single executemany UPDATE.
+
+        Returns:
+            Number of rows written
+        """
+        async with self._flush_lock:
+            if not self._pending_reuses:
+                return 0
+
+            pending, self._pending_reuses = self._pending_reuses, {}
+            rows = [
+                {
+                    "b_content_hash": content_hash,
+                    "b_kind": kind,
+                    "b_fingerprint": fingerprint,
+                    "b_reuses": reuses,
+                    "b_last_used_at": last_used_at
+                }
+                for (content_hash, kind, fingerprint), (reuses, last_used_at) in pending.items()
+            ]
+
+            try:
+                async with engine.begin() as conn:
+                    await conn.execute(self._reuse_statement, rows)
+            except Exception as e:
+                # Fold the counts back in for the next flush
+                for key, (reuses, last_used_at) in pending.items():
+                    count, newer_used_at = self._pending_reuses.get(key, (0, last_used_at))
+                    self._pending_reuses[key] = (count + reuses, newer_used_at)
+                self.reuse_flush_errors += 1
+                logger.error(f"Failed to flush {len(rows)} conversion reuse counts: {e}")
+                return 0
+
+            self.reuse_flushes += 1
+            return len(rows)
+
+    async def _run(self):
+        """Flush reuse counts every flush interval until cancelled."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush_reuses()
+
+    def start(self):
+        """Start the periodic reuse count flush task."""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the periodic flush task and write out any pending reuse counts."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+
+        await self.flush_reuses()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters for the store and its memory tier."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "pending_reuses": len(self._pending_reuses),
+            "reuse_flushes": self.reuse_flushes,
+            "reuse_flush_errors": self.reuse_flush_errors,
+            "memory": self._memory.get_stats()
+        }
+
+    async def _load(self, content_hash: str, kind: str, fingerprint: str) -> Optional[Any]:
+        """Load a result from the database."""
+        try:
+            async with SessionLocal() as db:
+                row = (await db.execute(
+                    select(ContentConversion.result).where(
+                        ContentConversion.content_hash == content_hash,
+                        ContentConversion.kind == kind,
+                        ContentConversion.fingerprint == fingerprint
+                    )
+                )).first()
+                return row.result if row else None
+        except Exception as e:
+            logger.warning(f"Conversion store lookup failed for content {content_hash[:12]}: {e}")
+            return None
+
+# Singleton instance for use throughout the application
+conversion_store = ConversionStore()
@@ -3,18 +3,39 @@ Service for managing AI-converted Canvas page storage and caching.
 Handles persistence, retrieval, and cache invalidation.
 """
 
+import asyncio
 import hashlib
 import json
+import os
 import time
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
-from sqlalchemy.orm import Session
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from models import ConvertedCanvasPage
 from ai_service import AIService
+from memory_cache import LRUCache
+from access_time_recorder import access_time_recorder
+from single_flight import SingleFlight, StreamFeed, advisory_lock
+from conversion_store import conversion_store
+from database import SessionLocal
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Memory tier in front of the converted_canvas_pages table, keyed by
+# (course_id, page_slug, content_hash). Shared across service instances.
+converted_page_memory_cache = LRUCache(
+    max_entries=int(os.getenv("CONVERTED_PAGE_CACHE_SIZE", "256")),
+    ttl_seconds=float(os.getenv("CONVERTED_PAGE_CACHE_TTL", "3600"))
+)
+
+# Coalesces concurrent conversions of the same (course_id, page_slug, content_hash)
+conversion_flight = SingleFlight()
+
+# Component feeds of the streamed conversions in conversion_flight, by the same key
+conversion_feeds: Dict[Tuple[int, str, str], StreamFeed] = {}
+
 class ConvertedPageService:
     def __init__(self, ai_service: AIService):
         self.ai_service = ai_service
@@ -23,9 +44,112 @@ class ConvertedPageService:
         """Generate SHA-256 hash of HTML content for change detection."""
         return hashlib.sha256(html_content.encode('utf-8')).hexdigest()
 
-    def get_converted_page(
+    async def _find_page(
+        self,
+        db: AsyncSession,
+        course_id: int,
+        page_slug: str
+    ) -> Optional[ConvertedCanvasPage]:
+        """Look up the stored conversion row for a page."""
+        result = await db.execute(
+            select(ConvertedCanvasPage).where(
+                ConvertedCanvasPage.course_id == course_id,
+                ConvertedCanvasPage.page_slug == page_slug
+            )
+        )
+        return result.scalars().first()
+
+    def get_memory_cached_page(
+        self,
+        course_id: int,
+        page_slug: str,
+        content_hash: str,
+        canvas_updated_at: Optional[str] = None
+    ) -> Optional[Dict]:
+        """
+        Get a converted page from the in-process memory tier.
+        
+        Args:
+            course_id: Canvas course ID
+            page_slug: Canvas page slug
+            content_hash: Hash of the current HTML body
+            canvas_updated_at: Canvas-reported last update time
+            
+        Returns:
+            Snapshot dict of the converted page, or None on a miss
+        """
+        key = (course_id, page_slug, content_hash)
+        snapshot = converted_page_memory_cache.get(key)
+        
+        if snapshot is None:
+            return None
+        
+        if self._is_newer(canvas_updated_at, snapshot['canvas_updated_at']):
+            converted_page_memory_cache.invalidate(key)
+            return None
+        
+        snapshot['last_accessed_at'] = access_time_recorder.touch(course_id, page_slug)
+        return snapshot
+
+    async def has_current_conversion(self, course_id: int, page_slug: str, content_hash: str) -> bool:
+        """
+        Check the memory tier, then the database, for a successful conversion
+        of this content. Unlike the read paths, no page access is recorded.
+        
+        Args:
+            course_id: Canvas course ID
+            page_slug: Canvas page slug
+            content_hash: Hash of the current HTML body
+            
+        Returns:
+            True if a conversion of this content is stored
+        """
+        if converted_page_memory_cache.get((course_id, page_slug, content_hash)) is not None:
+            return True
+        
+        async with SessionLocal() as db:
+            result = await db.execute(
+                select(ConvertedCanvasPage.id).where(
+                    ConvertedCanvasPage.course_id == course_id,
+                    ConvertedCanvasPage.page_slug == page_slug,
+                    ConvertedCanvasPage.content_hash == content_hash,
+                    ConvertedCanvasPage.conversion_success.is_(True)
+                )
+            )
+            return result.first() is not None
+
+    def remember_page(self, converted_page: ConvertedCanvasPage):
+        """Store a successful conversion in the memory tier."""
+        if not converted_page.conversion_success:
+            return
+        
+        converted_page_memory_cache.set(
+            (converted_page.course_id, converted_page.page_slug, converted_page.content_hash),
+            {
+                'page_title': converted_page.page_title,
+                'page_id': converted_page.page_id,
+                'ai_components': converted_page.ai_components,
+                'processing_info': converted_page.processing_info or {},
+                'component_count': converted_page.component_count,
+                'canvas_updated_at': converted_page.canvas_updated_at,
+                'first_converted_at': converted_page.first_converted_at,
+                'last_accessed_at': converted_page.last_accessed_at
+            }
+        )
+
+    def forget_page(self, course_id: int, page_slug: str):
+        """Drop every memory-tier entry for a page, whatever its content hash."""
+        converted_page_memory_cache.invalidate_where(
+            lambda key: key[0] == course_id and key[1] == page_slug
+        )
+
+    def get_cache_stats(self) -> Dict:
+        """Get memory-tier hit/miss/eviction counters."""
+        return converted_page_memory_cache.get_stats()
+
+    async def get_converted_page(
         self, 
-        db: Session, 
+        db: AsyncSession, 
         course_id: int, 
         page_slug: str,
         force_refresh: bool = False
@@ -45,22 +169,19 @@ class ConvertedPageService:
         if force_refresh:
             return None
             
-        converted_page = db.query(ConvertedCanvasPage).filter(
-            ConvertedCanvasPage.course_id == course_id,
-            ConvertedCanvasPage.page_slug == page_slug
-        ).first()
+        converted_page = await self._find_page(db, course_id, page_slug)
         
         if converted_page:
-            # Update last accessed timestamp
-            converted_page.last_accessed_at = datetime.now()
-            db.commit()
+            # Record the access; the timestamp is written back in batches
+            access_time_recorder.touch(course_id, page_slug)
+            self.remember_page(converted_page)
             logger.info(f"Found cached converted page: {course_id}/{page_slug}")
             
         return converted_page
 
-    def save_converted_page(
+    async def save_converted_page(
         self,
-        db: Session,
+        db: AsyncSession,
         course_id: int,
         page_slug: str,
         canvas_data: Dict,
@@ -86,12 +207,10 @@ class ConvertedPageService:
             ConvertedCanvasPage: Saved database record
         """
         content_hash = self.get_content_hash(raw_html_body)
+        conversion_fingerprint = self.ai_service.get_conversion_fingerprint("components")
         
         # Check if page already exists
-        existing_page = db.query(ConvertedCanvasPage).filter(
-            ConvertedCanvasPage.course_id == course_id,
-            ConvertedCanvasPage.page_slug == page_slug
-        ).first()
+        existing_page = await self._find_page(db, course_id, page_slug)
         
         if existing_page:
             # Update existing record
@@ -110,6 +229,7 @@ class ConvertedPageService:
             existing_page.component_count = len(ai_components)
             existing_page.conversion_success = True
             existing_page.conversion_error = None
+            existing_page.conversion_fingerprint = conversion_fingerprint
             
             converted_page = existing_page
             logger.info(f"Updated cached converted page: {course_id}/{page_slug}")
@@ -130,19 +250,22 @@ class ConvertedPageService:
                 ) if canvas_data.get('updated_at') else datetime.now(),
                 conversion_time_ms=conversion_time_ms,
                 component_count=len(ai_components),
-                conversion_success=True
+                conversion_success=True,
+                conversion_fingerprint=conversion_fingerprint
             )
             
             db.add(converted_page)
             logger.info(f"Saved new converted page: {course_id}/{page_slug}")
         
-        db.commit()
-        db.refresh(converted_page)
+        await db.commit()
+        await db.refresh(converted_page)
+        self.forget_page(course_id, page_slug)
+        self.remember_page(converted_page)
         return converted_page
 
-    def save_conversion_error(
+    async def save_conversion_error(
         self,
-        db: Session,
+        db: AsyncSession,
         course_id: int,
         page_slug: str,
         canvas_data: Dict,
@@ -166,10 +289,7 @@ class ConvertedPageService:
         content_hash = self.get_content_hash(raw_html_body)
         
         # Check if page already exists
-        existing_page = db.query(ConvertedCanvasPage).filter(
-            ConvertedCanvasPage.course_id == course_id,
-            ConvertedCanvasPage.page_slug == page_slug
-        ).first()
+        existing_page = await self._find_page(db, course_id, page_slug)
         
         if existing_page:
             # Update with error info
@@ -199,11 +319,428 @@ class ConvertedPageService:
             )
             db.add(converted_page)
         
-        db.commit()
-        db.refresh(converted_page)
+        await db.commit()
+        await db.refresh(converted_page)
+        self.forget_page(course_id, page_slug)
         logger.warning(f"Saved conversion error for {course_id}/{page_slug}: {error_message}")
         return converted_page
 
+    async def convert_page(
+        self,
+        course_id: int,
+        page_slug: str,
+        canvas_data: Dict,
+        html_body: str,
+        content_hash: Optional[str] = None,
+        force_refresh: bool = False
+    ) -> Dict:
+        """
+        Convert a page with AI and store the result, coalescing duplicate work.
+        
+        Concurrent calls for the same (course_id, page_slug, content_hash) in this
+        process share a single conversion. Across workers an advisory lock
+        serializes conversions of the same content, and the stored row is
+        re-checked once the lock is held so a page another worker has just
+        converted is not converted again.
+        
+        Args:
+            course_id: Canvas course ID
+            page_slug: Canvas page slug
+            canvas_data: Original Canvas page data
+            html_body: HTML content to convert
+            content_hash: Precomputed hash of html_body, if known
+            force_refresh: If True, convert even if a matching conversion is stored
+            
+        Returns:
+            Dict with success, components and processing_info, or error details
+        """
+        content_hash = content_hash or self.get_content_hash(html_body)
+        
+        return await conversion_flight.do(
+            (course_id, page_slug, content_hash),
+            lambda: self._convert_page_exclusive(
+                course_id, page_slug, canvas_data, html_body, content_hash, force_refresh
+            )
+        )
+
+    async def _convert_page_exclusive(
+        self,
+        course_id: int,
+        page_slug: str,
+        canvas_data: Dict,
+        html_body: str,
+        content_hash: str,
+        force_refresh: bool
+    ) -> Dict:
+        """
+        Run one conversion under the cross-worker lock.
+        
+        Sessions are only opened around the lookup and the save, so no
+        database transaction is held open during the LLM call.
+        """
+        async with advisory_lock(f"convert:{course_id}:{page_slug}:{content_hash}"):
+            if not force_refresh:
+                async with SessionLocal() as db:
+                    existing_page = await self._find_page(db, course_id, page_slug)
+                if (existing_page and existing_page.conversion_success
+                        and existing_page.content_hash == content_hash):
+                    logger.info(f"Page {course_id}/{page_slug} was converted while waiting for the lock")
+                    self.remember_page(existing_page)
+                    return {
+                        "success": True,
+                        "components": existing_page.ai_components,
+                        "processing_info": existing_page.processing_info or {}
+                    }
+            
+            conversion_start = time.time()
+            logger.info(f"Converting HTML content ({len(html_body)} chars) to structured components")
+            
+            try:
+                components, reused = await self._convert_components(html_body, content_hash)
+            except Exception as ai_error:
+                # Save conversion error for debugging
+                logger.error(f"AI conversion failed: {ai_error}")
+                conversion_time_ms = int((time.time() - conversion_start) * 1000)
+                
+                async with SessionLocal() as db:
+                    await self.save_conversion_error(
+                        db=db,
+                        course_id=course_id,
+                        page_slug=page_slug,
+                        canvas_data=canvas_data,
+                        error_message=str(ai_error),
+                        raw_html_body=html_body
+                    )
+                
+                return {
+                    "success": False,
+                    "error": str(ai_error),
+                    "conversion_time_ms": conversion_time_ms
+                }
+            
+            conversion_time_ms = int((time.time() - conversion_start) * 1000)
+            logger.info(f"Successfully converted to {len(components)} components in {conversion_time_ms}ms")
+            
+            processing_info = {
+                "status": "success",
+                "components_count": len(components),
+                "original_html_length": len(html_body),
+                "conversion_time_ms": conversion_time_ms,
+                "cached": True,
+                "reused_conversion": reused
+            }
+            
+            async with SessionLocal() as db:
+                await self.save_converted_page(
+                    db=db,
+                    course_id=course_id,
+                    page_slug=page_slug,
+                    canvas_data=canvas_data,
+                    ai_components=components,
+                    processing_info=processing_info,
+                    conversion_time_ms=conversion_time_ms,
+                    raw_html_body=html_body
+                )
+            
+            return {
+                "success": True,
+                "components": components,
+                "processing_info": processing_info
+            }
+
+    async def stream_convert_page(
+        self,
+        course_id: int,
+        page_slug: str,
+        canvas_data: Dict,
+        html_body: str,
+        content_hash: Optional[str] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Convert a page with AI, yielding components as they are produced, and
+        store the full result once the conversion completes.
+        
+        The conversion runs as the shared conversion_flight call for its
+        content, under the same advisory lock as convert_page, in a task of
+        its own: concurrent streams follow its output, and it still finishes
+        and is stored if the client disconnects. If a non-streaming
+        conversion of the same content is already running, its result is
+        awaited and replayed.
+        
+        Args:
+            course_id: Canvas course ID
+            page_slug: Canvas page slug
+            canvas_data: Original Canvas page data
+            html_body: HTML content to convert
+            content_hash: Precomputed hash of html_body, if known
+            
+        Yields:
+            {"event": "component", "index", "component"} for each component,
+            then {"event": "done", "processing_info"} or
+            {"event": "error", "message", "conversion_time_ms"}
+        """
+        content_hash = content_hash or self.get_content_hash(html_body)
+        key = (course_id, page_slug, content_hash)
+        
+        def start_streaming():
+            feed = StreamFeed()
+            conversion_feeds[key] = feed
+            return self._stream_convert_exclusive(course_id, page_slug, canvas_data, html_body, content_hash, feed)
+        
+        conversion = conversion_flight.start(key, start_streaming)
+        feed = conversion_feeds.get(key)
+        
+        index = 0
+        if feed is not None:
+            async for component in feed.subscribe():
+                yield {"event": "component", "index": index, "component": component}
+                index += 1
+        
+        result = await asyncio.shield(conversion)
+        if not result["success"]:
+            yield {"event": "error", "message": result["error"], "conversion_time_ms": result["conversion_time_ms"]}
+            return
+        
+        for component in result["components"][index:]:
+            yield {"event": "component", "index": index, "component": component}
+            index += 1
+        yield {"event": "done", "processing_info": result["processing_info"]}
+
+    async def _stream_convert_exclusive(
+        self,
+        course_id: int,
+        page_slug: str,
+        canvas_data: Dict,
+        html_body: str,
+        content_hash: str,
+        feed: StreamFeed
+    ) -> Dict:
+        """
+        Run one streamed conversion under the cross-worker lock, publishing
+        components to feed as they are produced.
+        
+        Returns:
+            The same result dict as _convert_page_exclusive
+        """
+        try:
+            async with advisory_lock(f"convert:{course_id}:{page_slug}:{content_hash}"):
+                async with SessionLocal() as db:
+                    existing_page = await self._find_page(db, course_id, page_slug)
+                if (existing_page and existing_page.conversion_success
+                        and existing_page.content_hash == content_hash):
+                    logger.info(f"Page {course_id}/{page_slug} was converted while waiting for the lock")
+                    self.remember_page(existing_page)
+                    for component in existing_page.ai_components:
+                        feed.publish(component)
+                    return {
+                        "success": True,
+                        "components": existing_page.ai_components,
+                        "processing_info": existing_page.processing_info or {}
+                    }
+                
+                conversion_start = time.time()
+                logger.info(f"Streaming conversion of HTML content ({len(html_body)} chars) to structured components")
+                
+                fingerprint = self.ai_service.get_conversion_fingerprint("components")
+                stored_components = await conversion_store.get(content_hash, "components", fingerprint)
+                
+                try:
+                    if stored_components is not None:
+                        for component in stored_components:
+                            feed.publish(component)
+                    else:
+                        async for component in self.ai_service.stream_html_to_components(html_body):
+                            feed.publish(component)
+                except Exception as ai_error:
+                    logger.error(f"AI conversion failed: {ai_error}")
+                    conversion_time_ms = int((time.time() - conversion_start) * 1000)
+                    
+                    async with SessionLocal() as db:
+                        await self.save_conversion_error(
+                            db=db,
+                            course_id=course_id,
+                            page_slug=page_slug,
+                            canvas_data=canvas_data,
+                            error_message=str(ai_error),
+                            raw_html_body=html_body
+                        )
+                    
+                    return {
+                        "success": False,
+                        "error": str(ai_error),
+                        "conversion_time_ms": conversion_time_ms
+                    }
+                
+                components = list(feed.items)
+                conversion_time_ms = int((time.time() - conversion_start) * 1000)
+                logger.info(f"Streamed {len(components)} components in {conversion_time_ms}ms")
+                
+                if stored_components is None:
+                    await conversion_store.put(content_hash, "components", fingerprint, components)
+                
+                processing_info = {
+                    "status": "success",
+                    "components_count": len(components),
+                    "original_html_length": len(html_body),
+                    "conversion_time_ms": conversion_time_ms,
+                    "cached": True,
+                    "streamed": True,
+                    "reused_conversion": stored_components is not None
+                }
+                
+                # Subscribers already have every component, so a failed save is only logged
+                try:
+                    async with SessionLocal() as db:
+                        await self.save_converted_page(
+                            db=db,
+                            course_id=course_id,
+                            page_slug=page_slug,
+                            canvas_data=canvas_data,
+                            ai_components=components,
+                            processing_info=processing_info,
+                            conversion_time_ms=conversion_time_ms,
+                            raw_html_body=html_body
+                        )
+                except Exception as e:
+                    logger.error(f"Failed to save streamed conversion for {course_id}/{page_slug}: {e}")
+                
+                return {
+                    "success": True,
+                    "components": components,
+                    "processing_info": processing_info
+                }
+        finally:
+            feed.finish()
+            conversion_feeds.pop((course_id, page_slug, content_hash), None)
+
+    async def upgrade_conversion(self, course_id: int, page_slug: str, content_hash: str) -> bool:
+        """
+        Re-convert a stored page with the current prompt and model.
+        
+        The upgrade runs as the conversion_flight call for the stored content,
+        under the same advisory lock as convert_page, so it never races a
+        live conversion of that content. The stored HTML is used, so Canvas is
+        not contacted, and the existing components are kept if the new
+        conversion fails or the page changed in the meantime.
+        
+        Args:
+            course_id: Canvas course ID
+            page_slug: Canvas page slug
+            content_hash: Hash of the stored HTML the upgrade applies to
+            
+        Returns:
+            True if the stored page now has a current conversion of that content
+        """
+        result = await conversion_flight.do(
+            (course_id, page_slug, content_hash),
+            lambda: self._upgrade_conversion_exclusive(course_id, page_slug, content_hash)
+        )
+        return result["success"]
+
+    async def _upgrade_conversion_exclusive(self, course_id: int, page_slug: str, content_hash: str) -> Dict:
+        """
+        Run one upgrade under the cross-worker lock, with a session only
+        around the lookup and the save.
+        
+        Returns:
+            The same result dict as _convert_page_exclusive
+        """
+        async with advisory_lock(f"convert:{course_id}:{page_slug}:{content_hash}"):
+            async with SessionLocal() as db:
+                converted_page = await self._find_page(db, course_id, page_slug)
+            
+            if (converted_page is None or not converted_page.conversion_success
+                    or converted_page.content_hash != content_hash):
+                logger.info(f"Skipping upgrade of {course_id}/{page_slug}: the stored page changed")
+                return {"success": False, "error": "Stored page changed before the upgrade", "conversion_time_ms": 0}
+            
+            fingerprint = self.ai_service.get_conversion_fingerprint("components")
+            if converted_page.conversion_fingerprint == fingerprint:
+                # Converted with the current prompt and model while waiting for the lock
+                return {
+                    "success": True,
+                    "components": converted_page.ai_components,
+                    "processing_info": converted_page.processing_info or {}
+                }
+            
+            html_body = converted_page.raw_html_body or ""
+            conversion_start = time.time()
+            
+            try:
+                components, reused = await self._convert_components(html_body, content_hash)
+            except Exception as e:
+                logger.warning(f"Re-conversion failed for {course_id}/{page_slug}: {e}")
+                return {"success": False, "error": str(e), "conversion_time_ms": int((time.time() - conversion_start) * 1000)}
+            
+            conversion_time_ms = int((time.time() - conversion_start) * 1000)
+            processing_info = {
+                **(converted_page.processing_info or {}),
+                "components_count": len(components),
+                "conversion_time_ms": conversion_time_ms,
+                "reused_conversion": reused,
+                "upgraded_at": datetime.now().isoformat()
+            }
+            
+            # Only applies if the row still holds the content that was converted
+            async with SessionLocal() as db:
+                result = await db.execute(
+                    update(ConvertedCanvasPage).where(
+                        ConvertedCanvasPage.id == converted_page.id,
+                        ConvertedCanvasPage.content_hash == content_hash,
+                        ConvertedCanvasPage.conversion_success.is_(True)
+                    ).values(
+                        ai_components=components,
+                        component_count=len(components),
+                        conversion_time_ms=conversion_time_ms,
+                        conversion_fingerprint=fingerprint,
+                        processing_info=processing_info
+                    )
+                )
+                await db.commit()
+            
+            if not result.rowcount:
+                logger.info(f"Discarding upgrade of {course_id}/{page_slug}: the stored page changed")
+                return {"success": False, "error": "Stored page changed during the upgrade", "conversion_time_ms": conversion_time_ms}
+            
+            converted_page.ai_components = components
+            converted_page.component_count = len(components)
+            converted_page.conversion_time_ms = conversion_time_ms
+            converted_page.conversion_fingerprint = fingerprint
+            converted_page.processing_info = processing_info
+            self.forget_page(course_id, page_slug)
+            self.remember_page(converted_page)
+            logger.info(f"Upgraded conversion of {course_id}/{page_slug}")
+            
+            return {
+                "success": True,
+                "components": components,
+                "processing_info": processing_info
+            }
+
+    async def _convert_components(self, html_body: str, content_hash: str) -> Tuple[List[Dict], bool]:
+        """
+        Convert HTML to components, reusing the stored result for identical content.
+        
+        Args:
+            html_body: HTML content to convert
+            content_hash: Hash of html_body
+            
+        Returns:
+            Tuple of (components, whether a stored conversion was reused)
+        """
+        fingerprint = self.ai_service.get_conversion_fingerprint("components")
+        components = await conversion_store.get(content_hash, "components", fingerprint)
+        if components is not None:
+            return components, True
+        
+        components = await self.ai_service.convert_html_to_components(html_body)
+        await conversion_store.put(content_hash, "components", fingerprint, components)
+        return components, False
+
+    def get_conversion_stats(self) -> Dict:
+        """Get in-flight and coalesced conversion counters."""
+        return conversion_flight.get_stats()
+
     def is_content_changed(
         self, 
         cached_page: ConvertedCanvasPage, 
@@ -228,22 +765,29 @@ class ConvertedPageService:
             return True
             
         # Check Canvas updated timestamp if available
-        if canvas_updated_at and cached_page.canvas_updated_at:
-            try:
-                current_updated = datetime.fromisoformat(
-                    canvas_updated_at.replace('Z', '+00:00')
-                )
-                if current_updated > cached_page.canvas_updated_at:
-                    logger.info(f"Canvas timestamp newer for {cached_page.course_id}/{cached_page.page_slug}")
-                    return True
-            except (ValueError, TypeError) as e:
-                logger.warning(f"Failed to parse Canvas timestamp: {e}")
+        if self._is_newer(canvas_updated_at, cached_page.canvas_updated_at):
+            logger.info(f"Canvas timestamp newer for {cached_page.course_id}/{cached_page.page_slug}")
+            return True
         
         return False
 
-    def get_conversion_status(
+    def _is_newer(self, canvas_updated_at: Optional[str], cached_updated_at: Optional[datetime]) -> bool:
+        """Check whether a Canvas-reported update time is newer than the cached one."""
+        if not canvas_updated_at or not cached_updated_at:
+            return False
+        
+        try:
+            current_updated = datetime.fromisoformat(
+                canvas_updated_at.replace('Z', '+00:00')
+            )
+            return current_updated > cached_updated_at
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Failed to parse Canvas timestamp: {e}")
+            return False
+
+    async def get_conversion_status(
         self,
-        db: Session,
+        db: AsyncSession,
         course_id: int,
         page_slug: str
     ) -> Dict:
@@ -258,10 +802,7 @@ class ConvertedPageService:
         Returns:
             Dict with conversion status information
         """
-        converted_page = db.query(ConvertedCanvasPage).filter(
-            ConvertedCanvasPage.course_id == course_id,
-            ConvertedCanvasPage.page_slug == page_slug
-        ).first()
+        converted_page = await self._find_page(db, course_id, page_slug)
         
         if not converted_page:
             return {
@@ -0,0 +1,115 @@
+"""
+Structural HTML chunking for LLM conversion.
+Splits large Canvas page HTML at headings and sections so each chunk can be
+converted independently and the results concatenated in page order.
+"""
+
+import re
+from typing import List
+
+# Structural boundaries, preferred in this order
+SECTION_BOUNDARY = re.compile(r"<(?:h[1-6]|section|hr)\b", re.IGNORECASE)
+BLOCK_BOUNDARY = re.compile(r"</(?:p|div|ul|ol|table|blockquote|li)\s*>", re.IGNORECASE)
+
+# Bump when a change alters where pages are split, so stored conversions of
+# chunked pages are picked up for upgrade
+CHUNKER_VERSION = 1
+
+
+def _split_at(html: str, pattern: re.Pattern, before: bool) -> List[str]:
+    """Split html at every match of pattern, keeping the matched tag."""
+    positions = [match.start() if before else match.end() for match in pattern.finditer(html)]
+    positions = [position for position in positions if 0 < position < len(html)]
+
+    pieces = []
+    start = 0
+    for position in positions:
+        pieces.append(html[start:position])
+        start = position
+    pieces.append(html[start:])
+    return [piece for piece in pieces if piece]
+
+
+def _split_long(block: str, max_chars: int) -> List[str]:
+    """
+    Split a block with no structural boundaries into pieces of at most max_chars.
+
+    Each cut backs off to just before the tag it would land in, or else to
+    the last whitespace or tag end, so no tag or attribute is split. A single
+    tag longer than max_chars (such as an inline data URI) is kept whole.
+    """
+    pieces = []
+    start = 0
+    while len(block) - start > max_chars:
+        window = block[start:start + max_chars]
+        tag_start = window.rfind("<")
+        tag_end = window.rfind(">")
+
+        if tag_start > tag_end:
+            # The limit falls inside a tag: cut before it, or after it if it is the whole window
+            cut = tag_start if tag_start > 0 else block.find(">", start + max_chars) + 1 - start
+            if cut <= 0:
+                break
+        else:
+            space = max(window.rfind(" "), window.rfind("\n"))
+            if space > tag_end:
+                cut = space + 1
+            elif tag_end >= 0:
+                cut = tag_end + 1
+            else:
+                cut = max_chars
+
+        pieces.append(block[start:start + cut])
+        start += cut
+
+    pieces.append(block[start:])
+    return pieces
+
+
+def _pack(pieces: List[str], max_chars: int) -> List[str]:
+    """Greedily join consecutive pieces into chunks of at most max_chars."""
+    chunks = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + len(piece) > max_chars:
+            chunks.append(current)
+            current = ""
+        current += piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_html_into_chunks(html_content: str, max_chars: int) -> List[str]:
+    """
+    Split HTML into chunks of roughly max_chars at structural boundaries.
+
+    Chunks start at headings, sections and horizontal rules. A section that
+    is still too large is split after block-level closing tags, and only as
+    a last resort between tags or words. Joining the chunks reproduces the input.
+
+    Args:
+        html_content: Raw HTML content
+        max_chars: Target maximum chunk length
+
+    Returns:
+        List of HTML chunks in document order
+    """
+    if not html_content:
+        return []
+    if max_chars <= 0 or len(html_content) <= max_chars:
+        return [html_content]
+
+    pieces = []
+    for section in _split_at(html_content, SECTION_BOUNDARY, before=True):
+        if len(section) <= max_chars:
+            pieces.append(section)
+            continue
+
+        for block in _split_at(section, BLOCK_BOUNDARY, before=False):
+            if len(block) <= max_chars:
+                pieces.append(block)
+            else:
+                pieces.extend(_split_long(block, max_chars))
+
+    return _pack(pieces, max_chars)
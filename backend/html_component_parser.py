@@ -0,0 +1,299 @@
+"""
+Deterministic Canvas HTML to lesson component parser.
+Emits the same component schema as AIService.convert_html_to_components
+(header, paragraph, video, resource_list, instructions, quiz_link) for the
+simple page layouts most lessons use, together with a confidence score so
+callers can fall back to the LLM for pages it does not understand.
+"""
+
+import re
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Tuple
+
+HEADER_TAGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+LIST_TAGS = {"ol", "ul"}
+SKIPPED_TAGS = {"script", "style", "noscript", "template"}
+# Block containers whose boundaries end a run of loose text
+BLOCK_TAGS = {"div", "section", "article", "blockquote", "hr", "header", "footer", "main", "aside", "figure"}
+# Elements the component schema cannot represent, with the confidence
+# multiplier applied for each occurrence
+UNSUPPORTED_TAGS = {
+    "table": 0.5,
+    "form": 0.6,
+    "object": 0.6,
+    "embed": 0.6,
+    "video": 0.6,
+    "audio": 0.6,
+    "math": 0.8,
+    "svg": 0.9,
+    "img": 0.95
+}
+# Unsupported elements whose text cannot be captured as components
+OPAQUE_TAGS = {"table", "form", "math", "svg"}
+
+FILE_EXTENSIONS = (".pdf", ".doc", ".docx", ".ppt", ".pptx", ".xls", ".xlsx", ".zip")
+WHITESPACE = re.compile(r"\s+")
+
+# Bump when a change alters the components produced for the same HTML, so
+# conversions stored from the fast path are picked up for upgrade
+PARSER_VERSION = 1
+
+
+def _clean(text: str) -> str:
+    return WHITESPACE.sub(" ", text).strip()
+
+
+def classify_link(href: str, title: str) -> Tuple[str, str]:
+    """
+    Classify a link for the component schema.
+
+    Args:
+        href: Link URL
+        title: Link text
+
+    Returns:
+        Tuple of (kind, resource_type) where kind is "quiz", "file" or "link"
+    """
+    lowered_href = href.lower().split("?")[0]
+    lowered_title = title.lower()
+
+    if "/quizzes/" in lowered_href or "/assessments/" in lowered_href or "quiz" in lowered_title:
+        return "quiz", "quiz"
+
+    if "/files/" in lowered_href or lowered_href.endswith(FILE_EXTENSIONS):
+        if lowered_href.endswith(".pdf") or "pdf" in lowered_title:
+            return "file", "pdf"
+        return "file", "file"
+
+    return "link", "link"
+
+
+class _ComponentBuilder(HTMLParser):
+    """Incremental HTML parser that builds lesson components as tags close."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.components: List[Dict[str, Any]] = []
+        self._pending_resources: List[Dict[str, str]] = []
+
+        self._skip_depth = 0
+        self._opaque_depth = 0
+        self._block: Optional[Tuple[str, int]] = None  # ("header", level) or ("paragraph", 0)
+        self._text: List[str] = []
+        self._block_links: List[Dict[str, str]] = []
+        self._link: Optional[Dict[str, Any]] = None
+
+        self._list_depth = 0
+        self._list_items: List[Tuple[str, List[Dict[str, str]]]] = []
+        self._item_text: Optional[List[str]] = None
+        self._item_links: List[Dict[str, str]] = []
+
+        self.total_chars = 0
+        self.captured_chars = 0
+        self.confidence_multiplier = 1.0
+
+    # Emission helpers
+
+    def _emit(self, component: Dict[str, Any]):
+        self._flush_resources()
+        self.components.append(component)
+
+    def _flush_resources(self):
+        if self._pending_resources:
+            self.components.append({"type": "resource_list", "items": self._pending_resources})
+            self._pending_resources = []
+
+    def _emit_links(self, links: List[Dict[str, str]], include_plain: bool):
+        for link in links:
+            kind, resource_type = classify_link(link["url"], link["title"])
+            if kind == "quiz":
+                self._emit({"type": "quiz_link", "title": link["title"], "url": link["url"]})
+            elif kind == "file" or include_plain:
+                self._pending_resources.append({"type": resource_type, "title": link["title"], "url": link["url"]})
+            else:
+                continue
+            if include_plain:
+                # Link-only text is otherwise not counted as captured
+                self.captured_chars += len(link["title"])
+
+    def _flush_text(self):
+        """Emit the open header/paragraph, or any loose text, as a component."""
+        text = _clean("".join(self._text))
+        block = self._block
+        links = self._block_links
+        self._block, self._text, self._block_links = None, [], []
+
+        if block and block[0] == "header":
+            if text:
+                self._emit({"type": "header", "level": block[1], "content": text})
+                self.captured_chars += len(text)
+            return
+
+        link_text = _clean(" ".join(link["title"] for link in links))
+        if links and text == link_text:
+            # A paragraph made only of links is a set of resources
+            self._emit_links(links, include_plain=True)
+        elif text:
+            self._emit({"type": "paragraph", "content": text})
+            self.captured_chars += len(text)
+            self._emit_links(links, include_plain=False)
+
+    def _finish_list(self):
+        items = [(text, links) for text, links in self._list_items if text or links]
+        self._list_items = []
+        if not items:
+            return
+
+        if all(links and text == _clean(" ".join(l["title"] for l in links)) for text, links in items):
+            for _, links in items:
+                self._emit_links(links, include_plain=True)
+            return
+
+        self._emit({"type": "instructions", "items": [text for text, _ in items if text]})
+        for text, links in items:
+            self.captured_chars += len(text)
+            self._emit_links(links, include_plain=False)
+
+    # HTMLParser callbacks
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+            return
+        if self._skip_depth:
+            return
+
+        if tag in UNSUPPORTED_TAGS:
+            self.confidence_multiplier *= UNSUPPORTED_TAGS[tag]
+            if tag in OPAQUE_TAGS:
+                self._opaque_depth += 1
+            return
+        if self._opaque_depth:
+            return
+
+        attributes = dict(attrs)
+
+        if tag in HEADER_TAGS:
+            self._flush_text()
+            self._block = ("header", HEADER_TAGS[tag])
+        elif tag == "p":
+            if self._item_text is None:
+                self._flush_text()
+                self._block = ("paragraph", 0)
+        elif tag in BLOCK_TAGS:
+            if self._item_text is None:
+                self._flush_text()
+        elif tag == "br":
+            self.handle_data(" ")
+        elif tag == "iframe":
+            self._flush_text()
+            src = attributes.get("src")
+            if src:
+                self._emit({"type": "video", "title": attributes.get("title") or "Video", "embed_url": src})
+            else:
+                self.confidence_multiplier *= 0.8
+        elif tag == "a":
+            self._link = {"url": attributes.get("href") or "", "text": []}
+        elif tag in LIST_TAGS:
+            if self._list_depth == 0:
+                self._flush_text()
+            self._list_depth += 1
+        elif tag == "li" and self._list_depth:
+            self._finish_item()
+            self._item_text, self._item_links = [], []
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        # Self-closing elements have no end tag to close an opaque region
+        if tag in OPAQUE_TAGS and not self._skip_depth:
+            self._opaque_depth -= 1
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+            return
+        if self._skip_depth:
+            return
+
+        if tag in OPAQUE_TAGS:
+            self._opaque_depth = max(0, self._opaque_depth - 1)
+            return
+        if self._opaque_depth:
+            return
+
+        if tag in HEADER_TAGS or (tag == "p" and self._item_text is None) or (tag in BLOCK_TAGS and self._item_text is None):
+            self._flush_text()
+        elif tag == "a" and self._link is not None:
+            title = _clean("".join(self._link["text"]))
+            if self._link["url"] and title:
+                link = {"title": title, "url": self._link["url"]}
+                if self._item_text is not None:
+                    self._item_links.append(link)
+                else:
+                    self._block_links.append(link)
+            self._link = None
+        elif tag == "li" and self._list_depth:
+            self._finish_item()
+        elif tag in LIST_TAGS and self._list_depth:
+            self._list_depth -= 1
+            if self._list_depth == 0:
+                self._finish_item()
+                self._finish_list()
+
+    def _finish_item(self):
+        if self._item_text is not None:
+            self._list_items.append((_clean("".join(self._item_text)), self._item_links))
+        self._item_text, self._item_links = None, []
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+
+        self.total_chars += len(_clean(data))
+        if self._opaque_depth:
+            return
+
+        if self._link is not None:
+            self._link["text"].append(data)
+
+        if self._item_text is not None:
+            self._item_text.append(data)
+        elif self._list_depth:
+            # Text directly inside a list but outside an item
+            self._item_text, self._item_links = [data], []
+        else:
+            self._text.append(data)
+
+    def close(self):
+        super().close()
+        if self._list_depth:
+            self._list_depth = 0
+            self._finish_item()
+            self._finish_list()
+        self._flush_text()
+        self._flush_resources()
+
+
+def parse_html_to_components(html_content: str) -> Tuple[List[Dict[str, Any]], float]:
+    """
+    Convert Canvas lesson HTML into components without an LLM.
+
+    The confidence score is the share of the page's visible text captured in
+    components, reduced for every element the schema cannot represent
+    (tables, forms, embedded media, ...). Pages with no components score 0.
+
+    Args:
+        html_content: Raw HTML content from a Canvas page
+
+    Returns:
+        Tuple of (components, confidence between 0 and 1)
+    """
+    builder = _ComponentBuilder()
+    builder.feed(html_content or "")
+    builder.close()
+
+    if not builder.components:
+        return [], 0.0
+
+    coverage = min(1.0, builder.captured_chars / builder.total_chars) if builder.total_chars else 1.0
+    return builder.components, round(coverage * builder.confidence_multiplier, 4)
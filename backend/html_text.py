@@ -0,0 +1,148 @@
+"""
+Single-pass plain text extraction from Canvas HTML.
+A precompiled tokenizer walks the markup once, keeps light structure
+(headings, paragraphs, line breaks, list bullets), skips script/style
+bodies and stops as soon as the output budget is reached.
+"""
+
+import re
+from html import unescape
+from typing import List, Optional, Tuple
+
+# One token per match: text run, skipped script/style element, tag,
+# comment/doctype, or a stray "<"
+TOKEN = re.compile(
+    r"(?P<text>[^<]+)"
+    r"|<(?i:script)\b.*?</(?i:script)\s*>"
+    r"|<(?i:style)\b.*?</(?i:style)\s*>"
+    r"|(?P<tag></?[a-zA-Z][a-zA-Z0-9]*)[^>]*>"
+    r"|<!--.*?-->|<![^>]*>"
+    r"|(?P<lt><)",
+    re.DOTALL
+)
+WHITESPACE = re.compile(r"\s+")
+BLANK_LINES = re.compile(r" ?\n ?(?: ?\n ?)+")
+
+# Structural line breaks are emitted as NUL so that whitespace from the
+# source markup can be collapsed in one pass without losing them
+LINE_BREAK = "\x00"
+
+# Text emitted for structural tags, keyed by "<tag" / "</tag"
+TAG_TEXT = {"<br": "\n", "<p": "", "</p": "\n\n", "<li": "• ", "</li": "\n"}
+for _heading in ("h1", "h2", "h3", "h4", "h5", "h6"):
+    TAG_TEXT["<" + _heading] = "\n## "
+    TAG_TEXT["</" + _heading] = "\n"
+for _block in ("div", "section", "article", "tr", "ul", "ol", "table", "blockquote"):
+    TAG_TEXT["<" + _block] = "\n"
+    TAG_TEXT["</" + _block] = "\n"
+_TAG_MARKERS = {tag: text.replace("\n", LINE_BREAK) for tag, text in TAG_TEXT.items()}
+
+
+def html_to_text(html_content: str, max_chars: Optional[int] = None) -> Tuple[str, bool]:
+    """
+    Extract readable plain text from HTML.
+
+    Headings become "## " lines, paragraphs are separated by blank lines
+    and list items are bulleted. Entities are decoded and whitespace from
+    the source markup is collapsed.
+
+    Args:
+        html_content: Raw HTML content
+        max_chars: Stop once this many characters of output have been produced
+
+    Returns:
+        Tuple of (text, truncated) where truncated is True if extraction
+        stopped at max_chars
+    """
+    if not html_content:
+        return "", False
+
+    parts: List[str] = []
+    append = parts.append
+    marker_for = _TAG_MARKERS.get
+    length = 0
+    truncated = False
+
+    if max_chars is None:
+        for match in TOKEN.finditer(html_content):
+            text, tag, lt = match.group("text", "tag", "lt")
+            piece = text if text is not None else marker_for(tag.lower()) if tag is not None else lt
+            if piece:
+                append(piece)
+    else:
+        # Output state used to count each piece as it will appear once
+        # whitespace is collapsed: what the output last ended with
+        # ("break", "space" or "char") and how many line breaks are in a
+        # row. Leading breaks are stripped, so the output starts as if
+        # after a blank line.
+        last = "break"
+        line_breaks = 2
+
+        for match in TOKEN.finditer(html_content):
+            text, tag, lt = match.group("text", "tag", "lt")
+            if text is not None:
+                piece = text
+                words = (unescape(piece) if "&" in piece else piece).split()
+                if not words:
+                    # Indentation between tags is at most one space
+                    size = 1 if last == "char" else 0
+                    if size:
+                        last = "space"
+                else:
+                    size = sum(map(len, words)) + len(words) - 1
+                    if piece[0].isspace() and last == "char":
+                        size += 1
+                    if piece[-1].isspace():
+                        size += 1
+                        last = "space"
+                    else:
+                        last = "char"
+                    line_breaks = 0
+            elif tag is not None:
+                piece = marker_for(tag.lower())
+                if not piece:
+                    continue
+                size = 0
+                for char in piece:
+                    if char == LINE_BREAK:
+                        # A space before a line break is dropped, and runs of
+                        # line breaks collapse to at most a blank line
+                        if last == "space":
+                            size -= 1
+                        if line_breaks < 2:
+                            size += 1
+                            line_breaks += 1
+                        last = "break"
+                    elif char == " ":
+                        if last == "char":
+                            size += 1
+                            last = "space"
+                    else:
+                        size += 1
+                        last = "char"
+                        line_breaks = 0
+            elif lt is not None:
+                piece = lt
+                size = 1
+                last = "char"
+                line_breaks = 0
+            else:
+                continue  # script, style, comment or doctype
+
+            append(piece)
+            length += size
+            if length >= max_chars:
+                truncated = match.end() < len(html_content)
+                break
+
+    text = "".join(parts)
+    if "&" in text:
+        text = unescape(text)
+    text = WHITESPACE.sub(" ", text).replace(LINE_BREAK, "\n")
+    text = BLANK_LINES.sub(lambda match: "\n\n" if match.group().count("\n") > 1 else "\n", text).strip()
+
+    if max_chars is not None and len(text) > max_chars:
+        text = text[:max_chars].rstrip()
+        truncated = True
+
+    return text, truncated
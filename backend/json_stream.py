@@ -0,0 +1,89 @@
+"""
+Incremental parsing of a JSON array of objects from streamed text.
+Used to hand LLM-generated components to the client as soon as each one is
+complete, before the rest of the response has arrived.
+"""
+
+import json
+from typing import Any, List
+
+
+class JSONArrayStreamParser:
+    """
+    Extracts the top-level objects of a JSON array from text fed in
+    arbitrary pieces. Anything before the opening bracket (such as a
+    markdown code fence) is ignored.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._position = 0
+        self._in_array = False
+        self._finished = False
+
+        # State of the element currently being scanned
+        self._element_start = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> List[Any]:
+        """
+        Add streamed text and return every array element completed by it.
+
+        Args:
+            text: Next piece of the response
+
+        Returns:
+            List of parsed elements, in order
+
+        Raises:
+            json.JSONDecodeError: If a completed element is not valid JSON
+        """
+        self._buffer += text
+        elements = []
+
+        while self._position < len(self._buffer) and not self._finished:
+            char = self._buffer[self._position]
+
+            if not self._in_array:
+                if char == "[":
+                    self._in_array = True
+            elif self._element_start is None:
+                if char in "{[":
+                    self._element_start = self._position
+                    self._depth = 1
+                elif char == "]":
+                    self._finished = True
+            elif self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    elements.append(json.loads(self._buffer[self._element_start:self._position + 1]))
+                    self._element_start = None
+
+            self._position += 1
+
+        # Drop text that has been fully consumed
+        keep_from = self._element_start if self._element_start is not None else self._position
+        self._buffer = self._buffer[keep_from:]
+        self._position -= keep_from
+        if self._element_start is not None:
+            self._element_start = 0
+
+        return elements
+
+    @property
+    def finished(self) -> bool:
+        """True once the closing bracket of the array has been seen."""
+        return self._finished
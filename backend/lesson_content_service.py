@@ -3,12 +3,15 @@ import hashlib
 import json
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import and_, select, update
 
+from database import SessionLocal
 from models import LessonContent, WeeklyPlanLesson, WeeklyPlan
 from canvas_client import canvas_client
 from ai_service import ai_service
+from conversion_store import conversion_store
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +24,7 @@ class LessonContentService:
         """Generate a hash of the content to detect changes."""
         return hashlib.sha256(content.encode('utf-8')).hexdigest()
     
-    async def get_lesson_content(self, db: Session, course_id: int, module_item_id: int, 
+    async def get_lesson_content(self, db: AsyncSession, course_id: int, module_item_id: int, 
                                force_refresh: bool = False) -> Dict[str, Any]:
         """
         Get lesson content, using cache when available or fetching from Canvas.
@@ -41,7 +44,7 @@ class LessonContentService:
             # Check if we have cached content
             cached_content = None
             if not force_refresh:
-                cached_content = self._get_cached_content(db, course_id, module_item_id)
+                cached_content = await self._get_cached_content(db, course_id, module_item_id)
                 
                 if cached_content and self._is_cache_valid(cached_content):
                     logger.info(f"Using cached content for item {module_item_id}")
@@ -65,12 +68,10 @@ class LessonContentService:
             lesson_title = canvas_content.get("title", "")
             lesson_type = canvas_content.get("type", "")
             
-            transformation_result = await ai_service.transform_lesson_content(
-                raw_html, lesson_title, lesson_type
-            )
+            transformation_result = await self._transform_content(raw_html, lesson_title, lesson_type)
             
             # Save or update cached content
-            lesson_content = self._save_lesson_content(
+            lesson_content = await self._save_lesson_content(
                 db, course_id, module_item_id, canvas_content, transformation_result
             )
             
@@ -87,7 +88,7 @@ class LessonContentService:
             logger.error(f"Error getting lesson content for item {module_item_id}: {e}")
             
             # Try to return cached content even if it's stale
-            cached_content = self._get_cached_content(db, course_id, module_item_id)
+            cached_content = await self._get_cached_content(db, course_id, module_item_id)
             if cached_content:
                 logger.warning(f"Returning stale cached content for item {module_item_id}")
                 return {
@@ -117,14 +118,51 @@ class LessonContentService:
                 }
             }
     
-    def _get_cached_content(self, db: Session, course_id: int, module_item_id: int) -> Optional[LessonContent]:
+    async def _transform_content(self, raw_html: str, lesson_title: str, lesson_type: str) -> Dict[str, Any]:
+        """
+        Transform lesson HTML with AI, reusing the stored result for identical content.
+        
+        Reused results keep their sections and resources but take the title
+        and type of the lesson being loaded.
+        """
+        if not raw_html or not raw_html.strip():
+            return await ai_service.transform_lesson_content(raw_html, lesson_title, lesson_type)
+        
+        content_hash = self._generate_content_hash(raw_html)
+        fingerprint = ai_service.get_conversion_fingerprint("lesson_content")
+        
+        stored_content = await conversion_store.get(content_hash, "lesson_content", fingerprint)
+        if stored_content is not None:
+            return {
+                "success": True,
+                "content": {**stored_content, "title": lesson_title or stored_content.get("title", ""), "type": lesson_type},
+                "reused_conversion": True
+            }
+        
+        transformation_result = await ai_service.transform_lesson_content(raw_html, lesson_title, lesson_type)
+        if transformation_result.get("success"):
+            await conversion_store.put(content_hash, "lesson_content", fingerprint, transformation_result["content"])
+        
+        return transformation_result
+    
+    async def _get_cached_content(self, db: AsyncSession, course_id: int, module_item_id: int) -> Optional[LessonContent]:
         """Get cached lesson content from database."""
-        return db.query(LessonContent).filter(
-            and_(
-                LessonContent.course_id == course_id,
-                LessonContent.module_item_id == module_item_id
+        result = await db.execute(
+            select(LessonContent).where(
+                and_(
+                    LessonContent.course_id == course_id,
+                    LessonContent.module_item_id == module_item_id
+                )
             )
-        ).first()
+        )
+        return result.scalars().first()
+    
+    async def _get_weekly_plan_lessons(self, db: AsyncSession, lesson_id: int) -> List[WeeklyPlanLesson]:
+        """Get the weekly plan entries that reference a lesson."""
+        result = await db.execute(
+            select(WeeklyPlanLesson).where(WeeklyPlanLesson.lesson_content_id == lesson_id)
+        )
+        return result.scalars().all()
     
     def _is_cache_valid(self, cached_content: LessonContent) -> bool:
         """Check if cached content is still valid."""
@@ -134,15 +172,19 @@ class LessonContentService:
         cache_expiry = cached_content.last_fetched + timedelta(hours=self.cache_duration_hours)
         return datetime.now() < cache_expiry
     
-    def _save_lesson_content(self, db: Session, course_id: int, module_item_id: int,
+    async def _save_lesson_content(self, db: AsyncSession, course_id: int, module_item_id: int,
                            canvas_content: Dict, transformation_result: Dict) -> LessonContent:
         """Save or update lesson content in database."""
         try:
             raw_content = canvas_content.get("content", "") or canvas_content.get("body", "")
             content_hash = self._generate_content_hash(raw_content)
+            transformation_fingerprint = (
+                ai_service.get_conversion_fingerprint("lesson_content")
+                if transformation_result.get("success") else None
+            )
             
             # Check if we already have this content
-            existing_content = self._get_cached_content(db, course_id, module_item_id)
+            existing_content = await self._get_cached_content(db, course_id, module_item_id)
             
             if existing_content:
                 # Update existing content
@@ -156,6 +198,7 @@ class LessonContentService:
                 existing_content.last_fetched = datetime.now()
                 existing_content.last_transformed = datetime.now()
                 existing_content.content_hash = content_hash
+                existing_content.transformation_fingerprint = transformation_fingerprint
                 
                 lesson_content = existing_content
                 logger.info(f"Updated existing lesson content {existing_content.id}")
@@ -173,23 +216,73 @@ class LessonContentService:
                     transformation_error=transformation_result.get("error"),
                     last_fetched=datetime.now(),
                     last_transformed=datetime.now(),
-                    content_hash=content_hash
+                    content_hash=content_hash,
+                    transformation_fingerprint=transformation_fingerprint
                 )
                 
                 db.add(lesson_content)
                 logger.info(f"Created new lesson content for item {module_item_id}")
             
-            db.commit()
-            db.refresh(lesson_content)
+            await db.commit()
+            await db.refresh(lesson_content)
             
             return lesson_content
             
         except Exception as e:
             logger.error(f"Error saving lesson content: {e}")
-            db.rollback()
+            await db.rollback()
             raise
     
-    async def get_lesson_content_by_id(self, db: Session, lesson_id: int) -> Dict[str, Any]:
+    async def upgrade_transformation(self, lesson_id: int) -> bool:
+        """
+        Re-transform stored lesson content with the current prompt and model.
+        
+        The stored raw content is used, so Canvas is not contacted. Sessions
+        are only opened around the lookup and the save, and the existing
+        transformation is kept if the new one fails or the lesson was
+        re-fetched with different content in the meantime.
+        
+        Args:
+            lesson_id: Database ID of the lesson whose transformation is out of date
+            
+        Returns:
+            True if the lesson was upgraded
+        """
+        async with SessionLocal() as db:
+            lesson_content = await db.get(LessonContent, lesson_id)
+        if lesson_content is None:
+            return False
+        
+        transformation_result = await self._transform_content(
+            lesson_content.raw_content or "", lesson_content.lesson_title, lesson_content.lesson_type
+        )
+        if not transformation_result.get("success"):
+            logger.warning(f"Re-transformation failed for lesson {lesson_id}: {transformation_result.get('error')}")
+            return False
+        
+        content_unchanged = (
+            LessonContent.content_hash.is_(None) if lesson_content.content_hash is None
+            else LessonContent.content_hash == lesson_content.content_hash
+        )
+        async with SessionLocal() as db:
+            result = await db.execute(
+                update(LessonContent).where(LessonContent.id == lesson_id, content_unchanged).values(
+                    transformed_content=transformation_result["content"],
+                    transformation_error=None,
+                    last_transformed=datetime.now(),
+                    transformation_fingerprint=ai_service.get_conversion_fingerprint("lesson_content")
+                )
+            )
+            await db.commit()
+        
+        if not result.rowcount:
+            logger.info(f"Discarding upgrade of lesson {lesson_id}: its content changed")
+            return False
+        
+        logger.info(f"Upgraded transformation of lesson {lesson_id}")
+        return True
+    
+    async def get_lesson_content_by_id(self, db: AsyncSession, lesson_id: int) -> Dict[str, Any]:
         """
         Get lesson content by its database ID.
         
@@ -201,7 +294,7 @@ class LessonContentService:
             Dict containing the lesson content
         """
         try:
-            lesson_content = db.query(LessonContent).filter(LessonContent.id == lesson_id).first()
+            lesson_content = await db.get(LessonContent, lesson_id)
             
             if not lesson_content:
                 return {
@@ -224,7 +317,7 @@ class LessonContentService:
                 "error": str(e)
             }
     
-    def get_lessons_for_weekly_plan(self, db: Session, weekly_plan_id: int) -> List[Dict[str, Any]]:
+    async def get_lessons_for_weekly_plan(self, db: AsyncSession, weekly_plan_id: int) -> List[Dict[str, Any]]:
         """
         Get all lessons associated with a weekly plan.
         
@@ -236,9 +329,12 @@ class LessonContentService:
             List of lesson content dictionaries
         """
         try:
-            lessons = db.query(WeeklyPlanLesson).filter(
-                WeeklyPlanLesson.weekly_plan_id == weekly_plan_id
-            ).all()
+            result = await db.execute(
+                select(WeeklyPlanLesson)
+                .where(WeeklyPlanLesson.weekly_plan_id == weekly_plan_id)
+                .options(selectinload(WeeklyPlanLesson.lesson_content))
+            )
+            lessons = result.scalars().all()
             
             result = []
             for lesson_plan in lessons:
@@ -259,7 +355,7 @@ class LessonContentService:
             logger.error(f"Error getting lessons for weekly plan {weekly_plan_id}: {e}")
             return []
     
-    def mark_lesson_completed(self, db: Session, lesson_id: int, user_session: str, 
+    async def mark_lesson_completed(self, db: AsyncSession, lesson_id: int, user_session: str, 
                             completed: bool = True) -> Dict[str, Any]:
         """
         Mark a lesson as completed or incomplete.
@@ -277,7 +373,7 @@ class LessonContentService:
             # For now, we'll use a simple approach without user-specific tracking
             # In a full implementation, you'd want to track completion per user
             
-            lesson_content = db.query(LessonContent).filter(LessonContent.id == lesson_id).first()
+            lesson_content = await db.get(LessonContent, lesson_id)
             
             if not lesson_content:
                 return {
@@ -286,15 +382,13 @@ class LessonContentService:
                 }
             
             # Update any weekly plan lessons associated with this content
-            weekly_plan_lessons = db.query(WeeklyPlanLesson).filter(
-                WeeklyPlanLesson.lesson_content_id == lesson_id
-            ).all()
+            weekly_plan_lessons = await self._get_weekly_plan_lessons(db, lesson_id)
             
             for wpl in weekly_plan_lessons:
                 wpl.user_completed = completed
                 wpl.completion_date = datetime.now() if completed else None
             
-            db.commit()
+            await db.commit()
             
             return {
                 "success": True,
@@ -305,13 +399,13 @@ class LessonContentService:
             
         except Exception as e:
             logger.error(f"Error marking lesson {lesson_id} as completed: {e}")
-            db.rollback()
+            await db.rollback()
             return {
                 "success": False,
                 "error": str(e)
             }
 
-    async def mark_lesson_complete_in_canvas(self, db: Session, lesson_id: int, 
+    async def mark_lesson_complete_in_canvas(self, db: AsyncSession, lesson_id: int, 
                                            course_id: int, module_item_id: int,
                                            user_session: str, completed: bool = True) -> Dict[str, Any]:
         """
@@ -337,7 +431,7 @@ class LessonContentService:
             )
             
             # Then update our local database
-            db_result = self.mark_lesson_completed(db, lesson_id, user_session, completed)
+            db_result = await self.mark_lesson_completed(db, lesson_id, user_session, completed)
             
             if not db_result.get("success"):
                 logger.warning(f"Canvas update succeeded but database update failed: {db_result.get('error')}")
@@ -361,7 +455,7 @@ class LessonContentService:
                 "completed": completed
             }
 
-    async def get_lesson_progress_from_canvas(self, db: Session, course_id: int, 
+    async def get_lesson_progress_from_canvas(self, db: AsyncSession, course_id: int, 
                                             module_item_id: int) -> Dict[str, Any]:
         """
         Get lesson completion status from Canvas and sync with local database.
@@ -386,12 +480,7 @@ class LessonContentService:
                 return canvas_status
             
             # Find corresponding lesson in our database
-            lesson_content = db.query(LessonContent).filter(
-                and_(
-                    LessonContent.course_id == course_id,
-                    LessonContent.module_item_id == module_item_id
-                )
-            ).first()
+            lesson_content = await self._get_cached_content(db, course_id, module_item_id)
             
             if not lesson_content:
                 logger.warning(f"Lesson not found in database for Canvas item {module_item_id}")
@@ -405,9 +494,7 @@ class LessonContentService:
             canvas_completed = canvas_status.get("completed", False)
             
             # Update all weekly plan lessons for this content
-            weekly_plan_lessons = db.query(WeeklyPlanLesson).filter(
-                WeeklyPlanLesson.lesson_content_id == lesson_content.id
-            ).all()
+            weekly_plan_lessons = await self._get_weekly_plan_lessons(db, lesson_content.id)
             
             for wpl in weekly_plan_lessons:
                 if wpl.user_completed != canvas_completed:
@@ -415,7 +502,7 @@ class LessonContentService:
                     wpl.completion_date = datetime.now() if canvas_completed else None
                     logger.info(f"Synced lesson {lesson_content.id} completion status from Canvas")
             
-            db.commit()
+            await db.commit()
             
             return {
                 "success": True,
@@ -430,14 +517,14 @@ class LessonContentService:
             
         except Exception as e:
             logger.error(f"Error getting lesson progress from Canvas: {e}")
-            db.rollback()
+            await db.rollback()
             return {
                 "success": False,
                 "error": str(e),
                 "module_item_id": module_item_id
             }
 
-    def update_lesson_status_in_board(self, db: Session, lesson_id: int, 
+    async def update_lesson_status_in_board(self, db: AsyncSession, lesson_id: int, 
                                     new_status: str, user_session: str) -> Dict[str, Any]:
         """
         Update lesson status and trigger Kanban board update.
@@ -456,7 +543,7 @@ class LessonContentService:
             
             # Mark lesson as completed if status is 'done'
             completed = new_status == 'done'
-            lesson_result = self.mark_lesson_completed(db, lesson_id, user_session, completed)
+            lesson_result = await self.mark_lesson_completed(db, lesson_id, user_session, completed)
             
             if not lesson_result.get("success"):
                 return lesson_result
@@ -483,7 +570,7 @@ class LessonContentService:
                 "new_status": new_status
             }
 
-    async def mark_lesson_as_read(self, db: Session, lesson_id: int, 
+    async def mark_lesson_as_read(self, db: AsyncSession, lesson_id: int, 
                                 user_session: str) -> Dict[str, Any]:
         """
         Mark a lesson as read (viewed but not necessarily completed).
@@ -500,7 +587,7 @@ class LessonContentService:
             logger.info(f"Marking lesson {lesson_id} as read")
             
             # For now, we'll track this as metadata in the lesson content
-            lesson_content = db.query(LessonContent).filter(LessonContent.id == lesson_id).first()
+            lesson_content = await db.get(LessonContent, lesson_id)
             
             if not lesson_content:
                 return {
@@ -512,9 +599,7 @@ class LessonContentService:
             lesson_content.last_fetched = datetime.now()
             
             # Update weekly plan lessons to track read status
-            weekly_plan_lessons = db.query(WeeklyPlanLesson).filter(
-                WeeklyPlanLesson.lesson_content_id == lesson_id
-            ).all()
+            weekly_plan_lessons = await self._get_weekly_plan_lessons(db, lesson_id)
             
             for wpl in weekly_plan_lessons:
                 # Add a note that it was read (if not already completed)
@@ -524,7 +609,7 @@ class LessonContentService:
                     if read_marker not in current_notes:
                         wpl.user_notes = f"{current_notes}\n{read_marker}".strip()
             
-            db.commit()
+            await db.commit()
             
             return {
                 "success": True,
@@ -536,13 +621,13 @@ class LessonContentService:
             
         except Exception as e:
             logger.error(f"Error marking lesson {lesson_id} as read: {e}")
-            db.rollback()
+            await db.rollback()
             return {
                 "success": False,
                 "error": str(e)
             }
 
-    async def get_lesson_with_canvas_status(self, db: Session, lesson_id: int) -> Dict[str, Any]:
+    async def get_lesson_with_canvas_status(self, db: AsyncSession, lesson_id: int) -> Dict[str, Any]:
         """
         Get lesson content with real-time Canvas completion status.
         
@@ -554,7 +639,7 @@ class LessonContentService:
             Dict containing lesson content and Canvas status
         """
         try:
-            lesson_content = db.query(LessonContent).filter(LessonContent.id == lesson_id).first()
+            lesson_content = await db.get(LessonContent, lesson_id)
             
             if not lesson_content:
                 return {
@@ -1,22 +1,31 @@
 import os
 from fastapi import FastAPI, HTTPException, Depends, Query, Body, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
+from pydantic import BaseModel
+import json
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
-from database import engine, Base, get_db
+from database import engine, SessionLocal, migrate_schema, get_db
 from models import Course, WeeklyPlan, Module, ModuleItem, Assignment, BoardState, LessonContent, WeeklyPlanLesson, ConvertedCanvasPage
 from canvas_client import canvas_client
 from ai_service import ai_service
 from week_plan_service import week_plan_service
 from board_state_service import board_state_service
 from lesson_content_service import lesson_content_service
-from sqlalchemy import and_, text
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 from user_service import UserService
 from converted_page_service import ConvertedPageService
+from access_time_recorder import access_time_recorder
+from preconversion_worker import preconversion_worker
+from conversion_store import conversion_store
+from reconversion_job import reconversion_job
+from week_plan_refresher import week_plan_refresher
+from single_flight import lock_engine
 import time
 
 # Load environment variables
@@ -57,9 +66,30 @@ app.add_middleware(
 # Create database tables
 @app.on_event("startup")
 async def startup_event():
-    """Create database tables on startup."""
-    Base.metadata.create_all(bind=engine)
+    """Create database tables and start background writers on startup."""
+    async with engine.begin() as conn:
+        await conn.run_sync(migrate_schema)
+    async with SessionLocal() as db:
+        await week_plan_service.backfill_week_starts(db)
     logger.info("Database tables created")
+    access_time_recorder.start()
+    conversion_store.start()
+    preconversion_worker.start()
+    reconversion_job.start()
+    week_plan_refresher.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush buffered writes and release long-lived client connections on shutdown."""
+    await preconversion_worker.stop()
+    await reconversion_job.stop()
+    await week_plan_refresher.stop()
+    await access_time_recorder.stop()
+    await conversion_store.stop()
+    await ai_service.close()
+    await canvas_client.close()
+    await lock_engine.dispose()
+    await engine.dispose()
 
 # Health check endpoint
 @app.get("/health")
@@ -70,15 +100,13 @@ async def health_check():
     """
     try:
         # Test database connection
-        db = next(get_db())
         try:
             # Simple query to verify database connectivity
-            db.execute(text("SELECT 1"))
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
             db_status = "healthy"
         except Exception as db_error:
             db_status = f"unhealthy: {str(db_error)}"
-        finally:
-            db.close()
             
         # Test AI service
         try:
@@ -166,7 +194,7 @@ async def get_canvas_page_content(
     page_slug: str,
     raw: bool = Query(False, description="Return raw Canvas data instead of processed components"),
     force_refresh: bool = Query(False, description="Force refresh of cached content"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     converted_page_service: ConvertedPageService = Depends(get_converted_page_service)
 ):
     """
@@ -182,16 +210,25 @@ async def get_canvas_page_content(
     try:
         logger.info(f"Fetching Canvas page content: course {course_id}, page {page_slug}")
         
-        # Always fetch fresh Canvas data to check for updates
-        page_content = await canvas_client.get_page_content(course_id, page_slug)
-        logger.info(f"Successfully retrieved page: {page_content.get('title', 'Untitled')}")
+        # Revalidate against Canvas. A 304 means the body we last saw is still
+        # current, so we skip the download and re-hashing and reuse its hash.
+        not_modified = False
+        if raw or force_refresh:
+            page_content = await canvas_client.get_page_content(course_id, page_slug)
+            content_hash = None
+        else:
+            revalidation = await canvas_client.get_page_content_conditional(course_id, page_slug)
+            page_content = revalidation["page"]
+            content_hash = revalidation["content_hash"]
+            not_modified = revalidation["not_modified"]
+        logger.info(f"Successfully retrieved page: {page_content.get('title', 'Untitled')} (not modified: {not_modified})")
 
         if raw:
             logger.info("Returning raw Canvas data as requested")
             return page_content
 
         html_body = page_content.get('body', '')
-        if not html_body:
+        if not html_body and not not_modified:
             logger.warning("No HTML body content found in Canvas response")
             return {
                 "title": page_content.get('title', 'Untitled'),
@@ -206,29 +243,67 @@ async def get_canvas_page_content(
                     "message": "No HTML body content found"
                 }
             }
+        
+        if content_hash is None:
+            content_hash = converted_page_service.get_content_hash(html_body)
 
+        # Check the in-process memory tier first; a hit never touches the database
+        if not force_refresh:
+            memory_page = converted_page_service.get_memory_cached_page(
+                course_id,
+                page_slug,
+                content_hash,
+                page_content.get('updated_at')
+            )
+            
+            if memory_page:
+                logger.info(f"Returning memory-cached converted content ({memory_page['component_count']} components)")
+                
+                return {
+                    "title": memory_page['page_title'],
+                    "page_id": memory_page['page_id'],
+                    "updated_at": page_content.get('updated_at'),
+                    "url": page_content.get('url'),
+                    "course_id": course_id,
+                    "components": memory_page['ai_components'],
+                    "processed": True,
+                    "cached": True,
+                    "processing_info": {
+                        **memory_page['processing_info'],
+                        "cache_tier": "memory",
+                        "not_modified": not_modified,
+                        "cached_at": memory_page['first_converted_at'].isoformat(),
+                        "last_accessed": memory_page['last_accessed_at'].isoformat()
+                    }
+                }
+        
         # Check for cached converted content
-        cached_page = converted_page_service.get_converted_page(
+        cached_page = await converted_page_service.get_converted_page(
             db, course_id, page_slug, force_refresh
         )
         
         # Determine if we need to re-convert
-        needs_conversion = (
-            cached_page is None or
-            force_refresh or
-            not cached_page.conversion_success or
-            converted_page_service.is_content_changed(
+        if not_modified:
+            # Canvas confirmed the body is unchanged; comparing stored hashes is enough
+            content_changed = cached_page is not None and cached_page.content_hash != content_hash
+        else:
+            content_changed = cached_page is not None and converted_page_service.is_content_changed(
                 cached_page, 
                 html_body,
                 page_content.get('updated_at')
             )
+        
+        needs_conversion = (
+            cached_page is None or
+            force_refresh or
+            not cached_page.conversion_success or
+            content_changed
         )
         
         if not needs_conversion and cached_page:
             # Return cached content
             logger.info(f"Returning cached converted content ({cached_page.component_count} components)")
-            cached_page.last_accessed_at = datetime.now()
-            db.commit()
+            last_accessed = access_time_recorder.touch(course_id, page_slug)
             
             return {
                 "title": cached_page.page_title,
@@ -241,41 +316,30 @@ async def get_canvas_page_content(
                 "cached": True,
                 "processing_info": {
                     **cached_page.processing_info,
+                    "cache_tier": "database",
+                    "not_modified": not_modified,
                     "cached_at": cached_page.first_converted_at.isoformat(),
-                    "last_accessed": cached_page.last_accessed_at.isoformat()
+                    "last_accessed": last_accessed.isoformat()
                 }
             }
-
-        # Convert with AI (new conversion or refresh)
-        conversion_start = time.time()
-        logger.info(f"Converting HTML content ({len(html_body)} chars) to structured components")
         
-        try:
-            components = ai_service.convert_html_to_components(html_body)
-            conversion_time_ms = int((time.time() - conversion_start) * 1000)
-            
-            logger.info(f"Successfully converted to {len(components)} components in {conversion_time_ms}ms")
-            
-            # Save converted content to cache
-            processing_info = {
-                "status": "success",
-                "components_count": len(components),
-                "original_html_length": len(html_body),
-                "conversion_time_ms": conversion_time_ms,
-                "cached": True
-            }
-            
-            converted_page_service.save_converted_page(
-                db=db,
-                course_id=course_id,
-                page_slug=page_slug,
-                canvas_data=page_content,
-                ai_components=components,
-                processing_info=processing_info,
-                conversion_time_ms=conversion_time_ms,
-                raw_html_body=html_body
-            )
+        if not_modified and not html_body:
+            # Nothing usable is cached for the unchanged body; download it to convert
+            page_content = await canvas_client.get_page_content(course_id, page_slug)
+            html_body = page_content.get('body', '')
 
+        # Convert with AI (new conversion or refresh). Concurrent requests for
+        # the same content share one conversion.
+        conversion = await converted_page_service.convert_page(
+            course_id=course_id,
+            page_slug=page_slug,
+            canvas_data=page_content,
+            html_body=html_body,
+            content_hash=None if not_modified else content_hash,
+            force_refresh=force_refresh
+        )
+        
+        if conversion["success"]:
             total_time_ms = int((time.time() - start_time) * 1000)
             
             return {
@@ -284,47 +348,33 @@ async def get_canvas_page_content(
                 "updated_at": page_content.get('updated_at'),
                 "url": page_content.get('url'),
                 "course_id": course_id,
-                "components": components,
+                "components": conversion["components"],
                 "processed": True,
                 "cached": False,  # Just converted, not from cache
                 "processing_info": {
-                    **processing_info,
+                    **conversion["processing_info"],
                     "total_time_ms": total_time_ms
                 }
             }
-            
-        except Exception as ai_error:
-            # Save conversion error for debugging
-            logger.error(f"AI conversion failed: {ai_error}")
-            conversion_time_ms = int((time.time() - conversion_start) * 1000)
-            
-            converted_page_service.save_conversion_error(
-                db=db,
-                course_id=course_id,
-                page_slug=page_slug,
-                canvas_data=page_content,
-                error_message=str(ai_error),
-                raw_html_body=html_body
-            )
-            
-            # Return fallback response
-            return {
-                "title": page_content.get('title', 'Untitled'),
-                "page_id": page_content.get('page_id'),
-                "updated_at": page_content.get('updated_at'),
-                "url": page_content.get('url'),
-                "course_id": course_id,
-                "components": [],
-                "processed": False,
-                "cached": False,
-                "processing_info": {
-                    "status": "ai_error",
-                    "message": str(ai_error),
-                    "fallback": "raw_html_available",
-                    "conversion_time_ms": conversion_time_ms
-                },
-                "raw_html_body": html_body
-            }
+        
+        # Return fallback response
+        return {
+            "title": page_content.get('title', 'Untitled'),
+            "page_id": page_content.get('page_id'),
+            "updated_at": page_content.get('updated_at'),
+            "url": page_content.get('url'),
+            "course_id": course_id,
+            "components": [],
+            "processed": False,
+            "cached": False,
+            "processing_info": {
+                "status": "ai_error",
+                "message": conversion["error"],
+                "fallback": "raw_html_available",
+                "conversion_time_ms": conversion["conversion_time_ms"]
+            },
+            "raw_html_body": html_body
+        }
 
     except Exception as e:
         logger.error(f"Failed to process Canvas page content: {e}")
@@ -333,12 +383,126 @@ async def get_canvas_page_content(
             detail=f"Unable to retrieve or process page content: {e}"
         )
 
+@app.get("/api/v1/courses/{course_id}/pages/{page_slug}/stream")
+async def stream_canvas_page_content(
+    course_id: int,
+    page_slug: str,
+    force_refresh: bool = Query(False, description="Force refresh of cached content"),
+    converted_page_service: ConvertedPageService = Depends(get_converted_page_service)
+):
+    """
+    Stream Canvas page content as newline-delimited JSON events.
+    
+    Emits a `page` event with the page metadata, one `component` event per
+    component as soon as it is produced (replayed at once when cached), then
+    `done` with processing info or `error`. The full conversion is stored
+    once it completes, exactly as the non-streaming endpoint does.
+    
+    - **course_id**: Canvas course ID
+    - **page_slug**: Canvas page URL slug
+    - **force_refresh**: Force refresh of cached AI-converted content
+    """
+    def encode(event: Dict[str, Any]) -> str:
+        return json.dumps(event, default=str) + "\n"
+    
+    async def events():
+        start_time = time.time()
+        
+        try:
+            if force_refresh:
+                page_content = await canvas_client.get_page_content(course_id, page_slug)
+                content_hash = None
+                not_modified = False
+            else:
+                revalidation = await canvas_client.get_page_content_conditional(course_id, page_slug)
+                page_content = revalidation["page"]
+                content_hash = revalidation["content_hash"]
+                not_modified = revalidation["not_modified"]
+            
+            yield encode({
+                "event": "page",
+                "title": page_content.get('title', 'Untitled'),
+                "page_id": page_content.get('page_id'),
+                "updated_at": page_content.get('updated_at'),
+                "url": page_content.get('url'),
+                "course_id": course_id
+            })
+            
+            html_body = page_content.get('body', '')
+            if not html_body and not not_modified:
+                yield encode({
+                    "event": "done",
+                    "processing_info": {"status": "no_content", "message": "No HTML body content found"}
+                })
+                return
+            
+            if content_hash is None:
+                content_hash = converted_page_service.get_content_hash(html_body)
+            
+            cached = None
+            if not force_refresh:
+                memory_page = converted_page_service.get_memory_cached_page(
+                    course_id, page_slug, content_hash, page_content.get('updated_at')
+                )
+                if memory_page:
+                    cached = (memory_page['ai_components'], memory_page['processing_info'], "memory")
+                else:
+                    async with SessionLocal() as db:
+                        cached_page = await converted_page_service.get_converted_page(db, course_id, page_slug)
+                    if cached_page and cached_page.conversion_success and cached_page.content_hash == content_hash:
+                        cached = (cached_page.ai_components, cached_page.processing_info or {}, "database")
+            
+            if cached:
+                components, processing_info, cache_tier = cached
+                for index, component in enumerate(components):
+                    yield encode({"event": "component", "index": index, "component": component})
+                yield encode({
+                    "event": "done",
+                    "cached": True,
+                    "processing_info": {**processing_info, "cache_tier": cache_tier, "not_modified": not_modified}
+                })
+                return
+            
+            if not_modified and not html_body:
+                # Nothing usable is cached for the unchanged body; download it to convert
+                page_content = await canvas_client.get_page_content(course_id, page_slug)
+                html_body = page_content.get('body', '')
+                content_hash = None
+            
+            async for event in converted_page_service.stream_convert_page(
+                course_id=course_id,
+                page_slug=page_slug,
+                canvas_data=page_content,
+                html_body=html_body,
+                content_hash=content_hash
+            ):
+                if event["event"] == "done":
+                    event = {
+                        **event,
+                        "cached": False,
+                        "processing_info": {
+                            **event["processing_info"],
+                            "total_time_ms": int((time.time() - start_time) * 1000)
+                        }
+                    }
+                yield encode(event)
+        
+        except Exception as e:
+            logger.error(f"Failed to stream Canvas page content: {e}")
+            yield encode({"event": "error", "message": f"Unable to retrieve or process page content: {e}"})
+    
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # New endpoint: Check conversion status for multiple pages
 @app.get("/api/v1/courses/{course_id}/pages/{page_slug}/status")
 async def get_page_conversion_status(
     course_id: int,
     page_slug: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     converted_page_service: ConvertedPageService = Depends(get_converted_page_service)
 ):
     """
@@ -350,7 +514,7 @@ async def get_page_conversion_status(
     Returns conversion status and metadata.
     """
     try:
-        status = converted_page_service.get_conversion_status(db, course_id, page_slug)
+        status = await converted_page_service.get_conversion_status(db, course_id, page_slug)
         return {
             "course_id": course_id,
             "page_slug": page_slug,
@@ -367,7 +531,7 @@ async def get_page_conversion_status(
 @app.post("/api/v1/conversion-status/batch")
 async def get_batch_conversion_status(
     pages: list[dict],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     converted_page_service: ConvertedPageService = Depends(get_converted_page_service)
 ):
     """
@@ -388,7 +552,7 @@ async def get_batch_conversion_status(
             if not course_id or not page_slug:
                 continue
                 
-            status = converted_page_service.get_conversion_status(db, course_id, page_slug)
+            status = await converted_page_service.get_conversion_status(db, course_id, page_slug)
             results.append({
                 "course_id": course_id,
                 "page_slug": page_slug,
@@ -403,12 +567,65 @@ async def get_batch_conversion_status(
             detail=f"Unable to check batch conversion status: {e}"
         )
 
+# Converted page memory cache statistics
+@app.get("/api/v1/cache/stats")
+async def get_cache_stats(
+    converted_page_service: ConvertedPageService = Depends(get_converted_page_service)
+):
+    """Get hit/miss counters for the converted page cache and Canvas revalidation."""
+    return {
+        "converted_pages": converted_page_service.get_cache_stats(),
+        "canvas_conditional_requests": canvas_client.get_conditional_stats(),
+        "canvas_rate_limit": canvas_client.scheduler.get_stats(),
+        "latest_week_plan": week_plan_service.get_latest_plan_cache_stats(),
+        "access_time_writes": access_time_recorder.get_stats(),
+        "conversions": converted_page_service.get_conversion_stats(),
+        "component_conversion_paths": ai_service.get_conversion_stats(),
+        "ai_requests": ai_service.get_request_stats(),
+        "conversion_store": conversion_store.get_stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+# Background pre-conversion progress
+@app.get("/api/v1/preconversion/status")
+async def get_preconversion_status():
+    """Get queue depth and progress of the background lesson page pre-conversion."""
+    return {
+        **preconversion_worker.get_status(),
+        "timestamp": datetime.now().isoformat()
+    }
+
 # AI Service test endpoints
+@app.get("/api/v1/reconversion/status")
+async def get_reconversion_status():
+    """Get how many conversions still use an older prompt/model and the upgrade job's progress."""
+    try:
+        return await reconversion_job.get_status()
+    except Exception as e:
+        logger.error(f"Failed to get reconversion status: {e}")
+        raise HTTPException(status_code=500, detail=f"Unable to get reconversion status: {e}")
+
+@app.post("/api/v1/reconversion/run")
+async def run_reconversion(
+    budget: int = Query(5, ge=1, le=50, description="Maximum conversions to upgrade in this run")
+):
+    """Upgrade a batch of stale conversions now instead of waiting for the next interval."""
+    try:
+        upgraded = await reconversion_job.run_once(budget)
+        return {
+            "upgraded": upgraded,
+            "stale": await reconversion_job.count_stale(),
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Reconversion run failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Reconversion run failed: {e}")
+
 @app.get("/api/v1/ai/test")
 async def test_ai_connection():
     """Test AI service connection."""
     try:
-        result = ai_service.test_connection()
+        result = await ai_service.test_connection()
         return result
     except Exception as e:
         logger.error(f"AI service test failed: {e}")
@@ -425,13 +642,31 @@ async def get_latest_week_plan(
     try:
         logger.info(f"Getting latest week plan (force_refresh: {force_refresh}, user_session: {user_session})")
         
-        result = await week_plan_service.get_latest_week_plan(db, force_refresh)
+        # Serve the stored plan immediately; refreshes run in the background
+        plan = await week_plan_service.get_latest_plan_record(db)
+        source = "database_cache"
+        refresh_started = False
+        
+        if plan is None:
+            # Nothing stored yet, so the first refresh has to be waited for
+            await week_plan_refresher.refresh()
+            plan = await week_plan_service.get_latest_plan_record(db)
+            source = "canvas_api"
+            if plan is None:
+                raise Exception("Weekly plan refresh did not store a plan")
+        elif force_refresh:
+            refresh_started = week_plan_refresher.trigger()
         
         response = {
             "status": "success",
-            "data": result,
+            "data": plan.processed_json,
             "timestamp": datetime.now().isoformat(),
-            "source": "canvas_api" if force_refresh else "database_cache"
+            "source": source,
+            "plan_updated_at": plan.created_at.isoformat() if plan.created_at else None,
+            "plan_age_seconds": round((datetime.now() - plan.created_at).total_seconds()) if plan.created_at else None,
+            "refresh_in_progress": week_plan_refresher.refreshing,
+            "refresh_started": refresh_started,
+            "last_refresh_at": week_plan_refresher.last_success_at.isoformat() if week_plan_refresher.last_success_at else None
         }
         
         # If user session provided, try to load saved board state
@@ -461,6 +696,22 @@ async def get_latest_week_plan(
             detail=f"Unable to retrieve weekly plan: {e}"
         )
 
+@app.get("/api/v1/week-plan/refresh/status")
+async def get_week_plan_refresh_status(db=Depends(get_db)):
+    """Get whether a weekly plan refresh is running on any worker and when the stored plan was updated."""
+    try:
+        plan = await week_plan_service.get_latest_plan_record(db)
+        # Counters are this worker's; whether a refresh is running is shared
+        return {
+            **week_plan_refresher.get_status(),
+            **await week_plan_refresher.get_shared_status(db),
+            "plan_updated_at": plan.created_at.isoformat() if plan and plan.created_at else None,
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Failed to get weekly plan refresh status: {e}")
+        raise HTTPException(status_code=500, detail=f"Unable to get refresh status: {e}")
+
 @app.get("/api/v1/week-plan/mock")
 async def get_mock_week_plan():
     """
@@ -747,7 +998,7 @@ async def get_board_state_summary(
         Summary of all board states for the weekly plan
     """
     try:
-        summary = board_state_service.get_board_state_summary(db, weekly_plan_id)
+        summary = await board_state_service.get_board_state_summary(db, weekly_plan_id)
         
         return {
             "status": "success",
@@ -765,6 +1016,8 @@ async def get_board_state_summary(
 @app.get("/api/v1/week-plan/all")
 async def get_all_week_plans(
     limit: int = Query(10, ge=1, le=50, description="Number of plans to return"),
+    summary: bool = Query(False, description="Return title and subject/lesson counts instead of full plans"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (summary mode)"),
     db=Depends(get_db)
 ):
     """
@@ -772,13 +1025,29 @@ async def get_all_week_plans(
     
     Args:
         limit: Maximum number of plans to return (1-50)
+        summary: Return lightweight summaries, paginated with cursor
+        cursor: Keyset cursor returned as next_cursor by the previous summary page
         db: Database session dependency
         
     Returns:
-        List of weekly plan JSON objects
+        List of weekly plan JSON objects, or of plan summaries with a next_cursor
     """
     try:
-        logger.info(f"Getting all week plans (limit: {limit})")
+        logger.info(f"Getting all week plans (limit: {limit}, summary: {summary})")
+        
+        if summary:
+            try:
+                page = await week_plan_service.get_week_plan_summaries(db, limit, cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            
+            return {
+                "status": "success",
+                "data": page["plans"],
+                "count": len(page["plans"]),
+                "next_cursor": page["next_cursor"],
+                "timestamp": datetime.now().isoformat()
+            }
         
         plans = await week_plan_service.get_all_week_plans(db, limit)
         
@@ -789,6 +1058,8 @@ async def get_all_week_plans(
             "timestamp": datetime.now().isoformat()
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to get week plans: {e}")
         raise HTTPException(
@@ -861,7 +1132,7 @@ async def test_integration(db=Depends(get_db)):
     try:
         logger.info("Running integration test")
         
-        result = week_plan_service.test_integration(db)
+        result = await week_plan_service.test_integration(db)
         
         # Return appropriate HTTP status based on test results
         if result["overall_status"] == "success":
@@ -1019,7 +1290,7 @@ async def mark_lesson_complete(
     try:
         logger.info(f"Marking lesson {lesson_id} as {'completed' if completed else 'incomplete'}")
         
-        result = lesson_content_service.mark_lesson_completed(
+        result = await lesson_content_service.mark_lesson_completed(
             db, lesson_id, user_session, completed
         )
         
@@ -1060,7 +1331,7 @@ async def get_weekly_plan_lessons(
     try:
         logger.info(f"Getting lessons for weekly plan {weekly_plan_id}")
         
-        lessons = lesson_content_service.get_lessons_for_weekly_plan(db, weekly_plan_id)
+        lessons = await lesson_content_service.get_lessons_for_weekly_plan(db, weekly_plan_id)
         
         return {
             "status": "success",
@@ -1358,7 +1629,7 @@ async def update_lesson_board_status(
                 detail=f"Invalid status. Must be one of: {', '.join(valid_statuses)}"
             )
         
-        result = lesson_content_service.update_lesson_status_in_board(
+        result = await lesson_content_service.update_lesson_status_in_board(
             db, lesson_id, status, user_session
         )
         
@@ -1456,25 +1727,29 @@ async def mark_canvas_lesson_complete(
             )
         
         # Sync with local database if lesson exists
-        lesson_content = db.query(LessonContent).filter(
-            and_(
-                LessonContent.course_id == course_id,
-                LessonContent.module_item_id == module_item_id
+        lesson_result = await db.execute(
+            select(LessonContent).where(
+                and_(
+                    LessonContent.course_id == course_id,
+                    LessonContent.module_item_id == module_item_id
+                )
             )
-        ).first()
+        )
+        lesson_content = lesson_result.scalars().first()
         
         local_sync_result = None
         if lesson_content:
             # Update local status to match Canvas
-            weekly_plan_lessons = db.query(WeeklyPlanLesson).filter(
-                WeeklyPlanLesson.lesson_content_id == lesson_content.id
-            ).all()
+            wpl_result = await db.execute(
+                select(WeeklyPlanLesson).where(WeeklyPlanLesson.lesson_content_id == lesson_content.id)
+            )
+            weekly_plan_lessons = wpl_result.scalars().all()
             
             for wpl in weekly_plan_lessons:
                 wpl.user_completed = completed
                 wpl.completion_date = datetime.now() if completed else None
             
-            db.commit()
+            await db.commit()
             local_sync_result = {
                 "synced": True,
                 "lesson_id": lesson_content.id,
@@ -1554,6 +1829,50 @@ async def get_canvas_lesson_status(
             "module_item_id": module_item_id
         }
 
+class LessonStatusItem(BaseModel):
+    """One lesson in a batch completion-status request."""
+    course_id: int
+    module_item_id: int
+    module_id: Optional[int] = None
+
+@app.post("/api/v1/canvas/lesson-status/batch")
+async def get_canvas_lesson_status_batch(items: List[LessonStatusItem]):
+    """
+    Get Canvas completion status for every lesson on the board in one call.
+
+    Request body should be a list of objects with 'course_id', 'module_item_id'
+    and optionally 'module_id':
+    [
+        {"course_id": 123, "module_id": 456, "module_item_id": 789},
+        {"course_id": 123, "module_id": 456, "module_item_id": 790}
+    ]
+
+    Items are answered from one modules listing per course, fetched concurrently.
+    """
+    try:
+        valid_items = [
+            item.model_dump() for item in items
+            if item.course_id and item.module_item_id
+        ]
+
+        logger.info(f"Getting batch Canvas status for {len(valid_items)} lessons")
+
+        results = await canvas_client.get_bulk_completion_status(valid_items)
+
+        return {
+            "success": True,
+            "results": results,
+            "count": len(results),
+            "timestamp": datetime.now().isoformat()
+        }
+
+    except Exception as e:
+        logger.error(f"Failed to get batch Canvas lesson status: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unable to check batch lesson status: {e}"
+        )
+
 @app.get("/api/v1/canvas/progress/{course_id}")
 async def get_canvas_course_progress(
     course_id: int,
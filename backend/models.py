@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, JSON, DateTime, Boolean, ForeignKey, Text, UniqueConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, JSON, Date, DateTime, Boolean, ForeignKey, Index, Text, UniqueConstraint
+from sqlalchemy.orm import relationship, validates
 from database import Base
 import datetime
 
@@ -42,6 +42,7 @@ class ConvertedCanvasPage(Base):
     # Performance tracking
     conversion_time_ms = Column(Integer, comment="Time taken for AI conversion in milliseconds")
     component_count = Column(Integer, comment="Number of components generated")
+    conversion_fingerprint = Column(String(64), index=True, comment="Prompt/model fingerprint of the conversion")
     
     # Indexing for fast lookups
     __table_args__ = (
@@ -53,12 +54,26 @@ class WeeklyPlan(Base):
     
     id = Column(Integer, primary_key=True)
     week_starting = Column(DateTime, nullable=False, index=True)
+    week_start = Column(Date, index=True, comment="Date part of week_starting, kept in sync on assignment")
     processed_json = Column(JSON, nullable=False, comment="The final JSON output from the LLM")
-    created_at = Column(DateTime, default=datetime.datetime.now)
+    announcement_fingerprint = Column(String(64), index=True, comment="Fingerprint of the announcement the plan was parsed from")
+    refresh_metadata = Column(JSON, comment="Stage timings of the refresh that produced the plan")
+    created_at = Column(DateTime, default=datetime.datetime.now, index=True)
     
     # Relationships
     board_states = relationship("BoardState", back_populates="weekly_plan")
     weekly_plan_lessons = relationship("WeeklyPlanLesson", back_populates="weekly_plan")
+    
+    # Keyset pagination of plan listings orders by (week_starting, id)
+    __table_args__ = (
+        Index('ix_weekly_plans_week_starting_id', 'week_starting', 'id'),
+    )
+    
+    @validates('week_starting')
+    def _sync_week_start(self, key, value):
+        """Keep the date-keyed week_start column in step with week_starting."""
+        self.week_start = value.date() if isinstance(value, datetime.datetime) else value
+        return value
 
 class BoardState(Base):
     __tablename__ = 'board_states'
@@ -142,6 +157,7 @@ class LessonContent(Base):
     last_fetched = Column(DateTime, default=datetime.datetime.now)
     last_transformed = Column(DateTime, default=datetime.datetime.now)
     content_hash = Column(String(64), comment="Hash of raw content to detect changes")
+    transformation_fingerprint = Column(String(64), index=True, comment="Prompt/model fingerprint of the transformation")
     
     # Relationship to weekly plans (a lesson can appear in multiple weeks)
     weekly_plan_lessons = relationship("WeeklyPlanLesson", back_populates="lesson_content")
@@ -172,4 +188,40 @@ class WeeklyPlanLesson(Base):
     lesson_content = relationship("LessonContent", back_populates="weekly_plan_lessons")
     
     created_at = Column(DateTime, default=datetime.datetime.now)
-    updated_at = Column(DateTime, default=datetime.datetime.now, onupdate=datetime.datetime.now) 
\ No newline at end of file
+    updated_at = Column(DateTime, default=datetime.datetime.now, onupdate=datetime.datetime.now) 
+
+class ModuleItemLocation(Base):
+    __tablename__ = 'module_item_locations'
+    
+    module_item_id = Column(Integer, primary_key=True, autoincrement=False, comment="Canvas module item ID")
+    course_id = Column(Integer, nullable=False, index=True, comment="Canvas course ID")
+    module_id = Column(Integer, nullable=False, comment="Canvas module ID containing the item")
+    updated_at = Column(DateTime, default=datetime.datetime.now, onupdate=datetime.datetime.now)
+
+class ContentConversion(Base):
+    __tablename__ = 'content_conversions'
+    
+    id = Column(Integer, primary_key=True)
+    content_hash = Column(String(64), nullable=False, comment="SHA-256 of the converted HTML")
+    kind = Column(String(50), nullable=False, comment="components, lesson_content, etc.")
+    fingerprint = Column(String(64), nullable=False, comment="Hash of the prompt and model that produced the result")
+    result = Column(JSON, nullable=False, comment="Conversion result")
+    
+    created_at = Column(DateTime, default=datetime.datetime.now)
+    last_used_at = Column(DateTime, default=datetime.datetime.now)
+    use_count = Column(Integer, default=0, comment="Times the result was reused instead of converting")
+    
+    # One result per content, conversion kind and prompt/model version
+    __table_args__ = (
+        UniqueConstraint('content_hash', 'kind', 'fingerprint', name='unique_content_conversion'),
+    )
+
+class BackgroundJobStatus(Base):
+    __tablename__ = 'background_job_statuses'
+    
+    name = Column(String(50), primary_key=True, comment="Job name, e.g. week_plan_refresh")
+    running = Column(Integer, default=0, comment="Runs in progress across all workers")
+    last_started_at = Column(DateTime)
+    last_finished_at = Column(DateTime)
+    last_success_at = Column(DateTime)
+    last_error = Column(Text, comment="Error of the last run, cleared when a run succeeds")
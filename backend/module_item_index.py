@@ -0,0 +1,231 @@
+"""
+Index of Canvas module item locations.
+Maps module_item_id -> (course_id, module_id) so completion lookups can build
+the item URL directly instead of scanning every module in a course.
+"""
+
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, delete, or_
+from sqlalchemy.dialects.postgresql import insert
+
+from database import SessionLocal
+from models import ModuleItemLocation
+
+logger = logging.getLogger(__name__)
+
+
+class ModuleItemIndex:
+    """
+    In-memory module item index backed by the module_item_locations table.
+
+    Entries are recorded as a side effect of module and module item fetches.
+    A course's entries are replaced whenever its module listing is refetched,
+    so items that moved or were removed do not linger. Only differences from
+    the in-memory snapshot are written, except on the first listing of a
+    course or module after a restart, which replaces its rows in the table.
+    """
+
+    def __init__(self):
+        self._locations: Dict[int, Tuple[int, int]] = {}  # module_item_id -> (course_id, module_id)
+        # Listings recorded since startup; their in-memory entries mirror the table
+        self._synced_courses: Set[int] = set()
+        self._synced_modules: Set[Tuple[int, int]] = set()
+
+        # Persist entries so a restart does not start from a cold index
+        self.persist = os.getenv("MODULE_INDEX_PERSIST", "true").lower() == "true"
+
+    async def record_course_modules(self, course_id: int, modules: List[Dict[str, Any]]):
+        """
+        Record item locations from a course's module listing.
+
+        Modules returned with embedded items replace the course's existing
+        entries. Entries for modules that are no longer listed are dropped;
+        entries for listed modules whose items were not embedded are kept.
+
+        Args:
+            course_id: Canvas course ID
+            modules: Module objects, optionally with embedded "items"
+        """
+        listed_modules = {module["id"] for module in modules}
+        expanded_modules = {module["id"] for module in modules if module.get("items") is not None}
+
+        stale = [
+            item_id for item_id, (item_course_id, module_id) in self._locations.items()
+            if item_course_id == course_id
+            and (module_id not in listed_modules or module_id in expanded_modules)
+        ]
+        previous = {item_id: self._locations.pop(item_id) for item_id in stale}
+
+        locations = {}
+        for module in modules:
+            for item in module.get("items") or []:
+                locations[item["id"]] = (course_id, module["id"])
+        changed = self._update(locations, previous)
+
+        replaced_rows = None
+        if course_id not in self._synced_courses:
+            # The table may hold rows this process never saw, e.g. from before a restart
+            self._synced_courses.add(course_id)
+            changed = locations
+            replaced_rows = and_(
+                ModuleItemLocation.course_id == course_id,
+                or_(
+                    ModuleItemLocation.module_id.notin_(listed_modules),
+                    ModuleItemLocation.module_id.in_(expanded_modules)
+                ),
+                ModuleItemLocation.module_item_id.notin_(list(locations))
+            )
+
+        removed = [item_id for item_id in stale if item_id not in locations]
+        await self._persist_replace(course_id, removed, changed, replaced_rows)
+
+    async def record_module_items(self, course_id: int, module_id: int, items: List[Dict[str, Any]]):
+        """
+        Record item locations from a single module's item listing.
+
+        Args:
+            course_id: Canvas course ID
+            module_id: Canvas module ID
+            items: Module item objects
+        """
+        stale = [
+            item_id for item_id, location in self._locations.items()
+            if location == (course_id, module_id)
+        ]
+        previous = {item_id: self._locations.pop(item_id) for item_id in stale}
+
+        locations = {item["id"]: (course_id, module_id) for item in items}
+        changed = self._update(locations, previous)
+
+        replaced_rows = None
+        if course_id not in self._synced_courses and (course_id, module_id) not in self._synced_modules:
+            self._synced_modules.add((course_id, module_id))
+            changed = locations
+            replaced_rows = and_(
+                ModuleItemLocation.course_id == course_id,
+                ModuleItemLocation.module_id == module_id,
+                ModuleItemLocation.module_item_id.notin_(list(locations))
+            )
+
+        removed = [item_id for item_id in stale if item_id not in locations]
+        await self._persist_replace(course_id, removed, changed, replaced_rows)
+
+    def _update(self, locations: Dict[int, Tuple[int, int]],
+                previous: Dict[int, Tuple[int, int]]) -> Dict[int, Tuple[int, int]]:
+        """Apply entries to the in-memory index and return those that differed from before the listing."""
+        changed = {
+            item_id: location for item_id, location in locations.items()
+            if self._locations.get(item_id, previous.get(item_id)) != location
+        }
+        self._locations.update(locations)
+        return changed
+
+    async def lookup(self, course_id: int, module_item_id: int) -> Optional[int]:
+        """
+        Look up the module containing an item.
+
+        Args:
+            course_id: Canvas course ID
+            module_item_id: Canvas module item ID
+
+        Returns:
+            Module ID if the item is indexed for this course, None otherwise
+        """
+        location = self._locations.get(module_item_id)
+
+        if location is None and self.persist:
+            location = await self._load(module_item_id)
+            if location is not None:
+                self._locations[module_item_id] = location
+
+        if location is None or location[0] != course_id:
+            return None
+
+        return location[1]
+
+    async def invalidate(self, module_item_id: int):
+        """
+        Drop an item's entry, e.g. after Canvas no longer finds it at the indexed module.
+
+        Args:
+            module_item_id: Canvas module item ID
+        """
+        location = self._locations.pop(module_item_id, None)
+        if location is not None:
+            logger.info(f"Invalidated module index entry for item {module_item_id}")
+
+        await self._persist_replace(None, [module_item_id], {})
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size information for diagnostics."""
+        return {
+            "indexed_items": len(self._locations),
+            "indexed_courses": len({course_id for course_id, _ in self._locations.values()}),
+            "persist": self.persist
+        }
+
+    async def _load(self, module_item_id: int) -> Optional[Tuple[int, int]]:
+        """Load a single entry from the database."""
+        try:
+            async with SessionLocal() as db:
+                row = await db.get(ModuleItemLocation, module_item_id)
+                return (row.course_id, row.module_id) if row else None
+        except Exception as e:
+            logger.warning(f"Module index lookup failed for item {module_item_id}: {e}")
+            return None
+
+    async def _persist_replace(self, course_id: Optional[int], removed: Iterable[int],
+                               locations: Dict[int, Tuple[int, int]], replaced_rows=None):
+        """
+        Mirror an in-memory update into the database (best effort).
+
+        Args:
+            course_id: Course being updated, for logging
+            removed: Item IDs dropped from the index
+            locations: Entries to upsert
+            replaced_rows: Optional condition selecting further rows to delete
+        """
+        if not self.persist:
+            return
+
+        removed = [item_id for item_id in removed if item_id not in locations]
+        if not removed and not locations and replaced_rows is None:
+            return
+
+        try:
+            async with SessionLocal() as db:
+                if replaced_rows is not None:
+                    await db.execute(delete(ModuleItemLocation).where(replaced_rows))
+                if removed:
+                    await db.execute(
+                        delete(ModuleItemLocation).where(ModuleItemLocation.module_item_id.in_(removed))
+                    )
+                if locations:
+                    now = datetime.now()
+                    statement = insert(ModuleItemLocation).values([
+                        {
+                            "module_item_id": item_id,
+                            "course_id": item_course_id,
+                            "module_id": module_id,
+                            "updated_at": now
+                        }
+                        for item_id, (item_course_id, module_id) in locations.items()
+                    ])
+                    await db.execute(statement.on_conflict_do_update(
+                        index_elements=[ModuleItemLocation.module_item_id],
+                        set_={
+                            "course_id": statement.excluded.course_id,
+                            "module_id": statement.excluded.module_id,
+                            "updated_at": statement.excluded.updated_at
+                        }
+                    ))
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"Failed to persist module index for course {course_id}: {e}")
+
+# Singleton instance for use throughout the application
+module_item_index = ModuleItemIndex()
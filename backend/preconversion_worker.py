@@ -0,0 +1,197 @@
+"""
+Background pre-conversion of the current week's lesson pages.
+After a weekly plan is saved, every Canvas page linked from its classwork is
+queued and converted ahead of time, so students do not pay the LLM latency
+on first open.
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from ai_service import ai_service
+from canvas_client import canvas_client
+from canvas_scheduler import PRIORITY_PREFETCH, canvas_priority
+from converted_page_service import ConvertedPageService
+
+logger = logging.getLogger(__name__)
+
+# Matches .../courses/{course_id}/pages/{page_slug} in API and HTML URLs
+PAGE_URL_PATTERN = re.compile(r"/courses/(\d+)/pages/([^/?#]+)")
+
+
+class PreconversionWorker:
+    """
+    Priority queue of page conversions drained by a bounded pool of workers.
+    Lower priority values run first; the first lesson of every subject is
+    queued ahead of later lessons.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("PRECONVERT_ENABLED", "true").lower() == "true"
+        self.concurrency = int(os.getenv("PRECONVERT_CONCURRENCY", "2"))
+
+        self.converted_page_service = ConvertedPageService(ai_service)
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._sequence = itertools.count()
+        self._pending: Set[Tuple[int, str]] = set()  # queued or in progress
+        self._in_progress: Set[Tuple[int, str]] = set()
+
+        self.stats = {"enqueued": 0, "converted": 0, "already_converted": 0, "skipped": 0, "failed": 0}
+        self.last_enqueued_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    def extract_pages(self, plan: Dict[str, Any]) -> List[Tuple[int, int, str]]:
+        """
+        Collect the Canvas pages linked from a weekly plan's classwork.
+
+        Module item html_urls do not carry the page slug, so the lesson API
+        URLs are used first with the HTML URLs as a fallback.
+
+        Args:
+            plan: Processed weekly plan JSON
+
+        Returns:
+            List of (priority, course_id, page_slug), highest priority first
+        """
+        pages = []
+        seen = set()
+
+        for subject_index, subject_data in enumerate(plan.get('classwork', [])):
+            lesson_api_urls = subject_data.get('lesson_api_urls', {})
+            canvas_urls = subject_data.get('canvas_urls', {})
+
+            for lesson_index, lesson in enumerate(subject_data.get('lessons', [])):
+                for url in (lesson_api_urls.get(lesson), canvas_urls.get(lesson)):
+                    match = PAGE_URL_PATTERN.search(url or '')
+                    if match:
+                        key = (int(match.group(1)), match.group(2))
+                        if key not in seen:
+                            seen.add(key)
+                            # Earlier lessons first, interleaved across subjects
+                            pages.append((lesson_index * 1000 + subject_index, *key))
+                        break
+
+        return sorted(pages)
+
+    def enqueue_week_plan(self, plan: Dict[str, Any]) -> int:
+        """
+        Queue every page linked from a weekly plan for pre-conversion.
+
+        Args:
+            plan: Processed weekly plan JSON
+
+        Returns:
+            Number of pages newly queued
+        """
+        if not self.enabled:
+            return 0
+
+        self.start()
+
+        queued = 0
+        for priority, course_id, page_slug in self.extract_pages(plan):
+            key = (course_id, page_slug)
+            if key in self._pending:
+                continue
+
+            self._pending.add(key)
+            self._queue.put_nowait((priority, next(self._sequence), key))
+            queued += 1
+
+        self.stats["enqueued"] += queued
+        self.last_enqueued_at = datetime.now()
+        logger.info(f"Queued {queued} lesson pages for pre-conversion")
+        return queued
+
+    async def _convert(self, course_id: int, page_slug: str):
+        """Fetch and convert one page unless a current conversion is already stored."""
+        revalidation = await canvas_client.get_page_content_conditional(course_id, page_slug)
+        content_hash = revalidation["content_hash"]
+
+        if not revalidation["not_modified"] and not revalidation["page"].get('body'):
+            self.stats["skipped"] += 1
+            return
+
+        # Pre-conversion is not a student visit, so the lookup must not touch access times
+        if await self.converted_page_service.has_current_conversion(course_id, page_slug, content_hash):
+            self.stats["already_converted"] += 1
+            return
+
+        page_content = revalidation["page"]
+        if revalidation["not_modified"] and not page_content.get('body'):
+            page_content = await canvas_client.get_page_content(course_id, page_slug)
+            content_hash = None
+
+        result = await self.converted_page_service.convert_page(
+            course_id=course_id,
+            page_slug=page_slug,
+            canvas_data=page_content,
+            html_body=page_content.get('body', ''),
+            content_hash=content_hash
+        )
+
+        if not result["success"]:
+            raise Exception(result["error"])
+
+        self.stats["converted"] += 1
+
+    async def _run(self):
+        """Worker loop: convert queued pages in priority order."""
+        while True:
+            _, _, key = await self._queue.get()
+            self._in_progress.add(key)
+            try:
+                # Yield Canvas capacity to interactive lesson loads
+                with canvas_priority(PRIORITY_PREFETCH):
+                    await self._convert(*key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["failed"] += 1
+                self.last_error = f"{key[0]}/{key[1]}: {e}"
+                logger.error(f"Pre-conversion failed for {key[0]}/{key[1]}: {e}")
+            finally:
+                self._in_progress.discard(key)
+                self._pending.discard(key)
+                self._queue.task_done()
+
+    def start(self):
+        """Start the worker pool if it is not already running."""
+        if not self.enabled or self._workers:
+            return
+
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+
+        loop = asyncio.get_running_loop()
+        self._workers = [loop.create_task(self._run()) for _ in range(self.concurrency)]
+        logger.info(f"Pre-conversion worker started with {self.concurrency} workers")
+
+    async def stop(self):
+        """Cancel the worker pool; queued pages are dropped."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get queue depth, progress counters and the last error."""
+        return {
+            "enabled": self.enabled,
+            "workers": len(self._workers),
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "in_progress": [f"{course_id}/{page_slug}" for course_id, page_slug in self._in_progress],
+            **self.stats,
+            "last_enqueued_at": self.last_enqueued_at.isoformat() if self.last_enqueued_at else None,
+            "last_error": self.last_error
+        }
+
+
+# Singleton instance for use throughout the application
+preconversion_worker = PreconversionWorker()
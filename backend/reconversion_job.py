@@ -0,0 +1,222 @@
+"""
+Background upgrade of conversions made with an older prompt or model.
+Stored conversions keep being served while they wait; the job re-converts
+them from their stored HTML a few at a time, most recently used first, so a
+prompt change never cold-starts the cache.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+
+from sqlalchemy import func, or_, select
+
+from ai_service import ai_service
+from converted_page_service import ConvertedPageService
+from database import SessionLocal
+from lesson_content_service import lesson_content_service
+from models import ConvertedCanvasPage, LessonContent
+
+logger = logging.getLogger(__name__)
+
+
+class ReconversionJob:
+    """
+    Periodically re-converts rows whose fingerprint differs from the current
+    prompt/model fingerprint, within a budget of conversions per interval.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("RECONVERT_ENABLED", "true").lower() == "true"
+        self.interval = float(os.getenv("RECONVERT_INTERVAL", "60"))
+        self.budget_per_interval = int(os.getenv("RECONVERT_BUDGET_PER_INTERVAL", "5"))
+
+        self.converted_page_service = ConvertedPageService(ai_service)
+        self._task: Optional[asyncio.Task] = None
+        self._run_lock = asyncio.Lock()
+        # Rows whose upgrade failed are not retried until restart, so they
+        # cannot use up every interval's budget
+        self._failed_pages: Set[int] = set()
+        self._failed_lessons: Set[int] = set()
+
+        self.stats = {"runs": 0, "pages_upgraded": 0, "lessons_upgraded": 0, "failed": 0}
+        self.last_run_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    def _stale_pages(self, exclude_failed: bool = False):
+        fingerprint = ai_service.get_conversion_fingerprint("components")
+        statement = select(ConvertedCanvasPage).where(
+            ConvertedCanvasPage.conversion_success.is_(True),
+            ConvertedCanvasPage.raw_html_body.isnot(None),
+            or_(
+                ConvertedCanvasPage.conversion_fingerprint.is_(None),
+                ConvertedCanvasPage.conversion_fingerprint != fingerprint
+            )
+        )
+        if exclude_failed and self._failed_pages:
+            statement = statement.where(ConvertedCanvasPage.id.notin_(self._failed_pages))
+        return statement
+
+    def _stale_lessons(self, exclude_failed: bool = False):
+        fingerprint = ai_service.get_conversion_fingerprint("lesson_content")
+        statement = select(LessonContent).where(
+            LessonContent.transformation_success.is_(True),
+            or_(
+                LessonContent.transformation_fingerprint.is_(None),
+                LessonContent.transformation_fingerprint != fingerprint
+            )
+        )
+        if exclude_failed and self._failed_lessons:
+            statement = statement.where(LessonContent.id.notin_(self._failed_lessons))
+        return statement
+
+    async def run_once(self, budget: Optional[int] = None) -> int:
+        """
+        Upgrade up to budget stale conversions, pages before lessons.
+
+        Args:
+            budget: Maximum conversions to run (defaults to the per-interval budget)
+
+        Returns:
+            Number of conversions upgraded
+        """
+        budget = self.budget_per_interval if budget is None else budget
+
+        async with self._run_lock:
+            self.stats["runs"] += 1
+            self.last_run_at = datetime.now()
+
+            upgraded = await self._upgrade_pages(budget)
+            upgraded += await self._upgrade_lessons(budget - upgraded)
+
+            if upgraded:
+                logger.info(f"Upgraded {upgraded} conversions to the current prompt/model")
+            return upgraded
+
+    async def _upgrade_pages(self, limit: int) -> int:
+        """
+        Re-convert the most recently accessed stale converted pages.
+
+        Only the keys are loaded up front; each page is then upgraded on its
+        own, under the same coalescing and lock as a live conversion.
+        """
+        if limit <= 0:
+            return 0
+
+        async with SessionLocal() as db:
+            result = await db.execute(
+                self._stale_pages(exclude_failed=True)
+                .with_only_columns(
+                    ConvertedCanvasPage.id, ConvertedCanvasPage.course_id,
+                    ConvertedCanvasPage.page_slug, ConvertedCanvasPage.content_hash
+                )
+                .order_by(ConvertedCanvasPage.last_accessed_at.desc())
+                .limit(limit)
+            )
+            pages = result.all()
+
+        upgraded = 0
+        for page_id, course_id, page_slug, content_hash in pages:
+            try:
+                if await self.converted_page_service.upgrade_conversion(course_id, page_slug, content_hash):
+                    upgraded += 1
+                    self.stats["pages_upgraded"] += 1
+                else:
+                    self._failed_pages.add(page_id)
+                    self.stats["failed"] += 1
+            except Exception as e:
+                self._failed_pages.add(page_id)
+                self.stats["failed"] += 1
+                self.last_error = f"{course_id}/{page_slug}: {e}"
+                logger.error(f"Failed to upgrade page {course_id}/{page_slug}: {e}")
+
+        return upgraded
+
+    async def _upgrade_lessons(self, limit: int) -> int:
+        """Re-transform the most recently fetched stale lesson contents, one short session each."""
+        if limit <= 0:
+            return 0
+
+        async with SessionLocal() as db:
+            result = await db.execute(
+                self._stale_lessons(exclude_failed=True)
+                .with_only_columns(LessonContent.id)
+                .order_by(LessonContent.last_fetched.desc())
+                .limit(limit)
+            )
+            lesson_ids = result.scalars().all()
+
+        upgraded = 0
+        for lesson_id in lesson_ids:
+            try:
+                if await lesson_content_service.upgrade_transformation(lesson_id):
+                    upgraded += 1
+                    self.stats["lessons_upgraded"] += 1
+                else:
+                    self._failed_lessons.add(lesson_id)
+                    self.stats["failed"] += 1
+            except Exception as e:
+                self._failed_lessons.add(lesson_id)
+                self.stats["failed"] += 1
+                self.last_error = f"lesson {lesson_id}: {e}"
+                logger.error(f"Failed to upgrade lesson {lesson_id}: {e}")
+
+        return upgraded
+
+    async def count_stale(self) -> Dict[str, int]:
+        """Count conversions still made with an older prompt or model."""
+        async with SessionLocal() as db:
+            pages = await db.scalar(select(func.count()).select_from(self._stale_pages().subquery()))
+            lessons = await db.scalar(select(func.count()).select_from(self._stale_lessons().subquery()))
+        return {"pages": pages or 0, "lessons": lessons or 0}
+
+    async def _run(self):
+        """Upgrade a budget of stale conversions every interval until cancelled."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Reconversion run failed: {e}")
+
+    def start(self):
+        """Start the periodic reconversion task."""
+        if not self.enabled or (self._task is not None and not self._task.done()):
+            return
+
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info(f"Reconversion job started ({self.budget_per_interval} conversions every {self.interval}s)")
+
+    async def stop(self):
+        """Stop the periodic reconversion task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def get_status(self) -> Dict[str, Any]:
+        """Get stale counts, progress counters and the current fingerprints."""
+        return {
+            "enabled": self.enabled,
+            "running": self._task is not None and not self._task.done(),
+            "interval_seconds": self.interval,
+            "budget_per_interval": self.budget_per_interval,
+            "stale": await self.count_stale(),
+            **self.stats,
+            "fingerprints": {
+                "components": ai_service.get_conversion_fingerprint("components"),
+                "lesson_content": ai_service.get_conversion_fingerprint("lesson_content")
+            },
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_error": self.last_error
+        }
+
+
+# Singleton instance for use throughout the application
+reconversion_job = ReconversionJob()
@@ -0,0 +1,258 @@
+"""
+Request coalescing helpers.
+SingleFlight collapses concurrent in-process calls with the same key into one
+execution; advisory_lock extends that across workers with a Postgres
+advisory lock, falling back to a local lock when the database cannot
+provide one. StreamFeed lets callers follow a shared call's partial output.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from database import ASYNC_DATABASE_URL, DB_POOL_PRE_PING, DB_POOL_RECYCLE
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time. Callers that arrive while a call
+    for their key is in flight await its result instead of starting another.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn for key, or join the call already running for key.
+
+        The shared call is shielded, so a cancelled caller does not cancel
+        it for the others.
+
+        Args:
+            key: Coalescing key
+            fn: Zero-argument coroutine factory producing the result
+
+        Returns:
+            The result of the (possibly shared) call
+        """
+        return await asyncio.shield(self.start(key, fn))
+
+    def start(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        """
+        Start fn for key as a task, or return the call already running for key.
+
+        The call runs to completion whether or not the returned future is
+        awaited; await it through asyncio.shield so cancelling one caller
+        does not cancel it for the others.
+
+        Args:
+            key: Coalescing key
+            fn: Zero-argument coroutine factory, only called when nothing is in flight
+
+        Returns:
+            Future of the (possibly shared) call
+        """
+        future = self._inflight.get(key)
+
+        if future is not None:
+            self.followers += 1
+            return future
+
+        self.leaders += 1
+        future = asyncio.ensure_future(fn())
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return future
+
+    def is_in_flight(self, key: Hashable) -> bool:
+        """Check whether a call for key is currently running."""
+        return key in self._inflight
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get in-flight and coalescing counters."""
+        return {
+            "in_flight": len(self._inflight),
+            "leaders": self.leaders,
+            "followers": self.followers
+        }
+
+
+class StreamFeed:
+    """
+    Items produced by one running call, replayed in order to any number of
+    subscribers as they arrive. Subscribers that join late start from the
+    first item.
+    """
+
+    def __init__(self):
+        self.items: List[Any] = []
+        self.finished = False
+        self._updated = asyncio.Event()
+
+    def publish(self, item: Any):
+        """Append an item and wake every subscriber."""
+        self.items.append(item)
+        self._notify()
+
+    def finish(self):
+        """Mark the feed complete; subscribers stop once they have every item."""
+        self.finished = True
+        self._notify()
+
+    def _notify(self):
+        self._updated.set()
+        self._updated = asyncio.Event()
+
+    async def subscribe(self) -> AsyncIterator[Any]:
+        """
+        Yield every item published so far, then each new one until the feed finishes.
+
+        Yields:
+            Items in publication order
+        """
+        index = 0
+        while True:
+            if index < len(self.items):
+                yield self.items[index]
+                index += 1
+            elif self.finished:
+                return
+            else:
+                await self._updated.wait()
+
+
+# Local stand-ins used when a Postgres advisory lock is unavailable, with the
+# number of holders and waiters of each so a lock is only dropped once unused
+_local_locks: Dict[str, asyncio.Lock] = {}
+_local_lock_users: Dict[str, int] = {}
+
+ADVISORY_LOCKS_ENABLED = os.getenv("ADVISORY_LOCKS_ENABLED", "true").lower() == "true"
+ADVISORY_LOCK_TIMEOUT = float(os.getenv("ADVISORY_LOCK_TIMEOUT", "300"))
+ADVISORY_LOCK_POLL_INTERVAL = float(os.getenv("ADVISORY_LOCK_POLL_INTERVAL", "0.5"))
+ADVISORY_LOCK_POOL_SIZE = int(os.getenv("ADVISORY_LOCK_POOL_SIZE", "16"))
+
+# A lock holder keeps its connection for the whole locked block (an LLM call),
+# so lock connections come from their own small pool rather than the request
+# pool. Once it is exhausted, further lockers wait for a connection for up to
+# ADVISORY_LOCK_TIMEOUT, then fall back to the local lock.
+lock_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_size=ADVISORY_LOCK_POOL_SIZE,
+    max_overflow=0,
+    pool_timeout=ADVISORY_LOCK_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING
+)
+
+
+def _advisory_key(name: str) -> int:
+    """Map a lock name onto Postgres' signed 64-bit advisory lock key space."""
+    return int.from_bytes(hashlib.sha256(name.encode('utf-8')).digest()[:8], "big", signed=True)
+
+
+@asynccontextmanager
+async def _local_lock(name: str):
+    """Process-local lock for name, shared by everyone holding or waiting for it."""
+    lock = _local_locks.setdefault(name, asyncio.Lock())
+    _local_lock_users[name] = _local_lock_users.get(name, 0) + 1
+    try:
+        async with lock:
+            yield
+    finally:
+        _local_lock_users[name] -= 1
+        if not _local_lock_users[name]:
+            del _local_lock_users[name]
+            del _local_locks[name]
+
+
+async def _try_advisory_lock(key: int) -> Optional[AsyncConnection]:
+    """
+    Try once to take a session-level advisory lock.
+
+    Returns:
+        The connection holding the lock, or None if another session holds it
+
+    Raises:
+        Exception: If the database cannot be reached
+    """
+    conn = await lock_engine.connect()
+    try:
+        acquired = (await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key})).scalar()
+        # The lock outlives the transaction; end it so the connection is not
+        # left idle in a transaction while the lock is held
+        await conn.commit()
+    except BaseException:
+        await conn.close()
+        raise
+
+    if not acquired:
+        await conn.close()
+        return None
+    return conn
+
+
+@asynccontextmanager
+async def advisory_lock(name: str):
+    """
+    Hold a cross-worker lock for the duration of the block.
+
+    Polls for a session-level Postgres advisory lock on a connection from
+    lock_engine, returning it to the pool between attempts, and keeps the
+    connection that took it outside of any transaction until the block
+    exits. If advisory locks are
+    disabled, the database cannot be reached, or the lock is not acquired
+    within ADVISORY_LOCK_TIMEOUT, a process-local lock is used instead.
+
+    Args:
+        name: Lock name; equal names contend for the same lock
+    """
+    if not ADVISORY_LOCKS_ENABLED or lock_engine.dialect.name != "postgresql":
+        async with _local_lock(name):
+            yield
+        return
+
+    key = _advisory_key(name)
+    deadline = time.monotonic() + ADVISORY_LOCK_TIMEOUT
+    conn = None
+    try:
+        while True:
+            conn = await _try_advisory_lock(key)
+            if conn is not None or time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(ADVISORY_LOCK_POLL_INTERVAL)
+        if conn is None:
+            logger.warning(f"Timed out waiting {ADVISORY_LOCK_TIMEOUT}s for advisory lock {name}, using local lock")
+    except Exception as e:
+        logger.warning(f"Advisory lock unavailable for {name}, using local lock: {e}")
+        conn = None
+
+    if conn is None:
+        async with _local_lock(name):
+            yield
+        return
+
+    try:
+        yield
+    finally:
+        try:
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+            await conn.commit()
+        except BaseException as e:
+            # A connection that may still hold the lock must not go back to the pool
+            logger.warning(f"Failed to release advisory lock {name}, discarding its connection: {e!r}")
+            await conn.invalidate()
+        finally:
+            await conn.close()
@@ -0,0 +1,104 @@
+"""
+Minimal dependency-graph executor for multi-step pipelines.
+Each stage starts as soon as the stages it depends on have finished, so
+independent stages overlap, and the timing of every stage is recorded.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+# A stage receives the results of every finished stage, keyed by stage name
+StageFunction = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class StageGraph:
+    """
+    Named async stages with dependencies, run concurrently where the graph
+    allows. Stages must be added after the stages they depend on.
+    """
+
+    def __init__(self):
+        self._stages: Dict[str, Tuple[StageFunction, Tuple[str, ...]]] = {}
+        self._started_at: Optional[float] = None
+        self.timings: Dict[str, Dict[str, Any]] = {}
+
+    def add_stage(self, name: str, fn: StageFunction, depends_on: Iterable[str] = ()):
+        """
+        Add a stage to the graph.
+
+        Args:
+            name: Unique stage name; its result is stored under this key
+            fn: Coroutine function called with the results dict
+            depends_on: Names of stages that must finish first
+
+        Raises:
+            ValueError: If the name is taken or a dependency is unknown
+        """
+        depends_on = tuple(depends_on)
+        if name in self._stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        for dependency in depends_on:
+            if dependency not in self._stages:
+                raise ValueError(f"Stage {name} depends on unknown stage {dependency}")
+
+        self._stages[name] = (fn, depends_on)
+
+    async def run(self, results: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Run every stage that has no result yet.
+
+        The graph can be run again after adding stages; earlier results are
+        passed back in and those stages are not repeated. If a stage fails
+        the remaining stages are cancelled and the error is raised.
+
+        Args:
+            results: Results of stages that already ran
+
+        Returns:
+            Results of every stage, keyed by stage name
+        """
+        results = dict(results or {})
+        if self._started_at is None:
+            self._started_at = time.perf_counter()
+
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_stage(name: str) -> Any:
+            fn, depends_on = self._stages[name]
+            await asyncio.gather(*(tasks[dependency] for dependency in depends_on if dependency in tasks))
+
+            started = time.perf_counter()
+            status = "failed"
+            try:
+                results[name] = await fn(results)
+                status = "ok"
+                return results[name]
+            finally:
+                self.timings[name] = {
+                    "start_ms": round((started - self._started_at) * 1000, 1),
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+                    "status": status
+                }
+
+        for name in self._stages:
+            if name not in results:
+                tasks[name] = asyncio.ensure_future(run_stage(name))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        return results
+
+    def get_metadata(self) -> Dict[str, Any]:
+        """Get per-stage timings and the wall-clock time since the first run."""
+        elapsed = time.perf_counter() - self._started_at if self._started_at is not None else 0.0
+        return {
+            "stages": dict(self.timings),
+            "total_ms": round(elapsed * 1000, 1)
+        }
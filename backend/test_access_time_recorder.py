@@ -0,0 +1,106 @@
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from access_time_recorder import AccessTimeRecorder
+
+
+class FakeEngine:
+    """Engine stand-in whose connections record executed parameter batches."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.batches = []
+
+    @asynccontextmanager
+    async def begin(self):
+        conn = AsyncMock()
+
+        async def execute(statement, rows):
+            if self.fail:
+                raise Exception("database unavailable")
+            self.batches.append(rows)
+
+        conn.execute.side_effect = execute
+        yield conn
+
+
+class TestAccessTimeRecorder:
+    """Unit tests for buffered page access time writes."""
+
+    @pytest.fixture
+    def engine(self):
+        """Patch the recorder's engine with a fake."""
+        fake = FakeEngine()
+        with patch("access_time_recorder.engine", fake):
+            yield fake
+
+    @pytest.mark.asyncio
+    async def test_touches_are_buffered_until_flush(self, engine):
+        """Test repeated touches collapse into one row written by a single flush."""
+        recorder = AccessTimeRecorder()
+
+        recorder.touch(1, "lesson-1")
+        latest = recorder.touch(1, "lesson-1")
+        recorder.touch(2, "lesson-2")
+
+        assert engine.batches == []
+        assert recorder.get_stats()["pending"] == 2
+
+        assert await recorder.flush() == 2
+        assert len(engine.batches) == 1
+        rows = {(row["b_course_id"], row["b_page_slug"]): row["b_accessed_at"] for row in engine.batches[0]}
+        assert rows[(1, "lesson-1")] == latest
+
+        stats = recorder.get_stats()
+        assert stats["pending"] == 0
+        assert stats["touches"] == 3
+        assert stats["flushes"] == 1
+        assert stats["rows_flushed"] == 2
+        assert await recorder.flush() == 0
+
+    @pytest.mark.asyncio
+    async def test_flushes_early_at_max_buffer(self, engine):
+        """Test reaching the maximum buffer size starts a flush without waiting for the interval."""
+        with patch.dict("os.environ", {"ACCESS_TIME_MAX_BUFFER": "3"}):
+            recorder = AccessTimeRecorder()
+
+        recorder.touch(1, "a")
+        recorder.touch(1, "b")
+        await asyncio.sleep(0)
+        assert engine.batches == []
+
+        recorder.touch(1, "c")
+        await recorder._early_flush
+
+        assert len(engine.batches) == 1
+        assert len(engine.batches[0]) == 3
+        assert recorder.get_stats()["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_pending_touches(self, engine):
+        """Test stopping cancels the periodic task and writes out what is buffered."""
+        with patch.dict("os.environ", {"ACCESS_TIME_FLUSH_INTERVAL": "3600"}):
+            recorder = AccessTimeRecorder()
+
+        recorder.start()
+        recorder.touch(1, "lesson-1")
+        await recorder.stop()
+
+        assert recorder._flush_task is None
+        assert len(engine.batches) == 1
+        assert recorder.get_stats()["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_touches(self):
+        """Test touches survive a failed flush without overwriting newer ones."""
+        recorder = AccessTimeRecorder()
+
+        with patch("access_time_recorder.engine", FakeEngine(fail=True)):
+            recorder.touch(1, "lesson-1")
+            assert await recorder.flush() == 0
+
+        assert recorder.get_stats()["pending"] == 1
+        assert recorder.get_stats()["flush_errors"] == 1
@@ -0,0 +1,197 @@
+import asyncio
+import pytest
+import os
+from unittest.mock import patch, AsyncMock, MagicMock
+
+import httpx
+import openai
+
+# The module-level ai_service singleton requires a token at import time
+os.environ.setdefault('XAI_TOKEN', 'test_token')
+
+from ai_service import AIService
+
+
+def make_completion(content):
+    """Build a minimal chat completion response."""
+    completion = MagicMock()
+    completion.choices[0].message.content = content
+    return completion
+
+
+def make_stream(*pieces):
+    """Build a streamed chat completion yielding the given content pieces."""
+    async def chunks():
+        for piece in pieces:
+            chunk = MagicMock()
+            chunk.choices[0].delta.content = piece
+            yield chunk
+    return chunks()
+
+
+class TestAIServiceRequestExecutor:
+    """Unit tests for the AI request executor."""
+    
+    @pytest.fixture
+    def service(self):
+        """Create an AI service with fast retries."""
+        with patch.dict(os.environ, {
+            'XAI_TOKEN': 'test_token',
+            'AI_MAX_RETRIES': '2',
+            'AI_RETRY_BASE_DELAY': '0',
+            'AI_RETRY_MAX_DELAY': '0'
+        }):
+            return AIService()
+    
+    @pytest.mark.asyncio
+    async def test_make_api_call_retries_transient_errors(self, service):
+        """Test server errors are retried and JSON mode is requested."""
+        request = httpx.Request("POST", "https://api.x.ai/v1/chat/completions")
+        server_error = openai.InternalServerError(
+            "unavailable", response=httpx.Response(503, request=request), body=None
+        )
+        create = AsyncMock(side_effect=[server_error, make_completion('```json\n{"title": "Lesson"}\n```')])
+        
+        with patch.object(service.client.chat.completions, 'create', create):
+            content = await service._make_api_call("system", "user")
+        
+        assert content == '{"title": "Lesson"}'
+        assert create.await_count == 2
+        assert create.await_args.kwargs["response_format"] == {"type": "json_object"}
+        assert service.request_stats["retries"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_make_api_call_gives_up_after_max_retries(self, service):
+        """Test the last error is raised once retries are exhausted."""
+        create = AsyncMock(side_effect=openai.APITimeoutError(httpx.Request("POST", "https://api.x.ai")))
+        
+        with patch.object(service.client.chat.completions, 'create', create):
+            with pytest.raises(openai.APITimeoutError):
+                await service._make_api_call("system", "user")
+        
+        assert create.await_count == 3
+        assert service.request_stats["failures"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_retry_after_is_honoured(self, service):
+        """Test a rate limit waits for the server's Retry-After when it is within the cap."""
+        request = httpx.Request("POST", "https://api.x.ai/v1/chat/completions")
+        rate_limited = openai.RateLimitError(
+            "slow down", response=httpx.Response(429, headers={"Retry-After": "2"}, request=request), body=None
+        )
+        create = AsyncMock(side_effect=[rate_limited, make_completion('{"title": "Lesson"}')])
+        service.retry_max_delay = 5
+        
+        with patch.object(service.client.chat.completions, 'create', create), \
+             patch('ai_service.asyncio.sleep', new_callable=AsyncMock) as sleep:
+            await service._make_api_call("system", "user")
+        
+        sleep.assert_awaited_once_with(2.0)
+        assert create.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_retry_after_beyond_cap_is_not_retried(self, service):
+        """Test a Retry-After longer than the maximum delay fails instead of retrying early."""
+        request = httpx.Request("POST", "https://api.x.ai/v1/chat/completions")
+        rate_limited = openai.RateLimitError(
+            "slow down", response=httpx.Response(429, headers={"Retry-After": "30"}, request=request), body=None
+        )
+        create = AsyncMock(side_effect=rate_limited)
+        service.retry_max_delay = 5
+        
+        with patch.object(service.client.chat.completions, 'create', create):
+            with pytest.raises(openai.RateLimitError):
+                await service._make_api_call("system", "user")
+        
+        assert create.await_count == 1
+        assert service.request_stats["retries"] == 0
+        assert service.request_stats["failures"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_transform_lesson_content_uses_executor(self, service):
+        """Test lesson transformation succeeds instead of falling back."""
+        create = AsyncMock(return_value=make_completion('{"title": "Fractions", "summary": "s", "sections": []}'))
+        
+        with patch.object(service.client.chat.completions, 'create', create):
+            result = await service.transform_lesson_content("<p>Fractions</p>", "Fractions", "Page")
+        
+        assert result["success"] is True
+        assert result["content"]["title"] == "Fractions"
+    
+    @pytest.mark.asyncio
+    async def test_stream_retries_before_first_output(self, service):
+        """Test a stream that fails to open is retried like a plain request."""
+        request = httpx.Request("POST", "https://api.x.ai/v1/chat/completions")
+        server_error = openai.InternalServerError(
+            "unavailable", response=httpx.Response(503, request=request), body=None
+        )
+        create = AsyncMock(side_effect=[server_error, make_stream('[{"type": ', '"paragraph"}]')])
+        
+        with patch.object(service.client.chat.completions, 'create', create):
+            pieces = [piece async for piece in service._stream_chat_completion(model="m", messages=[])]
+        
+        assert "".join(pieces) == '[{"type": "paragraph"}]'
+        assert create.await_count == 2
+        assert service.request_stats["retries"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_stream_times_out_waiting_for_chunks(self, service):
+        """Test a stalled stream is bounded by the request timeout."""
+        async def stalled():
+            await asyncio.sleep(10)
+            yield MagicMock()
+        
+        service.request_timeout = 0.01
+        create = AsyncMock(side_effect=lambda **kwargs: stalled())
+        
+        with patch.object(service.client.chat.completions, 'create', create):
+            with pytest.raises(asyncio.TimeoutError):
+                async for _ in service._stream_chat_completion(model="m", messages=[]):
+                    pass
+        
+        assert create.await_count == 3
+        assert service.request_stats["timeouts"] == 3
+    
+    @pytest.mark.asyncio
+    async def test_streamed_chunks_are_stitched(self, service):
+        """Test a resource list split across chunks is streamed as one component."""
+        chunks = [
+            [{"type": "paragraph", "content": "a"}, {"type": "resource_list", "items": [1]}],
+            [{"type": "resource_list", "items": [2]}, {"type": "resource_list", "items": [3]}]
+        ]
+        
+        async def stream_chunk(html_content, part=None):
+            for component in chunks[part[0] - 1]:
+                yield component
+        
+        service.fast_path_enabled = False
+        with patch('ai_service.split_html_into_chunks', return_value=["one", "two"]), \
+             patch.object(service, '_stream_html_chunk_with_llm', stream_chunk):
+            streamed = [component async for component in service.stream_html_to_components("<p>page</p>")]
+        
+        assert streamed == service._stitch_components(chunks)
+        assert streamed[1] == {"type": "resource_list", "items": [1, 2]}
+        assert len(streamed) == 3
+    
+    def test_fingerprint_tracks_parser_version(self, service):
+        """Test a parser change invalidates stored components but not lesson transformations."""
+        components = service.get_conversion_fingerprint("components")
+        lesson_content = service.get_conversion_fingerprint("lesson_content")
+        
+        service._fingerprints.clear()
+        with patch('ai_service.PARSER_VERSION', 2):
+            assert service.get_conversion_fingerprint("components") != components
+            assert service.get_conversion_fingerprint("lesson_content") == lesson_content
+    
+    def test_merged_parts_keep_repeated_values(self, service):
+        """Test chunk results are concatenated, dropping only a repeat across the chunk boundary."""
+        parts = [
+            {"title": "Fractions", "key_points": ["Halves", "Review"], "sections": [{"heading": "Intro"}]},
+            {"title": "Ignored", "key_points": ["Review", "Quarters", "Review"], "sections": [{"heading": "Intro"}]}
+        ]
+        
+        merged = service._merge_transformed_parts(parts)
+        
+        assert merged["title"] == "Fractions"
+        assert merged["key_points"] == ["Halves", "Review", "Quarters", "Review"]
+        assert merged["sections"] == [{"heading": "Intro"}]
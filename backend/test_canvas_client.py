@@ -1,10 +1,11 @@
 import pytest
 import os
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch, AsyncMock, MagicMock
 from datetime import datetime
 import httpx
 
 from canvas_client import CanvasClient
+from module_item_index import module_item_index
 
 
 class TestCanvasClient:
@@ -323,6 +324,149 @@ class TestCanvasClient:
             
             assert result == {}
     
+    @pytest.mark.asyncio
+    async def test_lesson_calls_use_shared_client(self, client):
+        """Test that lesson completion calls reuse the pooled client instead of opening a new one."""
+        response = MagicMock()
+        response.status_code = 204
+
+        with patch.object(client.client, 'request', return_value=response) as mock_request:
+            with patch('canvas_client.httpx.AsyncClient') as mock_client_class:
+                result = await client.mark_lesson_complete(20354, 2567723, completed=False)
+
+                mock_client_class.assert_not_called()
+                mock_request.assert_called_once_with(
+                    "DELETE",
+                    "https://learning.acc.edu.au/api/v1/courses/20354/modules/items/2567723/done"
+                )
+                assert result["success"] is True
+
+    @pytest.mark.asyncio
+    async def test_paginate_follows_link_headers(self, client):
+        """Test that pagination follows Link rel="next" headers across pages."""
+        first_url = "https://learning.acc.edu.au/api/v1/courses/20354/modules"
+        second_url = "https://learning.acc.edu.au/api/v1/courses/20354/modules?page=2&per_page=100"
+        pages = [
+            httpx.Response(
+                200, json=[{"id": 1}, {"id": 2}],
+                headers={"Link": f'<{second_url}>; rel="next", <{first_url}>; rel="first"'},
+                request=httpx.Request("GET", first_url)
+            ),
+            httpx.Response(200, json=[{"id": 3}], request=httpx.Request("GET", second_url)),
+        ]
+
+        with patch.object(client.client, 'request', side_effect=pages) as mock_request:
+            streamed = [item async for item in client.paginate(first_url, {"per_page": "100"})]
+
+            assert streamed == [{"id": 1}, {"id": 2}, {"id": 3}]
+            assert mock_request.call_count == 2
+            assert mock_request.call_args_list[1].args == ("GET", second_url)
+
+    @pytest.mark.asyncio
+    async def test_get_all_pages_respects_max_pages(self, client):
+        """Test that collect-all mode stops at the page limit."""
+        url = "https://learning.acc.edu.au/api/v1/courses"
+        response = httpx.Response(
+            200, json=[{"id": 1}],
+            headers={"Link": f'<{url}?page=2>; rel="next"'},
+            request=httpx.Request("GET", url)
+        )
+
+        with patch.object(client.client, 'request', return_value=response) as mock_request:
+            result = await client.get_all_pages(url, max_pages=1)
+
+            assert result == [{"id": 1}]
+            mock_request.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_bulk_completion_status_fetches_each_course_once(self, client):
+        """Test that bulk status lookups share one module fetch per course."""
+        modules = [{
+            "id": 10,
+            "items": [
+                {"id": 100, "title": "Lesson 1", "type": "Page", "completion_requirement": {"completed": True}},
+                {"id": 101, "title": "Lesson 2", "type": "Page", "completion_requirement": {"completed": False}}
+            ]
+        }]
+
+        with patch.object(client, 'get_course_modules', new_callable=AsyncMock, return_value=modules) as mock_modules:
+            results = await client.get_bulk_completion_status([
+                {"course_id": 1, "module_item_id": 101},
+                {"course_id": 1, "module_item_id": 100},
+                {"course_id": 1, "module_item_id": 999}
+            ])
+
+            mock_modules.assert_called_once_with(1)
+            assert [r["module_item_id"] for r in results] == [101, 100, 999]
+            assert results[0]["completed"] is False
+            assert results[1]["completed"] is True
+            assert results[2]["success"] is False
+
+    @pytest.mark.asyncio
+    async def test_completion_status_uses_module_index(self, client):
+        """Test that an indexed item needs only the status request."""
+        url = "https://learning.acc.edu.au/api/v1/courses/1/modules/10/items/100"
+        response = httpx.Response(
+            200, json={"id": 100, "title": "Lesson 1", "completion_requirement": {"completed": True}},
+            request=httpx.Request("GET", url)
+        )
+
+        with patch.object(module_item_index, 'persist', False):
+            await module_item_index.record_course_modules(1, [{"id": 10, "items": [{"id": 100}]}])
+
+            with patch.object(client, 'get_course_modules', new_callable=AsyncMock) as mock_modules, \
+                 patch.object(client.client, 'request', return_value=response) as mock_request:
+                result = await client.get_lesson_completion_status(1, 100)
+
+                mock_modules.assert_not_called()
+                mock_request.assert_called_once()
+                assert result["module_id"] == 10
+                assert result["completed"] is True
+
+    @pytest.mark.asyncio
+    async def test_page_revalidation_uses_stored_validators(self, client):
+        """Test that a 304 reuses the stored hash and metadata without a body."""
+        url = "https://learning.acc.edu.au/api/v1/courses/1/pages/lesson-1"
+        page = {"title": "Lesson 1", "url": "lesson-1", "body": "<p>Hello</p>"}
+        full = httpx.Response(200, json=page, headers={"ETag": '"v1"'}, request=httpx.Request("GET", url))
+        not_modified = httpx.Response(304, request=httpx.Request("GET", url))
+
+        with patch.object(client.client, 'request', side_effect=[full, not_modified]) as mock_request:
+            first = await client.get_page_content_conditional(1, "lesson-1")
+            second = await client.get_page_content_conditional(1, "lesson-1")
+
+            assert first["not_modified"] is False
+            assert second["not_modified"] is True
+            assert second["content_hash"] == first["content_hash"]
+            assert second["page"] == {"title": "Lesson 1", "url": "lesson-1"}
+            assert mock_request.call_args_list[1].kwargs["headers"] == {"If-None-Match": '"v1"'}
+            assert client.get_conditional_stats()["not_modified"] == 1
+
+    @pytest.mark.asyncio
+    async def test_page_revalidation_falls_back_to_updated_at(self, client):
+        """Test that without ETag or Last-Modified an unchanged updated_at counts as not modified."""
+        url = "https://learning.acc.edu.au/api/v1/courses/1/pages/lesson-1"
+        page = {"title": "Lesson 1", "updated_at": "2024-05-01T10:00:00Z", "body": "<p>Hello</p>"}
+        edited = {**page, "updated_at": "2024-05-02T10:00:00Z", "body": "<p>Hello again</p>"}
+        responses = [
+            httpx.Response(200, json=body, request=httpx.Request("GET", url))
+            for body in (page, page, edited)
+        ]
+
+        with patch.object(client.client, 'request', side_effect=responses) as mock_request:
+            first = await client.get_page_content_conditional(1, "lesson-1")
+            second = await client.get_page_content_conditional(1, "lesson-1")
+            third = await client.get_page_content_conditional(1, "lesson-1")
+
+            assert first["not_modified"] is False
+            assert second["not_modified"] is True
+            assert second["content_hash"] == first["content_hash"]
+            assert second["page"]["body"] == "<p>Hello</p>"
+            assert third["not_modified"] is False
+            assert third["content_hash"] != first["content_hash"]
+            assert mock_request.call_args_list[1].kwargs["headers"] == {}
+            assert client.get_conditional_stats()["updated_at_unchanged"] == 1
+
     @pytest.mark.asyncio
     async def test_client_cleanup(self, client):
         """Test that HTTP client can be properly closed."""
@@ -0,0 +1,113 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from canvas_module_service import CanvasModuleService
+
+
+COURSES = [{"id": 101, "name": "Science"}, {"id": 102, "name": "History"}]
+
+
+def make_modules(course_id):
+    """Modules listed with embedded items, as fetched with include[]=items."""
+    return [{
+        "id": course_id * 10,
+        "name": "Topic 1",
+        "items": [{
+            "title": "Lesson 1",
+            "html_url": f"https://learning.acc.edu.au/courses/{course_id}/modules/items/1",
+            "url": f"https://learning.acc.edu.au/api/v1/courses/{course_id}/pages/lesson-1",
+            "completion_requirement": {"completed": True}
+        }]
+    }]
+
+
+class TestCanvasModuleService:
+    """Unit tests for concurrent classwork enhancement."""
+    
+    @pytest.fixture
+    def canvas_client(self):
+        """Canvas client whose module fetches take 100ms each."""
+        client = MagicMock()
+        client.get_courses = AsyncMock(return_value=COURSES)
+        
+        async def get_course_modules(course_id):
+            await asyncio.sleep(0.1)
+            return make_modules(course_id)
+        
+        client.get_course_modules = AsyncMock(side_effect=get_course_modules)
+        return client
+    
+    @pytest.mark.asyncio
+    async def test_subjects_are_enhanced_concurrently(self, canvas_client):
+        """Test subjects fetch their modules in parallel and keep classwork order."""
+        service = CanvasModuleService(canvas_client)
+        classwork = [
+            {"subject": "Science", "topic": "Topic 1", "lessons": ["1"]},
+            {"subject": "History", "topic": "Topic 1", "lessons": ["1"]}
+        ]
+        
+        started = time.perf_counter()
+        enhanced = await service.enhance_classwork_with_canvas_data(classwork)
+        elapsed = time.perf_counter() - started
+        
+        assert elapsed < 0.18
+        assert [subject["course_id"] for subject in enhanced] == [101, 102]
+        assert enhanced[0]["canvas_urls"]["1"].endswith("/courses/101/modules/items/1")
+        assert enhanced[1]["completion_status"]["1"] is True
+    
+    @pytest.mark.asyncio
+    async def test_failed_subject_gets_fallback_urls(self, canvas_client):
+        """Test one subject failing does not stop the others from being enhanced."""
+        service = CanvasModuleService(canvas_client)
+        original = service._enhance_subject_data
+        
+        async def enhance_subject_data(subject_data, course_map):
+            if subject_data["subject"] == "History":
+                raise RuntimeError("boom")
+            return await original(subject_data, course_map)
+        
+        service._enhance_subject_data = enhance_subject_data
+        classwork = [
+            {"subject": "Science", "topic": "Topic 1", "lessons": ["1"]},
+            {"subject": "History", "topic": "Topic 1", "lessons": ["1"]}
+        ]
+        
+        enhanced = await service.enhance_classwork_with_canvas_data(classwork)
+        
+        assert enhanced[0]["course_id"] == 101
+        assert "course_id" not in enhanced[1]
+        assert enhanced[1]["canvas_urls"]["1"].startswith("https://learning.acc.edu.au/")
+    
+    @pytest.mark.asyncio
+    async def test_subjects_sharing_a_course_fetch_modules_once(self, canvas_client):
+        """Test concurrent subjects in the same course share one in-flight module fetch."""
+        service = CanvasModuleService(canvas_client)
+        classwork = [
+            {"subject": "Science", "topic": "Topic 1", "lessons": ["1"]},
+            {"subject": "Science", "unit": "Topic 1", "lessons": ["1"]}
+        ]
+        
+        enhanced = await service.enhance_classwork_with_canvas_data(classwork)
+        
+        assert canvas_client.get_course_modules.await_count == 1
+        assert [subject["module_id"] for subject in enhanced] == [1010, 1010]
+    
+    @pytest.mark.asyncio
+    async def test_fetch_once_collapses_concurrent_calls(self, canvas_client):
+        """Test _fetch_once runs one fetch per key while it is in flight."""
+        service = CanvasModuleService(canvas_client)
+        
+        async def slow_fetch():
+            await asyncio.sleep(0.05)
+            return ["modules"]
+        
+        fetch = AsyncMock(side_effect=slow_fetch)
+        
+        results = await asyncio.gather(*(service._fetch_once("modules_1", fetch) for _ in range(3)))
+        
+        assert results == [["modules"]] * 3
+        assert fetch.await_count == 1
+        assert service._inflight == {}
@@ -0,0 +1,91 @@
+import asyncio
+import os
+from unittest.mock import patch, AsyncMock
+
+import httpx
+import pytest
+
+from canvas_client import CanvasClient
+from canvas_scheduler import (
+    PRIORITY_INTERACTIVE,
+    PRIORITY_PREFETCH,
+    CanvasRequestScheduler,
+    canvas_priority
+)
+
+
+def make_response(status_code=200, remaining=None, cost=None, text=""):
+    """Build a Canvas response carrying rate-limit headers."""
+    headers = {}
+    if remaining is not None:
+        headers["X-Rate-Limit-Remaining"] = str(remaining)
+    if cost is not None:
+        headers["X-Request-Cost"] = str(cost)
+    request = httpx.Request("GET", "https://learning.acc.edu.au/api/v1/courses")
+    return httpx.Response(status_code, headers=headers, text=text, request=request)
+
+
+class TestCanvasRequestScheduler:
+    """Unit tests for the Canvas rate-limit scheduler."""
+    
+    @pytest.fixture
+    def scheduler(self):
+        """Create a scheduler allowing one request at a time."""
+        with patch.dict(os.environ, {'CANVAS_MAX_CONCURRENCY': '1'}):
+            return CanvasRequestScheduler()
+    
+    @pytest.mark.asyncio
+    async def test_interactive_requests_jump_the_queue(self, scheduler):
+        """Test queued interactive requests are admitted before earlier prefetch requests."""
+        await scheduler.acquire()
+        order = []
+        
+        async def request(name, priority):
+            await scheduler.acquire(priority)
+            order.append(name)
+            scheduler.release(make_response())
+        
+        prefetch = asyncio.create_task(request("prefetch", PRIORITY_PREFETCH))
+        await asyncio.sleep(0)
+        with canvas_priority(PRIORITY_INTERACTIVE):
+            interactive = asyncio.create_task(request("interactive", None))
+        await asyncio.sleep(0)
+        
+        scheduler.release(make_response())
+        await asyncio.gather(prefetch, interactive)
+        
+        assert order == ["interactive", "prefetch"]
+        assert scheduler.stats["queued"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_low_quota_halves_concurrency_and_holds_background(self):
+        """Test a low X-Rate-Limit-Remaining shrinks concurrency and reserves quota for interactive loads."""
+        with patch.dict(os.environ, {'CANVAS_MAX_CONCURRENCY': '8'}):
+            scheduler = CanvasRequestScheduler()
+        
+        await scheduler.acquire()
+        scheduler.release(make_response(remaining=50, cost=2))
+        
+        assert scheduler.concurrency == 4
+        assert scheduler.last_remaining == 50
+        
+        await asyncio.wait_for(scheduler.acquire(PRIORITY_INTERACTIVE), 1)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(scheduler.acquire(PRIORITY_PREFETCH), 0.05)
+        assert scheduler.get_stats()["waiting"]["prefetch"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_client_retries_throttled_requests(self):
+        """Test a 403 Rate Limit Exceeded response is retried through the scheduler."""
+        with patch.dict(os.environ, {'CANVAS_BEARER_TOKEN': 'test_token_123', 'CANVAS_THROTTLE_RETRY_DELAY': '0'}):
+            client = CanvasClient()
+        
+        throttled = make_response(403, remaining=0, text="403 Forbidden (Rate Limit Exceeded)")
+        client.client.request = AsyncMock(side_effect=[throttled, make_response(200, remaining=600)])
+        
+        response = await client._request("GET", "https://learning.acc.edu.au/api/v1/courses")
+        
+        assert response.status_code == 200
+        assert client.client.request.await_count == 2
+        assert client.scheduler.stats["throttled"] == 1
+        await client.close()
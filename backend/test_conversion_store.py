@@ -0,0 +1,108 @@
+import os
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+# The module-level ai_service singleton requires a token at import time
+os.environ.setdefault('XAI_TOKEN', 'test_token')
+
+import database
+from ai_service import ai_service
+from conversion_store import ConversionStore, conversion_store
+from lesson_content_service import lesson_content_service
+from models import ContentConversion
+
+
+@pytest_asyncio.fixture
+async def db_engine(tmp_path):
+    """Point the store's sessions and engine at a fresh SQLite database."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/conversions.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(database.Base.metadata.create_all)
+    
+    database.SessionLocal.configure(bind=engine)
+    with patch('conversion_store.engine', engine):
+        yield engine
+    
+    database.SessionLocal.configure(bind=database.engine)
+    await engine.dispose()
+
+
+async def load_conversions():
+    """Load every stored conversion row."""
+    async with database.SessionLocal() as db:
+        return (await db.execute(select(ContentConversion))).scalars().all()
+
+
+class TestConversionStore:
+    """Tests for storing and reusing conversion results, against SQLite."""
+    
+    @pytest.mark.asyncio
+    async def test_stored_result_is_found_by_its_key(self, db_engine):
+        """Test a result is returned from the database, not just from the memory tier."""
+        await ConversionStore().put("hash", "components", "v1", [{"type": "paragraph", "content": "a"}])
+        
+        store = ConversionStore()
+        assert await store.get("hash", "components", "v1") == [{"type": "paragraph", "content": "a"}]
+        assert store.get_stats()["hits"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_other_fingerprint_misses(self, db_engine):
+        """Test a result made with another prompt or model is not reused."""
+        store = ConversionStore()
+        await store.put("hash", "components", "v1", [{"type": "paragraph", "content": "a"}])
+        
+        assert await store.get("hash", "components", "v2") is None
+        assert await store.get("hash", "lesson_content", "v1") is None
+        assert store.get_stats()["misses"] == 2
+        assert store.get_stats()["pending_reuses"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_reuses_are_flushed_once(self, db_engine):
+        """Test buffered reuse counts are written in one flush and then cleared."""
+        store = ConversionStore()
+        await store.put("hash", "components", "v1", [])
+        
+        for _ in range(3):
+            await store.get("hash", "components", "v1")
+        assert (await load_conversions())[0].use_count == 0
+        
+        assert await store.flush_reuses() == 1
+        assert await store.flush_reuses() == 0
+        
+        conversion = (await load_conversions())[0]
+        assert conversion.use_count == 3
+        assert store.get_stats()["pending_reuses"] == 0
+        assert store.get_stats()["reuse_flushes"] == 1
+
+
+class TestLessonContentReuse:
+    """Tests for sharing lesson transformations between identical pages."""
+    
+    @pytest.fixture(autouse=True)
+    def empty_memory_tier(self):
+        """Start each test without results cached by earlier ones."""
+        conversion_store._memory.clear()
+        conversion_store._pending_reuses.clear()
+    
+    @pytest.mark.asyncio
+    async def test_identical_content_skips_llm(self, db_engine):
+        """Test a second lesson with the same HTML reuses the first transformation."""
+        transform = AsyncMock(return_value={
+            "success": True, "content": {"title": "Fractions", "type": "Page", "sections": [{"heading": "Halves"}]}
+        })
+        
+        with patch.object(ai_service, 'transform_lesson_content', transform):
+            first = await lesson_content_service._transform_content("<p>Halves</p>", "Fractions", "Page")
+            second = await lesson_content_service._transform_content("<p>Halves</p>", "Fractions (copy)", "Assignment")
+        
+        transform.assert_awaited_once()
+        assert first.get("reused_conversion") is None
+        assert second["reused_conversion"] is True
+        assert second["content"]["sections"] == [{"heading": "Halves"}]
+        assert second["content"]["title"] == "Fractions (copy)"
+        assert second["content"]["type"] == "Assignment"
+        assert len(await load_conversions()) == 1
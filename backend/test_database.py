@@ -0,0 +1,52 @@
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import create_engine, inspect, text
+
+import models  # noqa: F401  (registers the tables on Base.metadata)
+from database import Base, SCHEMA_LOCK_KEY, add_missing_columns, migrate_schema
+
+
+class TestSchemaMigration:
+    """Tests for startup schema upgrades."""
+    
+    def test_adds_missing_nullable_columns_and_indexes(self):
+        """Test columns added to a model are added to an existing table, with their indexes."""
+        engine = create_engine("sqlite://")
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE converted_canvas_pages (id INTEGER PRIMARY KEY, course_id INTEGER NOT NULL, "
+                "page_slug VARCHAR(500) NOT NULL, page_title VARCHAR(1000) NOT NULL, ai_components JSON NOT NULL)"
+            ))
+            add_missing_columns(conn)
+        
+        inspector = inspect(engine)
+        columns = {column["name"] for column in inspector.get_columns("converted_canvas_pages")}
+        indexed = [index["column_names"] for index in inspector.get_indexes("converted_canvas_pages")]
+        assert {"content_hash", "conversion_fingerprint", "raw_html_body"} <= columns
+        assert ["conversion_fingerprint"] in indexed
+    
+    def test_migrate_schema_is_repeatable(self):
+        """Test a second run against an up-to-date schema changes nothing."""
+        engine = create_engine("sqlite://")
+        with engine.begin() as conn:
+            migrate_schema(conn)
+        with engine.begin() as conn:
+            migrate_schema(conn)
+        
+        assert set(inspect(engine).get_table_names()) == set(Base.metadata.tables)
+    
+    def test_migrate_schema_locks_before_changes_on_postgres(self):
+        """Test the advisory lock is taken before any table is inspected or created."""
+        conn = MagicMock()
+        conn.dialect.name = "postgresql"
+        calls = MagicMock()
+        conn.execute.side_effect = lambda *args: calls.lock(*args)
+        
+        with patch.object(Base.metadata, "create_all", side_effect=lambda *args: calls.create_all()), \
+             patch("database.add_missing_columns", side_effect=lambda *args: calls.add_missing_columns()):
+            migrate_schema(conn)
+        
+        assert [call[0] for call in calls.mock_calls] == ["lock", "create_all", "add_missing_columns"]
+        statement, params = calls.lock.call_args.args
+        assert "pg_advisory_xact_lock" in str(statement)
+        assert params == {"key": SCHEMA_LOCK_KEY}
@@ -0,0 +1,33 @@
+from html_chunker import split_html_into_chunks
+
+
+class TestHtmlChunker:
+    """Unit tests for structural HTML chunking."""
+    
+    def test_splits_at_headings_without_losing_content(self):
+        """Test chunks start at headings and rejoin to the original HTML."""
+        sections = [f"<h2>Part {i}</h2><p>{'Lesson text. ' * 20}</p>" for i in range(6)]
+        html = "<div>" + "".join(sections) + "</div>"
+        
+        chunks = split_html_into_chunks(html, 700)
+        
+        assert len(chunks) > 1
+        assert "".join(chunks) == html
+        assert all(chunk.startswith("<h2>") for chunk in chunks[1:])
+        assert all(len(chunk) <= 700 for chunk in chunks)
+    
+    def test_small_page_is_one_chunk(self):
+        """Test pages under the limit are not split."""
+        assert split_html_into_chunks("<p>Short</p>", 6000) == ["<p>Short</p>"]
+    
+    def test_oversized_block_is_not_split_inside_a_tag(self):
+        """Test a block with no structural boundaries is cut between tags or words."""
+        image = '<img src="data:image/png;base64,' + "A" * 300 + '">'
+        html = "<p>" + "word " * 50 + image + ' more text <a href="/courses/1/pages/intro">link</a></p>'
+        
+        chunks = split_html_into_chunks(html, 100)
+        
+        assert "".join(chunks) == html
+        assert image in chunks
+        assert all(chunk.count("<") == chunk.count(">") for chunk in chunks)
+        assert all(len(chunk) <= 100 for chunk in chunks if chunk != image)
@@ -0,0 +1,49 @@
+import pytest
+
+from html_component_parser import parse_html_to_components
+
+
+class TestHtmlComponentParser:
+    """Unit tests for the deterministic HTML component parser."""
+    
+    def test_simple_lesson_page(self):
+        """Test a typical lesson page is fully converted with high confidence."""
+        html = """
+        <h2>Lesson 3: Fractions</h2>
+        <p>Today we will compare fractions with different denominators.</p>
+        <iframe src="https://www.youtube.com/embed/abc123" title="Comparing fractions"></iframe>
+        <ol>
+            <li>Watch the video.</li>
+            <li>Complete the worksheet.</li>
+        </ol>
+        <p><a href="https://learning.acc.edu.au/courses/1/files/9/download">Fractions worksheet.pdf</a></p>
+        <p><a href="https://learning.acc.edu.au/courses/1/quizzes/7">Fractions quiz</a></p>
+        """
+        
+        components, confidence = parse_html_to_components(html)
+        
+        assert confidence >= 0.8
+        assert [c["type"] for c in components] == [
+            "header", "paragraph", "video", "instructions", "resource_list", "quiz_link"
+        ]
+        assert components[0] == {"type": "header", "level": 2, "content": "Lesson 3: Fractions"}
+        assert components[2]["embed_url"] == "https://www.youtube.com/embed/abc123"
+        assert components[3]["items"] == ["Watch the video.", "Complete the worksheet."]
+        assert components[4]["items"][0]["type"] == "pdf"
+        assert components[5]["url"] == "https://learning.acc.edu.au/courses/1/quizzes/7"
+    
+    def test_table_heavy_page_has_low_confidence(self):
+        """Test content the schema cannot represent lowers confidence."""
+        html = """
+        <p>Timetable</p>
+        <table><tr><td>Monday reading and spelling practice</td><td>Tuesday maths practice</td></tr></table>
+        """
+        
+        _, confidence = parse_html_to_components(html)
+        
+        assert confidence < 0.8
+    
+    @pytest.mark.parametrize("html", ["", "<script>var x = 1;</script>"])
+    def test_empty_page(self, html):
+        """Test pages without components have zero confidence."""
+        assert parse_html_to_components(html) == ([], 0.0)
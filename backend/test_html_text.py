@@ -0,0 +1,52 @@
+from html_text import html_to_text
+
+
+class TestHtmlToText:
+    """Unit tests for single-pass HTML text extraction."""
+    
+    def test_keeps_structure_and_decodes_entities(self):
+        """Test headings, paragraphs and list items survive extraction."""
+        html = "<h2>Title &amp; more</h2><p>Hello\n   <b>world</b> a < b</p><ul><li>One</li><li>Two</li></ul>line<br>two"
+        
+        text, truncated = html_to_text(html)
+        
+        assert text == "## Title & more\nHello world a < b\n\n• One\n• Two\n\nline\ntwo"
+        assert truncated is False
+    
+    def test_skips_script_style_and_comments(self):
+        """Test non-content elements are dropped entirely."""
+        html = '<!DOCTYPE html><SCRIPT>var a = "<p>";</SCRIPT><style>p{}</style><!-- note --><p>Visible</p>'
+        
+        assert html_to_text(html) == ("Visible", False)
+    
+    def test_stops_at_budget(self):
+        """Test extraction stops once max_chars of text is produced."""
+        html = "".join(f"<p>Paragraph {i} of the lesson.</p>" for i in range(1000))
+        
+        text, truncated = html_to_text(html, max_chars=200)
+        
+        assert truncated is True
+        assert len(text) <= 200
+        assert text.startswith("Paragraph 0 of the lesson.")
+    
+    def test_empty_input(self):
+        """Test empty HTML yields empty text."""
+        assert html_to_text("") == ("", False)
+    
+    def test_budget_counts_output_not_indentation(self):
+        """Test indentation in the markup does not use up the budget."""
+        html = "".join(f"<div>\n{' ' * 40}<span>word</span>\n</div>" for _ in range(2000))
+        
+        text, truncated = html_to_text(html, max_chars=2000)
+        
+        assert truncated is True
+        assert len(text) >= 1990
+        assert text.startswith("word\n\nword")
+    
+    def test_budget_matches_unbudgeted_output(self):
+        """Test a budget larger than the page returns the full text."""
+        html = "<h2>Title</h2>\n  <p>Hello\n   <b>world</b> a &amp; b</p>\n<ul>\n  <li>One</li>\n  <li>Two</li>\n</ul>"
+        full, _ = html_to_text(html)
+        
+        assert html_to_text(html, max_chars=len(full) + 1) == (full, False)
+        assert html_to_text(html, max_chars=10)[0] == full[:10].rstrip()
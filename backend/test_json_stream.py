@@ -0,0 +1,27 @@
+from json_stream import JSONArrayStreamParser
+
+
+class TestJSONArrayStreamParser:
+    """Unit tests for incremental JSON array parsing."""
+    
+    def test_emits_objects_as_they_complete(self):
+        """Test objects split across arbitrary pieces are emitted once complete."""
+        text = '```json\n[{"type": "header", "content": "Braces } and ] \\" in strings"}, {"type": "paragraph", "items": [1, {"a": 2}]}]\n```'
+        parser = JSONArrayStreamParser()
+        
+        emitted = []
+        for char in text:
+            emitted.extend(parser.feed(char))
+        
+        assert emitted == [
+            {"type": "header", "content": 'Braces } and ] " in strings'},
+            {"type": "paragraph", "items": [1, {"a": 2}]}
+        ]
+        assert parser.finished
+    
+    def test_incomplete_array_is_not_finished(self):
+        """Test a truncated response leaves the parser unfinished."""
+        parser = JSONArrayStreamParser()
+        
+        assert parser.feed('[{"type": "header"}, {"type": "par') == [{"type": "header"}]
+        assert not parser.finished
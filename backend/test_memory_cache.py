@@ -0,0 +1,63 @@
+from unittest.mock import patch
+
+from memory_cache import LRUCache
+
+
+class TestLRUCache:
+    """Unit tests for the in-process LRU cache."""
+    
+    def test_evicts_least_recently_used(self):
+        """Test a read refreshes recency so the untouched entry is evicted."""
+        cache = LRUCache(max_entries=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+        
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.evictions == 1
+        assert len(cache) == 2
+    
+    def test_entries_expire_after_ttl(self):
+        """Test entries older than the TTL are treated as misses and dropped."""
+        cache = LRUCache(max_entries=4, ttl_seconds=10)
+        
+        with patch("memory_cache.time.monotonic", return_value=100.0):
+            cache.set("a", 1)
+        with patch("memory_cache.time.monotonic", return_value=109.0):
+            assert cache.get("a") == 1
+        with patch("memory_cache.time.monotonic", return_value=110.0):
+            assert cache.get("a") is None
+        
+        assert cache.expirations == 1
+        assert len(cache) == 0
+    
+    def test_stats_and_invalidation(self):
+        """Test hit/miss counters and the invalidation helpers."""
+        cache = LRUCache(max_entries=4, ttl_seconds=60)
+        cache.set(("course", 1), "x")
+        cache.set(("course", 2), "y")
+        cache.set(("page", 1), "z")
+        
+        cache.get(("course", 1))
+        cache.get("missing")
+        assert cache.invalidate(("page", 1)) is True
+        assert cache.invalidate(("page", 1)) is False
+        assert cache.invalidate_where(lambda key: key[0] == "course") == 2
+        
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+        assert stats["entries"] == 0
+    
+    def test_zero_size_cache_stores_nothing(self):
+        """Test max_entries=0 disables the cache."""
+        cache = LRUCache(max_entries=0)
+        cache.set("a", 1)
+        
+        assert cache.get("a") is None
+        assert len(cache) == 0
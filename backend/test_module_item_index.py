@@ -0,0 +1,59 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from module_item_index import ModuleItemIndex
+
+
+MODULES = [
+    {"id": 10, "items": [{"id": 100}, {"id": 101}]},
+    {"id": 11, "items": [{"id": 110}]}
+]
+
+
+class TestModuleItemIndex:
+    """Unit tests for module item index persistence."""
+    
+    @pytest.fixture
+    def index(self):
+        """Index with the database write replaced by a mock."""
+        index = ModuleItemIndex()
+        index.persist = True
+        index._persist_replace = AsyncMock()
+        index._load = AsyncMock(return_value=None)
+        return index
+    
+    @pytest.mark.asyncio
+    async def test_first_listing_replaces_course_rows(self, index):
+        """Test the first listing after startup upserts every item and deletes unlisted rows."""
+        await index.record_course_modules(1, MODULES)
+        
+        course_id, removed, locations, replaced_rows = index._persist_replace.await_args.args
+        assert locations == {100: (1, 10), 101: (1, 10), 110: (1, 11)}
+        assert replaced_rows is not None
+    
+    @pytest.mark.asyncio
+    async def test_unchanged_listing_writes_nothing(self, index):
+        """Test relisting identical modules produces no upserts or deletions."""
+        await index.record_course_modules(1, MODULES)
+        await index.record_course_modules(1, MODULES)
+        
+        course_id, removed, locations, replaced_rows = index._persist_replace.await_args.args
+        assert locations == {}
+        assert removed == []
+        assert replaced_rows is None
+        assert await index.lookup(1, 110) == 11
+    
+    @pytest.mark.asyncio
+    async def test_relisting_writes_only_differences(self, index):
+        """Test moved items are upserted and removed items deleted."""
+        await index.record_course_modules(1, MODULES)
+        await index.record_course_modules(1, [
+            {"id": 10, "items": [{"id": 100}, {"id": 110}]},
+            {"id": 11, "items": []}
+        ])
+        
+        course_id, removed, locations, replaced_rows = index._persist_replace.await_args.args
+        assert locations == {110: (1, 10)}
+        assert removed == [101]
+        assert await index.lookup(1, 101) is None
@@ -0,0 +1,92 @@
+import asyncio
+import os
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+# The module-level ai_service singleton requires a token at import time
+os.environ.setdefault('XAI_TOKEN', 'test_token')
+
+from preconversion_worker import PreconversionWorker
+
+
+def make_plan(*subjects):
+    """Build a weekly plan whose subjects link their lessons through lesson_api_urls."""
+    return {
+        "classwork": [
+            {
+                "subject": f"Subject {index}",
+                "lessons": list(lessons),
+                "lesson_api_urls": {
+                    lesson: f"https://canvas.example/api/v1/courses/{course_id}/pages/{lesson}"
+                    for lesson in lessons
+                },
+                "canvas_urls": {lesson: f"https://canvas.example/courses/{course_id}/modules" for lesson in lessons}
+            }
+            for index, (course_id, lessons) in enumerate(subjects)
+        ]
+    }
+
+
+class TestPreconversionWorker:
+    """Unit tests for queueing and converting a week's lesson pages."""
+    
+    @pytest.fixture
+    def worker(self):
+        """Create an enabled worker with a single consumer."""
+        with patch.dict(os.environ, {"PRECONVERT_ENABLED": "true", "PRECONVERT_CONCURRENCY": "1"}):
+            return PreconversionWorker()
+    
+    def test_extract_pages_uses_lesson_api_urls(self, worker):
+        """Test slugs come from the API URLs, earlier lessons of every subject first."""
+        plan = make_plan((1, ["fractions", "decimals"]), (2, ["poetry"]))
+        
+        pages = worker.extract_pages(plan)
+        
+        assert [(course_id, slug) for _, course_id, slug in pages] == [
+            (1, "fractions"), (2, "poetry"), (1, "decimals")
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_pending_pages_are_not_queued_twice(self, worker):
+        """Test a page already queued or being converted is not queued again."""
+        release = asyncio.Event()
+        started = asyncio.Event()
+        
+        async def convert(course_id, page_slug):
+            started.set()
+            await release.wait()
+        
+        plan = make_plan((1, ["fractions"]))
+        with patch.object(worker, '_convert', side_effect=convert):
+            assert worker.enqueue_week_plan(plan) == 1
+            assert worker.enqueue_week_plan(plan) == 0
+            
+            await started.wait()
+            assert worker.get_status()["in_progress"] == ["1/fractions"]
+            assert worker.enqueue_week_plan(plan) == 0
+            
+            release.set()
+            await worker._queue.join()
+            assert worker.enqueue_week_plan(plan) == 1
+            await worker._queue.join()
+        
+        await worker.stop()
+        assert worker.stats["enqueued"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_current_conversion_is_skipped(self, worker):
+        """Test a page with a conversion for its current content is not converted again."""
+        revalidation = {"not_modified": True, "content_hash": "hash", "page": {}}
+        
+        with patch('preconversion_worker.canvas_client.get_page_content_conditional',
+                   AsyncMock(return_value=revalidation)), \
+             patch.object(worker.converted_page_service, 'has_current_conversion',
+                          AsyncMock(return_value=True)) as has_current, \
+             patch.object(worker.converted_page_service, 'convert_page', AsyncMock()) as convert_page:
+            await worker._convert(1, "fractions")
+        
+        has_current.assert_awaited_once_with(1, "fractions", "hash")
+        convert_page.assert_not_awaited()
+        assert worker.stats["already_converted"] == 1
+        assert worker.stats["converted"] == 0
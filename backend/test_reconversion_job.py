@@ -0,0 +1,156 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+# The module-level ai_service singleton requires a token at import time
+os.environ.setdefault('XAI_TOKEN', 'test_token')
+
+import database
+from ai_service import ai_service
+from converted_page_service import converted_page_memory_cache
+from lesson_content_service import lesson_content_service
+from models import ConvertedCanvasPage, LessonContent
+from reconversion_job import ReconversionJob
+
+
+def make_page(slug: str, accessed_minutes_ago: int, **overrides) -> ConvertedCanvasPage:
+    """Build a successful conversion made with an older prompt."""
+    fields = {
+        "course_id": 1,
+        "page_slug": slug,
+        "page_title": slug,
+        "raw_html_body": f"<p>{slug}</p>",
+        "ai_components": [{"type": "paragraph", "content": "old"}],
+        "processing_info": {"status": "success"},
+        "conversion_success": True,
+        "content_hash": f"hash-{slug}",
+        "conversion_fingerprint": "old",
+        "last_accessed_at": datetime.now() - timedelta(minutes=accessed_minutes_ago)
+    }
+    fields.update(overrides)
+    return ConvertedCanvasPage(**fields)
+
+
+class TestReconversionJob:
+    """Tests for background upgrades of stale conversions, against SQLite."""
+
+    @pytest_asyncio.fixture
+    async def db_engine(self, tmp_path):
+        """Point the session factory at a fresh SQLite database."""
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/reconversion.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(database.Base.metadata.create_all)
+
+        database.SessionLocal.configure(bind=engine)
+        converted_page_memory_cache.clear()
+        with patch('single_flight.ADVISORY_LOCKS_ENABLED', False), \
+             patch('converted_page_service.conversion_store.get', AsyncMock(return_value=None)), \
+             patch('converted_page_service.conversion_store.put', AsyncMock()):
+            yield engine
+
+        database.SessionLocal.configure(bind=database.engine)
+        await engine.dispose()
+
+    async def add(self, *rows):
+        """Insert rows in their own session."""
+        async with database.SessionLocal() as db:
+            db.add_all(rows)
+            await db.commit()
+
+    async def load_pages(self):
+        """Load every converted page, keyed by slug."""
+        async with database.SessionLocal() as db:
+            result = await db.execute(select(ConvertedCanvasPage).order_by(ConvertedCanvasPage.page_slug))
+            return {page.page_slug: page for page in result.scalars().all()}
+
+    @pytest.mark.asyncio
+    async def test_upgrades_most_recently_accessed_pages_within_budget(self, db_engine):
+        """Test the budget is spent on the most recently accessed stale pages."""
+        await self.add(make_page("a", 30), make_page("b", 1), make_page("c", 5))
+        convert = AsyncMock(return_value=[{"type": "paragraph", "content": "new"}])
+
+        with patch.object(ai_service, 'convert_html_to_components', convert):
+            upgraded = await ReconversionJob().run_once(budget=2)
+
+        pages = await self.load_pages()
+        fingerprint = ai_service.get_conversion_fingerprint("components")
+        assert upgraded == 2
+        assert pages["b"].conversion_fingerprint == fingerprint
+        assert pages["c"].conversion_fingerprint == fingerprint
+        assert pages["c"].ai_components == [{"type": "paragraph", "content": "new"}]
+        assert pages["a"].conversion_fingerprint == "old"
+
+    @pytest.mark.asyncio
+    async def test_upgrade_discarded_when_page_changes_meanwhile(self, db_engine):
+        """Test an upgrade does not overwrite content that was re-converted during the LLM call."""
+        await self.add(make_page("a", 1))
+
+        async def convert_while_page_changes(html_body):
+            async with database.SessionLocal() as db:
+                page = (await db.execute(select(ConvertedCanvasPage))).scalars().one()
+                page.content_hash = "hash-edited"
+                page.ai_components = [{"type": "paragraph", "content": "edited"}]
+                await db.commit()
+            return [{"type": "paragraph", "content": "upgraded"}]
+
+        job = ReconversionJob()
+        with patch.object(ai_service, 'convert_html_to_components', convert_while_page_changes):
+            upgraded = await job.run_once(budget=1)
+
+        page = (await self.load_pages())["a"]
+        assert upgraded == 0
+        assert page.ai_components == [{"type": "paragraph", "content": "edited"}]
+        assert job.stats["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_upgrade_joins_live_conversion_of_same_content(self, db_engine):
+        """Test an upgrade coalesces with a running conversion instead of converting again."""
+        page = make_page("a", 1)
+        await self.add(page)
+        calls = 0
+
+        async def slow_convert(html_body):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return [{"type": "paragraph", "content": "new"}]
+
+        job = ReconversionJob()
+        followers = job.converted_page_service.get_conversion_stats()["followers"]
+        with patch.object(ai_service, 'convert_html_to_components', slow_convert):
+            live = asyncio.create_task(job.converted_page_service.convert_page(
+                1, "a", {"title": "a"}, "<p>a</p>", content_hash="hash-a", force_refresh=True
+            ))
+            await asyncio.sleep(0)
+            upgraded = await job.run_once(budget=1)
+            await live
+
+        assert calls == 1
+        assert upgraded == 1
+        assert job.converted_page_service.get_conversion_stats()["followers"] == followers + 1
+        assert (await self.load_pages())["a"].conversion_fingerprint == ai_service.get_conversion_fingerprint("components")
+
+    @pytest.mark.asyncio
+    async def test_upgrades_stale_lessons(self, db_engine):
+        """Test stale lesson transformations are upgraded once pages are done."""
+        await self.add(LessonContent(
+            course_id=1, module_item_id=10, lesson_title="Lesson", lesson_type="Page",
+            raw_content="<p>lesson</p>", transformed_content={"title": "old"},
+            transformation_success=True, content_hash="hash-lesson", transformation_fingerprint="old"
+        ))
+        transform = AsyncMock(return_value={"success": True, "content": {"title": "new"}})
+
+        with patch.object(lesson_content_service, '_transform_content', transform):
+            upgraded = await ReconversionJob().run_once(budget=1)
+
+        async with database.SessionLocal() as db:
+            lesson = (await db.execute(select(LessonContent))).scalars().one()
+        assert upgraded == 1
+        assert lesson.transformed_content == {"title": "new"}
+        assert lesson.transformation_fingerprint == ai_service.get_conversion_fingerprint("lesson_content")
@@ -0,0 +1,170 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+import single_flight
+from single_flight import SingleFlight, StreamFeed, _local_lock
+
+
+class TestLocalLock:
+    """Unit tests for the process-local lock used in place of advisory locks."""
+
+    @pytest.mark.asyncio
+    async def test_waiters_never_overlap(self):
+        """Test a holder arriving while a woken waiter has not yet run still waits for it."""
+        running = 0
+        overlaps = 0
+
+        async def hold():
+            nonlocal running, overlaps
+            async with _local_lock("page"):
+                running += 1
+                overlaps += running > 1
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        first = asyncio.create_task(hold())
+        second = asyncio.create_task(hold())
+        await first
+        # The second holder has been woken but not run yet; a newcomer must queue behind it
+        third = asyncio.create_task(hold())
+        await asyncio.gather(second, third)
+
+        assert overlaps == 0
+
+    @pytest.mark.asyncio
+    async def test_lock_dropped_once_unused(self):
+        """Test the lock entry is removed after the last holder exits."""
+        async with _local_lock("page"):
+            assert "page" in single_flight._local_locks
+
+        assert "page" not in single_flight._local_locks
+        assert "page" not in single_flight._local_lock_users
+
+
+class TestAdvisoryLock:
+    """Unit tests for the Postgres advisory lock, with the engine faked."""
+
+    def make_engine(self, attempts, unlock_error=None):
+        """Engine whose connections answer pg_try_advisory_lock from attempts in order."""
+        connections = []
+
+        async def connect():
+            conn = AsyncMock()
+            acquired = attempts.pop(0)
+
+            async def execute(statement, params):
+                if "pg_advisory_unlock" in str(statement):
+                    if unlock_error:
+                        raise unlock_error
+                    return None
+                return MagicMock(scalar=MagicMock(return_value=acquired))
+
+            conn.execute.side_effect = execute
+            connections.append(conn)
+            return conn
+
+        engine = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"), connect=connect)
+        return engine, connections
+
+    @pytest.mark.asyncio
+    async def test_polls_until_acquired(self):
+        """Test a held lock is retried, returning each losing connection to the pool."""
+        engine, connections = self.make_engine([False, False, True])
+
+        with patch.object(single_flight, "lock_engine", engine), \
+             patch.object(single_flight, "ADVISORY_LOCK_POLL_INTERVAL", 0):
+            async with single_flight.advisory_lock("page"):
+                assert len(connections) == 3
+                assert connections[0].close.await_count == 1
+                assert connections[2].close.await_count == 0
+                connections[2].commit.assert_awaited()
+
+        assert connections[2].close.await_count == 1
+        connections[2].invalidate.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_deadline_falls_back_to_local_lock(self):
+        """Test the block still runs, under the local lock, once the deadline passes."""
+        engine, connections = self.make_engine([False, False])
+
+        with patch.object(single_flight, "lock_engine", engine), \
+             patch.object(single_flight, "ADVISORY_LOCK_TIMEOUT", 0):
+            async with single_flight.advisory_lock("page"):
+                assert "page" in single_flight._local_locks
+
+        assert len(connections) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_unlock_discards_connection(self):
+        """Test a connection that may still hold the lock is invalidated rather than pooled."""
+        engine, connections = self.make_engine([True], unlock_error=Exception("connection lost"))
+
+        with patch.object(single_flight, "lock_engine", engine):
+            async with single_flight.advisory_lock("page"):
+                pass
+
+        connections[0].invalidate.assert_awaited_once()
+        connections[0].close.assert_awaited_once()
+
+
+class TestSingleFlight:
+    """Unit tests for in-process call coalescing."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        """Test callers for the same key get the leader's result."""
+        flight = SingleFlight()
+        calls = 0
+
+        async def convert():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "done"
+
+        results = await asyncio.gather(*(flight.do("key", convert) for _ in range(3)))
+
+        assert results == ["done"] * 3
+        assert calls == 1
+        assert flight.get_stats() == {"in_flight": 0, "leaders": 1, "followers": 2}
+
+    @pytest.mark.asyncio
+    async def test_started_call_survives_cancelled_caller(self):
+        """Test a call started for one caller keeps running after that caller is cancelled."""
+        flight = SingleFlight()
+
+        async def convert():
+            await asyncio.sleep(0.01)
+            return "done"
+
+        caller = asyncio.create_task(flight.do("key", convert))
+        await asyncio.sleep(0)
+        caller.cancel()
+
+        assert flight.is_in_flight("key")
+        assert await flight.do("key", convert) == "done"
+        assert flight.get_stats()["leaders"] == 1
+
+
+class TestStreamFeed:
+    """Unit tests for following a shared call's partial output."""
+
+    @pytest.mark.asyncio
+    async def test_late_subscriber_replays_then_follows(self):
+        """Test a subscriber joining mid-stream gets earlier items and then new ones."""
+        feed = StreamFeed()
+        feed.publish(1)
+
+        async def produce():
+            await asyncio.sleep(0.01)
+            feed.publish(2)
+            feed.finish()
+
+        producer = asyncio.create_task(produce())
+        received = [item async for item in feed.subscribe()]
+        await producer
+
+        assert received == [1, 2]
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from stage_graph import StageGraph
+
+
+class TestStageGraph:
+    """Unit tests for the dependency-graph stage executor."""
+    
+    @pytest.mark.asyncio
+    async def test_independent_stages_overlap(self):
+        """Test stages start once their dependencies finish and independent ones run together."""
+        graph = StageGraph()
+        
+        def stage(value, delay):
+            async def run(results):
+                await asyncio.sleep(delay)
+                return value(results) if callable(value) else value
+            return run
+        
+        graph.add_stage("source", stage(1, 0.01))
+        graph.add_stage("left", stage(lambda r: r["source"] + 1, 0.1), depends_on=("source",))
+        graph.add_stage("right", stage(lambda r: r["source"] + 2, 0.1), depends_on=("source",))
+        graph.add_stage("sink", stage(lambda r: r["left"] + r["right"], 0.01), depends_on=("left", "right"))
+        
+        results = await graph.run()
+        metadata = graph.get_metadata()
+        
+        assert results == {"source": 1, "left": 2, "right": 3, "sink": 5}
+        assert metadata["total_ms"] < 180
+        assert metadata["stages"]["sink"]["start_ms"] >= metadata["stages"]["left"]["duration_ms"]
+        assert all(timing["status"] == "ok" for timing in metadata["stages"].values())
+    
+    @pytest.mark.asyncio
+    async def test_rerun_skips_finished_stages(self):
+        """Test stages added later reuse earlier results without re-running them."""
+        graph = StageGraph()
+        calls = []
+        
+        async def first(results):
+            calls.append("first")
+            return "a"
+        
+        async def second(results):
+            return results["first"] + "b"
+        
+        graph.add_stage("first", first)
+        results = await graph.run()
+        graph.add_stage("second", second, depends_on=("first",))
+        results = await graph.run(results)
+        
+        assert results["second"] == "ab"
+        assert calls == ["first"]
+    
+    @pytest.mark.asyncio
+    async def test_failure_cancels_and_raises(self):
+        """Test a failing stage raises and marks its timing as failed."""
+        graph = StageGraph()
+        
+        async def fail(results):
+            raise RuntimeError("boom")
+        
+        async def dependent(results):
+            return "never"
+        
+        graph.add_stage("fail", fail)
+        graph.add_stage("dependent", dependent, depends_on=("fail",))
+        
+        with pytest.raises(RuntimeError, match="boom"):
+            await graph.run()
+        
+        assert graph.timings["fail"]["status"] == "failed"
+        assert "dependent" not in graph.timings
+    
+    def test_unknown_dependency_rejected(self):
+        """Test stages must be added after their dependencies."""
+        with pytest.raises(ValueError):
+            StageGraph().add_stage("orphan", lambda results: None, depends_on=("missing",))
@@ -0,0 +1,146 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+
+# The module-level ai_service singleton requires a token at import time
+os.environ.setdefault('XAI_TOKEN', 'test_token')
+
+import database
+import main
+from models import BackgroundJobStatus, WeeklyPlan
+from week_plan_refresher import WeekPlanRefresher
+from week_plan_service import week_plan_service
+
+
+class TestWeekPlanRefresher:
+    """Tests for background weekly plan refreshes, against SQLite."""
+    
+    @pytest_asyncio.fixture
+    async def db_engine(self, tmp_path):
+        """Point the session factory at a fresh SQLite database."""
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/refresher.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(database.Base.metadata.create_all)
+        
+        database.SessionLocal.configure(bind=engine)
+        week_plan_service.invalidate_latest_plan()
+        with patch('single_flight.ADVISORY_LOCKS_ENABLED', False):
+            yield engine
+        
+        week_plan_service.invalidate_latest_plan()
+        database.SessionLocal.configure(bind=database.engine)
+        await engine.dispose()
+    
+    def patch_pipeline(self, side_effect):
+        """Replace the Canvas + LLM refresh pipeline."""
+        return patch('week_plan_refresher.week_plan_service.refresh_latest_week_plan', AsyncMock(side_effect=side_effect))
+    
+    async def shared_status(self, refresher):
+        """Read the refresh state every worker reports."""
+        async with database.SessionLocal() as db:
+            return await refresher.get_shared_status(db)
+    
+    @pytest.mark.asyncio
+    async def test_trigger_joins_running_refresh(self, db_engine):
+        """Test triggers while a refresh runs share it instead of starting another."""
+        release = asyncio.Event()
+        
+        async def pipeline(db):
+            await release.wait()
+            return {"title": "Week 3"}
+        
+        refresher = WeekPlanRefresher()
+        with self.patch_pipeline(pipeline) as refresh_latest:
+            assert refresher.trigger() is True
+            assert refresher.trigger() is False
+            waiter = asyncio.create_task(refresher.refresh())
+            await asyncio.sleep(0.05)
+            assert (await self.shared_status(refresher))["refreshing"] is True
+            
+            release.set()
+            assert await waiter == {"title": "Week 3"}
+        
+        assert refresh_latest.await_count == 1
+        assert refresher.stats == {"refreshes": 1, "failed": 0, "joined": 2}
+        status = await self.shared_status(refresher)
+        assert status["refreshing"] is False
+        assert status["last_success_at"] is not None
+    
+    @pytest.mark.asyncio
+    async def test_failed_refresh_is_recorded_and_raised(self, db_engine):
+        """Test a failed refresh sets last_error for every worker and fails refresh()."""
+        refresher = WeekPlanRefresher()
+        
+        with self.patch_pipeline(Exception("Canvas unavailable")):
+            with pytest.raises(Exception, match="Canvas unavailable"):
+                await refresher.refresh()
+        
+        assert refresher.last_error == "Canvas unavailable"
+        assert refresher.stats["failed"] == 1
+        status = await self.shared_status(refresher)
+        assert status["refreshing"] is False
+        assert status["last_error"] == "Canvas unavailable"
+    
+    @pytest.mark.asyncio
+    async def test_stop_cancels_loop_and_refresh(self, db_engine):
+        """Test stopping cancels the periodic loop and the refresh it started."""
+        started = asyncio.Event()
+        
+        async def pipeline(db):
+            started.set()
+            await asyncio.sleep(3600)
+        
+        refresher = WeekPlanRefresher()
+        refresher.enabled = True
+        with self.patch_pipeline(pipeline):
+            refresher.start()
+            await started.wait()
+            loop_task, refresh_task = refresher._task, refresher._refresh
+            await refresher.stop()
+        
+        assert loop_task.cancelled()
+        assert refresh_task.cancelled()
+        assert refresher.refreshing is False
+        assert (await self.shared_status(refresher))["refreshing"] is False
+    
+    @pytest.mark.asyncio
+    async def test_abandoned_run_is_not_reported_as_refreshing(self, db_engine):
+        """Test a run left counted by a killed worker stops counting after the timeout."""
+        refresher = WeekPlanRefresher()
+        async with database.SessionLocal() as db:
+            db.add(BackgroundJobStatus(
+                name="week_plan_refresh", running=1, last_started_at=datetime.now() - timedelta(hours=1)
+            ))
+            await db.commit()
+        
+        assert (await self.shared_status(refresher))["refreshing"] is False
+        
+        await refresher._record_start()
+        async with database.SessionLocal() as db:
+            status = await db.get(BackgroundJobStatus, "week_plan_refresh")
+        assert status.running == 1
+    
+    @pytest.mark.asyncio
+    async def test_empty_database_waits_for_first_refresh(self, db_engine):
+        """Test the latest plan endpoint waits for the first refresh when nothing is stored."""
+        async def pipeline(db):
+            db.add(WeeklyPlan(week_starting=datetime(2026, 10, 12), processed_json={"title": "Week 3"}))
+            await db.commit()
+            week_plan_service.invalidate_latest_plan()
+            return {"title": "Week 3"}
+        
+        refresher = WeekPlanRefresher()
+        with self.patch_pipeline(pipeline) as refresh_latest, \
+             patch.object(main, 'week_plan_refresher', refresher):
+            async with database.SessionLocal() as db:
+                response = await main.get_latest_week_plan(MagicMock(headers={}), db=db)
+        
+        refresh_latest.assert_awaited_once()
+        assert response["source"] == "canvas_api"
+        assert response["data"] == {"title": "Week 3"}
+        assert response["refresh_in_progress"] is False
@@ -0,0 +1,227 @@
+import os
+from datetime import date, datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import create_async_engine
+
+# The module-level ai_service singleton requires a token at import time
+os.environ.setdefault('XAI_TOKEN', 'test_token')
+
+import database
+from models import WeeklyPlan
+from week_plan_service import WeekPlanService
+
+
+ANNOUNCEMENT = {"id": 7, "posted_at": "2026-10-12T08:00:00Z", "title": "Week 3", "message": "<p>Plan</p>"}
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path):
+    """Open a session on a fresh SQLite database."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/week_plans.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(database.Base.metadata.create_all)
+
+    async with database.SessionLocal(bind=engine) as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.fixture
+def service():
+    """Create a service whose Canvas and AI calls are mocked."""
+    service = WeekPlanService()
+    service.canvas_client = MagicMock()
+    service.canvas_client.get_latest_announcement = AsyncMock(return_value=ANNOUNCEMENT)
+    service.canvas_client.get_courses = AsyncMock(return_value=[])
+    service.canvas_client.get_upcoming_events = AsyncMock(return_value=[])
+    service.ai_service = MagicMock()
+    service.ai_service.parse_announcement_to_json = AsyncMock(return_value={
+        "week_starting": "2026-10-12", "title": "Week 3", "classwork": [{"subject": "Maths", "lessons": ["L1"]}]
+    })
+    service.canvas_module_service = MagicMock()
+    service.canvas_module_service.enhance_classwork_with_canvas_data = AsyncMock(
+        return_value=[{"subject": "Maths", "lessons": ["L1"], "canvas_urls": {}}]
+    )
+    with patch('week_plan_service.preconversion_worker.enqueue_week_plan'):
+        yield service
+
+
+class TestWeekPlanService:
+    """Unit tests for weekly plan helpers."""
+    
+    def test_cursor_round_trip(self):
+        """Test keyset cursors decode back to their (week_starting, id) position."""
+        cursor = WeekPlanService._encode_cursor(datetime(2026, 9, 14), 42)
+        
+        assert WeekPlanService._decode_cursor(cursor) == (datetime(2026, 9, 14), 42)
+    
+    def test_malformed_cursor_rejected(self):
+        """Test a cursor that was not issued by the service raises ValueError."""
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            WeekPlanService._decode_cursor("not-a-cursor")
+
+
+class TestAnnouncementFingerprint:
+    """Tests for skipping the AI parse of an unchanged announcement, against SQLite."""
+    
+    def test_announcement_fingerprint_tracks_content(self):
+        """Test the fingerprint changes with the body but not with unrelated fields."""
+        fingerprint = WeekPlanService.get_announcement_fingerprint(ANNOUNCEMENT)
+        
+        assert WeekPlanService.get_announcement_fingerprint({**ANNOUNCEMENT, "title": "Renamed"}) == fingerprint
+        assert WeekPlanService.get_announcement_fingerprint({**ANNOUNCEMENT, "message": "<p>Edited</p>"}) != fingerprint
+    
+    @pytest.mark.asyncio
+    async def test_unchanged_announcement_skips_parse(self, db, service):
+        """Test a stored plan with a matching fingerprint is returned without parsing or enhancing."""
+        db.add(WeeklyPlan(
+            week_starting=datetime(2026, 10, 12),
+            processed_json={"title": "Stored"},
+            announcement_fingerprint=WeekPlanService.get_announcement_fingerprint(ANNOUNCEMENT)
+        ))
+        await db.commit()
+        
+        plan = await service.refresh_latest_week_plan(db)
+        
+        assert plan == {"title": "Stored"}
+        service.ai_service.parse_announcement_to_json.assert_not_awaited()
+        service.canvas_module_service.enhance_classwork_with_canvas_data.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_changed_announcement_is_parsed(self, db, service):
+        """Test an edited body is re-parsed and replaces the plan for its week."""
+        db.add(WeeklyPlan(
+            week_starting=datetime(2026, 10, 12),
+            processed_json={"title": "Stored"},
+            announcement_fingerprint=WeekPlanService.get_announcement_fingerprint(ANNOUNCEMENT)
+        ))
+        await db.commit()
+        edited = {**ANNOUNCEMENT, "message": "<p>Edited plan</p>"}
+        service.canvas_client.get_latest_announcement.return_value = edited
+        
+        plan = await service.refresh_latest_week_plan(db)
+        
+        service.ai_service.parse_announcement_to_json.assert_awaited_once_with("<p>Edited plan</p>")
+        service.canvas_module_service.enhance_classwork_with_canvas_data.assert_awaited_once()
+        assert plan["title"] == "Week 3"
+        
+        stored = (await db.execute(select(WeeklyPlan))).scalars().all()
+        assert len(stored) == 1
+        assert stored[0].announcement_fingerprint == WeekPlanService.get_announcement_fingerprint(edited)
+
+
+class TestWeekPlanStorage:
+    """Tests for weekly plan lookups and the latest plan pointer, against SQLite."""
+    
+    @pytest.mark.asyncio
+    async def test_plan_found_by_any_day_of_its_week(self, db):
+        """Test a date finds the plan starting on or up to six days before it."""
+        db.add_all([
+            WeeklyPlan(week_starting=datetime(2026, 10, 5, 9, 30), processed_json={"title": "Week 2"}),
+            WeeklyPlan(week_starting=datetime(2026, 10, 12), processed_json={"title": "Week 3"})
+        ])
+        await db.commit()
+        service = WeekPlanService()
+        
+        assert (await service.get_week_plan_by_date(db, datetime(2026, 10, 5)))["title"] == "Week 2"
+        assert (await service.get_week_plan_by_date(db, datetime(2026, 10, 11, 23, 59)))["title"] == "Week 2"
+        assert (await service.get_week_plan_by_date(db, datetime(2026, 10, 12)))["title"] == "Week 3"
+        assert (await service.get_week_plan_by_date(db, datetime(2026, 10, 18)))["title"] == "Week 3"
+        assert await service.get_week_plan_by_date(db, datetime(2026, 10, 19)) is None
+        assert await service.get_week_plan_by_date(db, datetime(2026, 10, 4)) is None
+    
+    @pytest.mark.asyncio
+    async def test_saving_a_plan_invalidates_latest_pointer(self, db, service):
+        """Test the cached latest plan is replaced as soon as a refresh saves a new one."""
+        db.add(WeeklyPlan(week_starting=datetime(2026, 10, 5), processed_json={"title": "Week 2"}))
+        await db.commit()
+        
+        assert (await service.get_latest_plan_record(db)).processed_json["title"] == "Week 2"
+        await service.refresh_latest_week_plan(db)
+        
+        assert (await service.get_latest_plan_record(db)).processed_json["title"] == "Week 3"
+        assert service.get_latest_plan_cache_stats()["hits"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_latest_plan_is_a_detached_copy(self, db):
+        """Test callers share neither the loading session's row nor each other's plan data."""
+        db.add(WeeklyPlan(week_starting=datetime(2026, 10, 5), processed_json={"title": "Week 2", "classwork": []}))
+        await db.commit()
+        service = WeekPlanService()
+        
+        first = await service.get_latest_plan_record(db)
+        first.processed_json["classwork"].append({"subject": "Changed"})
+        second = await service.get_latest_plan_record(db)
+        
+        assert not isinstance(second, WeeklyPlan)
+        assert second.processed_json == {"title": "Week 2", "classwork": []}
+        assert service.get_latest_plan_cache_stats()["hits"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_backfill_week_starts(self, db):
+        """Test plans stored before week_start existed get the date part of week_starting."""
+        legacy = WeeklyPlan(week_starting=datetime(2026, 10, 5, 9, 30), processed_json={})
+        db.add_all([legacy, WeeklyPlan(week_starting=datetime(2026, 10, 12), processed_json={})])
+        await db.commit()
+        await db.execute(update(WeeklyPlan).where(WeeklyPlan.id == legacy.id).values(week_start=None))
+        await db.commit()
+        
+        assert await WeekPlanService().backfill_week_starts(db) == 1
+        
+        db.expire_all()
+        stored = (await db.execute(select(WeeklyPlan).order_by(WeeklyPlan.id))).scalars().all()
+        assert [plan.week_start for plan in stored] == [date(2026, 10, 5), date(2026, 10, 12)]
+        assert await WeekPlanService().backfill_week_starts(db) == 0
+
+
+class TestWeekPlanSummaries:
+    """Tests for the projected, keyset-paged plan listing, against SQLite."""
+    
+    @pytest.mark.asyncio
+    async def test_summaries_project_counts_and_page_by_week(self, db):
+        """Test counts come from processed_json, non-arrays count as empty, and pages neither skip nor repeat."""
+        for day in (5, 12, 19):
+            db.add(WeeklyPlan(
+                week_starting=datetime(2026, 10, day),
+                processed_json={
+                    "week_starting": f"2026-10-{day:02d}",
+                    "title": f"Week of {day}",
+                    "classwork": [
+                        {"subject": "Maths", "lessons": ["L1", "L2"]},
+                        {"subject": "English", "lessons": ["L3"]}
+                    ]
+                }
+            ))
+        db.add(WeeklyPlan(week_starting=datetime(2026, 10, 19), processed_json={"title": "No classwork"}))
+        db.add(WeeklyPlan(week_starting=datetime(2026, 9, 28), processed_json={
+            "title": "Malformed",
+            "classwork": [{"subject": "Maths", "lessons": "L1, L2"}, {"subject": "English", "lessons": ["L3"]}]
+        }))
+        db.add(WeeklyPlan(week_starting=datetime(2026, 9, 21), processed_json={
+            "title": "Classwork object", "classwork": {"subject": "Maths"}
+        }))
+        await db.commit()
+        service = WeekPlanService()
+        
+        first = await service.get_week_plan_summaries(db, limit=2)
+        second = await service.get_week_plan_summaries(db, limit=2, cursor=first["next_cursor"])
+        third = await service.get_week_plan_summaries(db, limit=2, cursor=second["next_cursor"])
+        
+        assert [plan["title"] for plan in first["plans"]] == ["No classwork", "Week of 19"]
+        assert [plan["title"] for plan in second["plans"]] == ["Week of 12", "Week of 5"]
+        assert [plan["title"] for plan in third["plans"]] == ["Malformed", "Classwork object"]
+        assert third["next_cursor"] is None
+        
+        empty, full = first["plans"]
+        assert (empty["subject_count"], empty["lesson_count"]) == (0, 0)
+        assert empty["week_starting"] == "2026-10-19"
+        assert (full["subject_count"], full["lesson_count"]) == (2, 3)
+        assert full["week_starting"] == "2026-10-19"
+        
+        malformed, classwork_object = third["plans"]
+        assert (malformed["subject_count"], malformed["lesson_count"]) == (2, 1)
+        assert (classwork_object["subject_count"], classwork_object["lesson_count"]) == (0, 0)
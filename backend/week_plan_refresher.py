@@ -0,0 +1,232 @@
+"""
+Scheduled background refresh of the latest weekly plan.
+The plan is refreshed on a fixed cadence, and forced refreshes start (or
+join) the same background run, so requests are always answered from the
+stored plan instead of waiting for the Canvas + LLM pipeline. A refresh of
+an unchanged announcement costs a single Canvas call, so the cadence also
+serves as announcement change detection. Whether a refresh is running, and
+how the last one ended, is kept in the background_job_statuses table so
+every worker reports the same state.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import case, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from database import SessionLocal
+from models import BackgroundJobStatus
+from single_flight import advisory_lock
+from week_plan_service import week_plan_service
+
+logger = logging.getLogger(__name__)
+
+STATUS_NAME = "week_plan_refresh"
+
+
+class WeekPlanRefresher:
+    """
+    Runs at most one weekly plan refresh at a time, in the background.
+    Callers that trigger a refresh while one is running join it.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("WEEK_PLAN_REFRESH_ENABLED", "true").lower() == "true"
+        self.interval = float(os.getenv("WEEK_PLAN_REFRESH_INTERVAL", "900"))
+        # Runs recorded as started longer ago than this are treated as abandoned
+        # (e.g. by a worker that was killed mid-refresh)
+        self.timeout = float(os.getenv("WEEK_PLAN_REFRESH_TIMEOUT", "600"))
+
+        self._task: Optional[asyncio.Task] = None  # periodic loop
+        self._refresh: Optional[asyncio.Task] = None  # refresh in progress
+
+        self.stats = {"refreshes": 0, "failed": 0, "joined": 0}
+        self.last_started_at: Optional[datetime] = None
+        self.last_finished_at: Optional[datetime] = None
+        self.last_success_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def refreshing(self) -> bool:
+        """Whether a refresh is currently running."""
+        return self._refresh is not None and not self._refresh.done()
+
+    def trigger(self) -> bool:
+        """
+        Start a background refresh, or join the one already running.
+
+        Returns:
+            True if a new refresh was started, False if one was already running
+        """
+        if self.refreshing:
+            self.stats["joined"] += 1
+            return False
+
+        self.last_started_at = datetime.now()
+        self._refresh = asyncio.get_running_loop().create_task(self._run_refresh())
+        return True
+
+    async def refresh(self) -> Dict[str, Any]:
+        """
+        Refresh now (or join the running refresh) and wait for it.
+
+        Returns:
+            The refreshed weekly plan JSON
+
+        Raises:
+            Exception: If the refresh failed
+        """
+        self.trigger()
+        plan = await asyncio.shield(self._refresh)
+        if plan is None:
+            raise Exception(f"Weekly plan refresh failed: {self.last_error}")
+        return plan
+
+    async def _run_refresh(self) -> Optional[Dict[str, Any]]:
+        """Refresh the plan once; failures are recorded rather than raised."""
+        await self._record_start()
+        try:
+            # Other workers refreshing at the same time are serialised; the
+            # later ones find the announcement unchanged
+            async with advisory_lock("week_plan_refresh"):
+                async with SessionLocal() as db:
+                    plan = await week_plan_service.refresh_latest_week_plan(db)
+        except asyncio.CancelledError:
+            await self._record_finish()
+            raise
+        except Exception as e:
+            self.stats["failed"] += 1
+            self.last_error = str(e)
+            self.last_finished_at = datetime.now()
+            logger.error(f"Background weekly plan refresh failed: {e}")
+            await self._record_finish(last_error=self.last_error)
+            return None
+
+        self.stats["refreshes"] += 1
+        self.last_success_at = datetime.now()
+        self.last_finished_at = self.last_success_at
+        self.last_error = None
+        await self._record_finish(last_success_at=self.last_success_at, last_error=None)
+        return plan
+
+    async def _record_start(self):
+        """Count a run as in progress in the shared status row (best effort)."""
+        started_at = datetime.now()
+        table = BackgroundJobStatus
+        try:
+            async with SessionLocal() as db:
+                await db.execute(
+                    insert(table).values(name=STATUS_NAME, running=0)
+                    .on_conflict_do_nothing(index_elements=[table.name])
+                )
+                # Runs abandoned past the timeout are dropped from the count
+                abandoned = table.last_started_at < started_at - timedelta(seconds=self.timeout)
+                await db.execute(
+                    update(table).where(table.name == STATUS_NAME).values(
+                        running=case((abandoned, 1), else_=table.running + 1),
+                        last_started_at=started_at
+                    )
+                )
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"Failed to record weekly plan refresh start: {e}")
+
+    async def _record_finish(self, **values):
+        """Count a run as finished in the shared status row (best effort)."""
+        table = BackgroundJobStatus
+        try:
+            async with SessionLocal() as db:
+                await db.execute(
+                    update(table).where(table.name == STATUS_NAME).values(
+                        running=case((table.running > 0, table.running - 1), else_=0),
+                        last_finished_at=datetime.now(),
+                        **values
+                    )
+                )
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"Failed to record weekly plan refresh finish: {e}")
+
+    async def get_shared_status(self, db) -> Dict[str, Any]:
+        """
+        Get whether any worker is refreshing and how the last refresh ended.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Dict with "refreshing" and the last started/finished/success
+            times and error, across all workers
+        """
+        row = (await db.execute(
+            select(BackgroundJobStatus).where(BackgroundJobStatus.name == STATUS_NAME)
+        )).scalars().first()
+
+        if row is None:
+            return {
+                "refreshing": self.refreshing,
+                "last_started_at": None,
+                "last_finished_at": None,
+                "last_success_at": None,
+                "last_error": None
+            }
+
+        cutoff = datetime.now() - timedelta(seconds=self.timeout)
+        running = bool(row.running) and row.last_started_at is not None and row.last_started_at >= cutoff
+        return {
+            "refreshing": running or self.refreshing,
+            "last_started_at": row.last_started_at.isoformat() if row.last_started_at else None,
+            "last_finished_at": row.last_finished_at.isoformat() if row.last_finished_at else None,
+            "last_success_at": row.last_success_at.isoformat() if row.last_success_at else None,
+            "last_error": row.last_error
+        }
+
+    async def _run(self):
+        """Refresh at startup and then every interval until cancelled."""
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                pass  # recorded in last_error by _run_refresh
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Start the periodic refresh task."""
+        if not self.enabled or (self._task is not None and not self._task.done()):
+            return
+
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info(f"Weekly plan refresher started (every {self.interval}s)")
+
+    async def stop(self):
+        """Stop the periodic refresh task and any refresh in progress."""
+        for task in (self._task, self._refresh):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+        self._refresh = None
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get this worker's refresh state and counters; see get_shared_status for all workers."""
+        return {
+            "enabled": self.enabled,
+            "interval_seconds": self.interval,
+            "refreshing": self.refreshing,
+            **self.stats,
+            "last_started_at": self.last_started_at.isoformat() if self.last_started_at else None,
+            "last_finished_at": self.last_finished_at.isoformat() if self.last_finished_at else None,
+            "last_success_at": self.last_success_at.isoformat() if self.last_success_at else None,
+            "last_error": self.last_error
+        }
+
+
+# Singleton instance for use throughout the application
+week_plan_refresher = WeekPlanRefresher()
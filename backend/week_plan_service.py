@@ -1,18 +1,33 @@
+import base64
+import copy
+import hashlib
 import logging
+import os
+from dataclasses import dataclass, replace
 from datetime import datetime
 from typing import Dict, Any, Optional, List
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import JSON, Date, case, cast, column, desc, func, select, tuple_, update
 
 from canvas_client import canvas_client
+from canvas_scheduler import PRIORITY_SYNC, canvas_priority
 from ai_service import ai_service
 from models import WeeklyPlan
-from database import get_db
 from canvas_module_service import CanvasModuleService
+from memory_cache import LRUCache
+from preconversion_worker import preconversion_worker
+from stage_graph import StageGraph
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+@dataclass(frozen=True)
+class LatestPlan:
+    """Detached copy of the latest WeeklyPlan row, safe to share between requests."""
+    id: int
+    created_at: Optional[datetime]
+    processed_json: Dict[str, Any]
+
 class WeekPlanService:
     """
     Service for managing weekly plans - fetching, parsing, and storing.
@@ -24,7 +39,14 @@ class WeekPlanService:
         self.ai_service = ai_service
         self.canvas_module_service = CanvasModuleService(canvas_client)
         
-    async def get_latest_week_plan(self, db: Session, force_refresh: bool = False) -> Dict[str, Any]:
+        # In-process snapshot of the latest plan row, dropped whenever a plan is
+        # saved here; the TTL bounds staleness when another worker saves one
+        self._latest_plan = LRUCache(
+            max_entries=1,
+            ttl_seconds=float(os.getenv("WEEK_PLAN_LATEST_CACHE_TTL", "60"))
+        )
+        
+    async def get_latest_week_plan(self, db: AsyncSession, force_refresh: bool = False) -> Dict[str, Any]:
         """
         Get the latest weekly plan - either from database or by fetching/parsing new data.
         
@@ -41,21 +63,81 @@ class WeekPlanService:
         
         # Check database for existing plans first (unless force refresh)
         if not force_refresh:
-            logger.info("Checking database for latest weekly plan")
-            latest_plan = db.query(WeeklyPlan).order_by(desc(WeeklyPlan.created_at)).first()
+            latest_plan = await self.get_latest_plan_record(db)
             
             if latest_plan:
                 logger.info(f"Found existing weekly plan from {latest_plan.created_at}")
                 return latest_plan.processed_json
         
-        # Fetch and parse new data from Canvas
+        return await self.refresh_latest_week_plan(db)
+    
+    async def get_latest_plan_record(self, db: AsyncSession) -> Optional[LatestPlan]:
+        """
+        Get the most recently refreshed weekly plan.
+        
+        The pointer holds a snapshot rather than the ORM row, so it is not
+        tied to the session that loaded it, and each caller gets its own
+        copy of processed_json to modify.
+        
+        Args:
+            db: Database session
+            
+        Returns:
+            Snapshot of the latest WeeklyPlan, or None if no plan has been stored yet
+        """
+        latest_plan = self._latest_plan.get("latest")
+        
+        if latest_plan is None:
+            logger.info("Checking database for latest weekly plan")
+            result = await db.execute(
+                select(WeeklyPlan.id, WeeklyPlan.created_at, WeeklyPlan.processed_json)
+                .order_by(desc(WeeklyPlan.created_at))
+                .limit(1)
+            )
+            row = result.first()
+            if row is None:
+                return None
+            
+            latest_plan = LatestPlan(id=row.id, created_at=row.created_at, processed_json=row.processed_json)
+            self._latest_plan.set("latest", latest_plan)
+        
+        return replace(latest_plan, processed_json=copy.deepcopy(latest_plan.processed_json))
+    
+    def invalidate_latest_plan(self):
+        """Drop the in-process latest plan pointer so the next read reloads it."""
+        self._latest_plan.invalidate("latest")
+    
+    def get_latest_plan_cache_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters for the latest plan pointer."""
+        return self._latest_plan.get_stats()
+    
+    async def refresh_latest_week_plan(self, db: AsyncSession) -> Dict[str, Any]:
+        """
+        Fetch and parse the latest weekly plan from Canvas and store it.
+        
+        Args:
+            db: Database session
+            
+        Returns:
+            Latest weekly plan JSON object
+            
+        Raises:
+            Exception: If unable to fetch or parse weekly plan
+        """
         logger.info("Fetching new weekly plan from Canvas")
-        return await self._fetch_and_parse_latest_plan(db)
+        with canvas_priority(PRIORITY_SYNC):
+            return await self._fetch_and_parse_latest_plan(db)
     
-    async def _fetch_and_parse_latest_plan(self, db: Session) -> Dict[str, Any]:
+    async def _fetch_and_parse_latest_plan(self, db: AsyncSession) -> Dict[str, Any]:
         """
         Fetch the latest announcement from Canvas and parse it with AI.
         
+        The refresh runs as a stage graph: once the announcement is known to
+        have changed, the AI parse, course list fetch and assignments fetch
+        run concurrently, and module enhancement starts as soon as both the
+        parse and the course list are ready. Stage timings are saved with
+        the plan as refresh_metadata.
+        
         Args:
             db: Database session
             
@@ -67,96 +149,41 @@ class WeekPlanService:
         """
         
         try:
-            # Step 1: Fetch latest announcement from Canvas
-            logger.info("Fetching latest announcement from Canvas")
-            
-            # Use course ID 20564 as specified in the project brief
-            course_id = 20564
-            announcement = await self.canvas_client.get_latest_announcement(course_id)
+            graph = StageGraph()
             
-            if not announcement:
-                raise Exception("No announcements found in the specified course")
+            # Step 1: Fetch latest announcement from Canvas
+            graph.add_stage("announcement", self._fetch_announcement)
+            results = await graph.run()
+            announcement = results["announcement"]
             
-            # Extract HTML content
-            html_content = announcement.get('message', '')
-            if not html_content:
-                raise Exception("Announcement has no content")
+            # An unchanged announcement needs no re-parse or re-enhancement
+            announcement_fingerprint = self.get_announcement_fingerprint(announcement)
+            result = await db.execute(
+                select(WeeklyPlan)
+                .where(WeeklyPlan.announcement_fingerprint == announcement_fingerprint)
+                .order_by(desc(WeeklyPlan.created_at))
+                .limit(1)
+            )
+            unchanged_plan = result.scalars().first()
             
-            logger.info(f"Retrieved announcement: {announcement.get('title', 'Untitled')}")
-            logger.debug(f"HTML content length: {len(html_content)} characters")
+            if unchanged_plan:
+                logger.info(f"Announcement unchanged, reusing weekly plan with ID {unchanged_plan.id}")
+                return unchanged_plan.processed_json
             
-            # Step 2: Parse with AI
-            logger.info("Parsing announcement with AI service")
-            parsed_json = self.ai_service.parse_announcement_to_json(html_content)
+            # Steps 2-4: Parse with AI, enhance with Canvas URLs, fetch weekly assignments
+            graph.add_stage("parse", self._parse_announcement, depends_on=("announcement",))
+            graph.add_stage("courses", self._fetch_courses, depends_on=("announcement",))
+            graph.add_stage("assignments", self._fetch_assignments, depends_on=("announcement",))
+            graph.add_stage("enhance", self._enhance_classwork, depends_on=("parse", "courses"))
+            results = await graph.run(results)
             
-            # Step 3: Enhance with Canvas URLs
-            logger.info("Fetching Canvas URLs for lessons")
-            try:
-                classwork = parsed_json.get('classwork', [])
-                
-                if classwork:
-                    # Use the new enhanced Canvas data flow
-                    enhanced_classwork = await self.canvas_module_service.enhance_classwork_with_canvas_data(classwork)
-                    
-                    # Replace the classwork with enhanced version
-                    parsed_json['classwork'] = enhanced_classwork
-                    
-                    # Count successful URL mappings for logging
-                    total_lessons = 0
-                    successful_mappings = 0
-                    
-                    for subject_data in enhanced_classwork:
-                        lessons = subject_data.get('lessons', [])
-                        canvas_urls = subject_data.get('canvas_urls', {})
-                        total_lessons += len(lessons)
-                        
-                        for lesson in lessons:
-                            if lesson in canvas_urls and not canvas_urls[lesson].endswith('/modules'):
-                                successful_mappings += 1
-                    
-                    logger.info(f"Enhanced Canvas data: {successful_mappings}/{total_lessons} lessons with specific URLs")
-                else:
-                    logger.warning("No classwork found in parsed data")
-                    
-            except Exception as e:
-                logger.error(f"Failed to fetch Canvas URLs: {e}")
-                # Continue without Canvas URLs - frontend will use fallbacks
+            parsed_json = results["parse"]
+            if results["enhance"] is not None:
+                parsed_json['classwork'] = results["enhance"]
+            parsed_json.update(results["assignments"])
             
-            # Step 4: Fetch weekly assignments
-            logger.info("Fetching weekly assignments")
-            try:
-                # Calculate current week's Monday to Sunday
-                now = datetime.now()
-                # Find Monday of current week (weekday 0=Monday, 6=Sunday)
-                days_since_monday = now.weekday()
-                monday = now - timedelta(days=days_since_monday)
-                sunday = monday + timedelta(days=6)
-                
-                start_date = monday.strftime('%Y-%m-%d')
-                end_date = sunday.strftime('%Y-%m-%d')
-                
-                # Use the new upcoming events API to get assignments
-                assignments = await self.canvas_client.get_upcoming_events(start_date, end_date)
-                
-                # Add assignments to the parsed data
-                parsed_json['assignments'] = assignments
-                parsed_json['assignment_period'] = {
-                    'start_date': start_date,
-                    'end_date': end_date,
-                    'total_assignments': len(assignments)
-                }
-                
-                logger.info(f"Added {len(assignments)} assignments for week {start_date} to {end_date}")
-                
-            except Exception as e:
-                logger.error(f"Failed to fetch weekly assignments: {e}")
-                # Continue without assignments
-                parsed_json['assignments'] = []
-                parsed_json['assignment_period'] = {
-                    'start_date': '',
-                    'end_date': '',
-                    'total_assignments': 0
-                }
+            refresh_metadata = graph.get_metadata()
+            logger.info(f"Weekly plan refresh stages: {refresh_metadata}")
             
             # Step 5: Save to database
             logger.info("Saving parsed plan to database")
@@ -175,13 +202,16 @@ class WeekPlanService:
                 week_starting = datetime.now()
             
             # Check if a plan already exists for this week
-            existing_plan = db.query(WeeklyPlan).filter(
-                WeeklyPlan.week_starting == week_starting.date()
-            ).first()
+            result = await db.execute(
+                select(WeeklyPlan).where(WeeklyPlan.week_start == week_starting.date())
+            )
+            existing_plan = result.scalars().first()
             
             if existing_plan:
                 # Update existing plan
                 existing_plan.processed_json = parsed_json
+                existing_plan.announcement_fingerprint = announcement_fingerprint
+                existing_plan.refresh_metadata = refresh_metadata
                 existing_plan.created_at = datetime.now()
                 weekly_plan = existing_plan
                 logger.info(f"Updated existing weekly plan with ID {weekly_plan.id}")
@@ -190,30 +220,165 @@ class WeekPlanService:
                 weekly_plan = WeeklyPlan(
                     week_starting=week_starting,
                     processed_json=parsed_json,
+                    announcement_fingerprint=announcement_fingerprint,
+                    refresh_metadata=refresh_metadata,
                     created_at=datetime.now()
                 )
                 db.add(weekly_plan)
                 logger.info("Created new weekly plan")
             
-            db.commit()
-            db.refresh(weekly_plan)
+            await db.commit()
+            await db.refresh(weekly_plan)
+            self.invalidate_latest_plan()
             
             logger.info(f"Successfully saved weekly plan with ID {weekly_plan.id}")
             
+            # Step 6: Convert this week's lesson pages in the background
+            preconversion_worker.enqueue_week_plan(parsed_json)
+            
             return parsed_json
             
         except Exception as e:
             logger.error(f"Failed to fetch and parse weekly plan: {e}")
-            db.rollback()
+            await db.rollback()
             raise Exception(f"Unable to process weekly plan: {e}")
     
-    async def get_week_plan_by_date(self, db: Session, week_starting: datetime) -> Optional[Dict[str, Any]]:
+    async def _fetch_announcement(self, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Refresh stage: fetch the latest weekly plan announcement."""
+        logger.info("Fetching latest announcement from Canvas")
+        
+        # Use course ID 20564 as specified in the project brief
+        course_id = 20564
+        announcement = await self.canvas_client.get_latest_announcement(course_id)
+        
+        if not announcement:
+            raise Exception("No announcements found in the specified course")
+        
+        # Extract HTML content
+        html_content = announcement.get('message', '')
+        if not html_content:
+            raise Exception("Announcement has no content")
+        
+        logger.info(f"Retrieved announcement: {announcement.get('title', 'Untitled')}")
+        logger.debug(f"HTML content length: {len(html_content)} characters")
+        
+        return announcement
+    
+    async def _parse_announcement(self, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Refresh stage: parse the announcement into a weekly plan with AI."""
+        logger.info("Parsing announcement with AI service")
+        return await self.ai_service.parse_announcement_to_json(results["announcement"].get('message', ''))
+    
+    async def _fetch_courses(self, results: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """Refresh stage: fetch the course list used to match subjects to courses."""
+        try:
+            return await self.canvas_client.get_courses()
+        except Exception as e:
+            # Enhancement falls back to its own course fetch
+            logger.error(f"Failed to fetch courses: {e}")
+            return None
+    
+    async def _enhance_classwork(self, results: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """Refresh stage: enhance the parsed classwork with Canvas URLs."""
+        logger.info("Fetching Canvas URLs for lessons")
+        try:
+            classwork = results["parse"].get('classwork', [])
+            
+            if not classwork:
+                logger.warning("No classwork found in parsed data")
+                return None
+            
+            # Use the new enhanced Canvas data flow
+            enhanced_classwork = await self.canvas_module_service.enhance_classwork_with_canvas_data(
+                classwork, courses=results["courses"]
+            )
+            
+            # Count successful URL mappings for logging
+            total_lessons = 0
+            successful_mappings = 0
+            
+            for subject_data in enhanced_classwork:
+                lessons = subject_data.get('lessons', [])
+                canvas_urls = subject_data.get('canvas_urls', {})
+                total_lessons += len(lessons)
+                
+                for lesson in lessons:
+                    if lesson in canvas_urls and not canvas_urls[lesson].endswith('/modules'):
+                        successful_mappings += 1
+            
+            logger.info(f"Enhanced Canvas data: {successful_mappings}/{total_lessons} lessons with specific URLs")
+            return enhanced_classwork
+            
+        except Exception as e:
+            logger.error(f"Failed to fetch Canvas URLs: {e}")
+            # Continue without Canvas URLs - frontend will use fallbacks
+            return None
+    
+    async def _fetch_assignments(self, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Refresh stage: fetch this week's assignments (independent of the parse)."""
+        logger.info("Fetching weekly assignments")
+        try:
+            # Calculate current week's Monday to Sunday
+            now = datetime.now()
+            # Find Monday of current week (weekday 0=Monday, 6=Sunday)
+            days_since_monday = now.weekday()
+            monday = now - timedelta(days=days_since_monday)
+            sunday = monday + timedelta(days=6)
+            
+            start_date = monday.strftime('%Y-%m-%d')
+            end_date = sunday.strftime('%Y-%m-%d')
+            
+            # Use the new upcoming events API to get assignments
+            assignments = await self.canvas_client.get_upcoming_events(start_date, end_date)
+            
+            logger.info(f"Added {len(assignments)} assignments for week {start_date} to {end_date}")
+            return {
+                'assignments': assignments,
+                'assignment_period': {
+                    'start_date': start_date,
+                    'end_date': end_date,
+                    'total_assignments': len(assignments)
+                }
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to fetch weekly assignments: {e}")
+            # Continue without assignments
+            return {
+                'assignments': [],
+                'assignment_period': {
+                    'start_date': '',
+                    'end_date': '',
+                    'total_assignments': 0
+                }
+            }
+    
+    @staticmethod
+    def get_announcement_fingerprint(announcement: Dict[str, Any]) -> str:
+        """
+        Fingerprint an announcement by its id, posted_at and body.
+        
+        Args:
+            announcement: Canvas announcement object
+            
+        Returns:
+            SHA-256 hex digest identifying this version of the announcement
+        """
+        body_hash = hashlib.sha256((announcement.get('message') or '').encode('utf-8')).hexdigest()
+        key = f"{announcement.get('id')}|{announcement.get('posted_at')}|{body_hash}"
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+    
+    async def get_week_plan_by_date(self, db: AsyncSession, week_starting: datetime) -> Optional[Dict[str, Any]]:
         """
-        Get a specific weekly plan by its starting date.
+        Get the weekly plan covering a date.
+        
+        Looks up the week_start index for the most recent plan starting on
+        or up to six days before the given date, so any day of the week
+        (and any time of day) finds its plan.
         
         Args:
             db: Database session
-            week_starting: The starting date of the week
+            week_starting: The starting date of the week, or any date within it
             
         Returns:
             Weekly plan JSON object if found, None otherwise
@@ -221,9 +386,14 @@ class WeekPlanService:
         
         logger.info(f"Looking for weekly plan for week starting {week_starting}")
         
-        plan = db.query(WeeklyPlan).filter(
-            WeeklyPlan.week_starting == week_starting
-        ).first()
+        day = week_starting.date() if isinstance(week_starting, datetime) else week_starting
+        result = await db.execute(
+            select(WeeklyPlan)
+            .where(WeeklyPlan.week_start <= day, WeeklyPlan.week_start > day - timedelta(days=7))
+            .order_by(desc(WeeklyPlan.week_start), desc(WeeklyPlan.created_at))
+            .limit(1)
+        )
+        plan = result.scalars().first()
         
         if plan:
             logger.info(f"Found weekly plan for {week_starting}")
@@ -232,7 +402,32 @@ class WeekPlanService:
         logger.info(f"No weekly plan found for {week_starting}")
         return None
     
-    async def get_all_week_plans(self, db: Session, limit: int = 10) -> List[Dict[str, Any]]:
+    async def backfill_week_starts(self, db: AsyncSession) -> int:
+        """
+        Fill week_start for plans stored before the column existed.
+        
+        Args:
+            db: Database session
+            
+        Returns:
+            Number of plans updated
+        """
+        # SQLite has no DATE type to cast to, but its date() gives the same ISO date
+        if db.bind.dialect.name == "sqlite":
+            week_start = func.date(WeeklyPlan.week_starting)
+        else:
+            week_start = cast(WeeklyPlan.week_starting, Date)
+        
+        result = await db.execute(
+            update(WeeklyPlan).where(WeeklyPlan.week_start.is_(None)).values(week_start=week_start)
+        )
+        await db.commit()
+        
+        if result.rowcount:
+            logger.info(f"Backfilled week_start for {result.rowcount} weekly plans")
+        return result.rowcount
+    
+    async def get_all_week_plans(self, db: AsyncSession, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Get all weekly plans, ordered by most recent first.
         
@@ -246,9 +441,10 @@ class WeekPlanService:
         
         logger.info(f"Fetching up to {limit} weekly plans")
         
-        plans = db.query(WeeklyPlan).order_by(
-            desc(WeeklyPlan.created_at)
-        ).limit(limit).all()
+        query_result = await db.execute(
+            select(WeeklyPlan).order_by(desc(WeeklyPlan.created_at)).limit(limit)
+        )
+        plans = query_result.scalars().all()
         
         result = []
         for plan in plans:
@@ -260,7 +456,109 @@ class WeekPlanService:
         logger.info(f"Found {len(result)} weekly plans")
         return result
     
-    def test_integration(self, db: Session) -> Dict[str, Any]:
+    async def get_week_plan_summaries(self, db: AsyncSession, limit: int = 10,
+                                      cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        List weekly plan summaries, newest week first, one page at a time.
+        
+        Title, subject and lesson counts are extracted from processed_json in
+        SQL, so the plan blobs are never loaded. Pages are keyed on
+        (week_starting, id) rather than offsets, so each page is an index
+        range scan however many plans have accumulated.
+        
+        Args:
+            db: Database session
+            limit: Maximum number of summaries to return
+            cursor: next_cursor from the previous page, or None for the first page
+            
+        Returns:
+            Dict with "plans" (summary dicts) and "next_cursor" (None on the last page)
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        
+        logger.info(f"Fetching up to {limit} weekly plan summaries (cursor: {cursor})")
+        
+        classwork = WeeklyPlan.processed_json["classwork"]
+        
+        # Postgres and SQLite name their JSON functions differently
+        if db.bind.dialect.name == "postgresql":
+            expand, json_type = func.json_array_elements, func.json_typeof
+        else:
+            expand, json_type = func.json_each, func.json_type
+        
+        # processed_json is LLM output, so anything counted may not be an array;
+        # counting it as empty keeps one malformed plan from failing the page
+        def array_length(value):
+            return case((json_type(value) == "array", func.json_array_length(value)), else_=0)
+        
+        subjects = expand(classwork).table_valued(column("value", JSON)).alias("subjects")
+        lesson_count = case(
+            (
+                json_type(classwork) == "array",
+                select(func.coalesce(func.sum(array_length(subjects.c.value["lessons"])), 0))
+                .select_from(subjects)
+                .scalar_subquery()
+            ),
+            else_=0
+        )
+        
+        query = select(
+            WeeklyPlan.id,
+            WeeklyPlan.week_starting,
+            WeeklyPlan.created_at,
+            WeeklyPlan.processed_json["week_starting"].as_string().label("plan_week_starting"),
+            WeeklyPlan.processed_json["title"].as_string().label("title"),
+            array_length(classwork).label("subject_count"),
+            lesson_count.label("lesson_count")
+        )
+        
+        if cursor:
+            week_starting, plan_id = self._decode_cursor(cursor)
+            query = query.where(tuple_(WeeklyPlan.week_starting, WeeklyPlan.id) < tuple_(week_starting, plan_id))
+        
+        # One extra row tells whether another page follows
+        result = await db.execute(
+            query.order_by(desc(WeeklyPlan.week_starting), desc(WeeklyPlan.id)).limit(limit + 1)
+        )
+        rows = result.all()
+        
+        plans = [
+            {
+                'id': row.id,
+                'week_starting': row.plan_week_starting or row.week_starting.date().isoformat(),
+                'title': row.title,
+                'subject_count': row.subject_count,
+                'lesson_count': row.lesson_count,
+                'created_at': row.created_at.isoformat() if row.created_at else None
+            }
+            for row in rows[:limit]
+        ]
+        
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = self._encode_cursor(last.week_starting, last.id)
+        
+        logger.info(f"Found {len(plans)} weekly plan summaries")
+        return {"plans": plans, "next_cursor": next_cursor}
+    
+    @staticmethod
+    def _encode_cursor(week_starting: datetime, plan_id: int) -> str:
+        """Encode a (week_starting, id) keyset position as an opaque cursor."""
+        return base64.urlsafe_b64encode(f"{week_starting.isoformat()}|{plan_id}".encode('utf-8')).decode('ascii')
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple:
+        """Decode a cursor from _encode_cursor back to (week_starting, id)."""
+        try:
+            week_starting, plan_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|')
+            return datetime.fromisoformat(week_starting), int(plan_id)
+        except Exception:
+            raise ValueError(f"Invalid cursor: {cursor}")
+    
+    async def test_integration(self, db: AsyncSession) -> Dict[str, Any]:
         """
         Test the complete integration - Canvas API + AI parsing + Database.
         
@@ -286,14 +584,16 @@ class WeekPlanService:
             
             # Test AI service
             logger.info("Testing AI service connection")
-            ai_test = self.ai_service.test_connection()
+            ai_test = await self.ai_service.test_connection()
             test_result["ai_service"] = "success" if ai_test["status"] == "success" else "failed"
             
             # Test database
             logger.info("Testing database connection")
             try:
                 # Simple database query
-                count = db.query(WeeklyPlan).count()
+                count = (await db.execute(
+                    select(func.count()).select_from(WeeklyPlan)
+                )).scalar_one()
                 test_result["database"] = "success"
                 test_result["db_plan_count"] = count
             except Exception as e:
@@ -156,66 +156,75 @@ const KanbanBoard = () => {
     try {
       console.log('🎯 Starting targeted completion status sync...');
       
+      // Collect every lesson card that has Canvas course data and a canvas link
+      const statusRequests = [];
+      for (const [columnId, cards] of Object.entries(boardData)) {
+        if (!cards || cards.length === 0) continue;
+        
+        cards.forEach((card, index) => {
+          if (card.type === 'lesson' && card.courseId && card.moduleId && card.canvasLink) {
+            // Extract module_item_id from Canvas URL
+            // URL format: https://learning.acc.edu.au/courses/{course_id}/modules/items/{module_item_id}
+            const urlMatch = card.canvasLink.match(/\/modules\/items\/(\d+)/);
+            
+            if (urlMatch && urlMatch[1]) {
+              statusRequests.push({
+                columnId,
+                index,
+                course_id: card.courseId,
+                module_id: card.moduleId,
+                module_item_id: parseInt(urlMatch[1])
+              });
+            } else {
+              console.debug(`Could not extract module item ID from URL: ${card.canvasLink}`);
+            }
+          }
+        });
+      }
+      
+      if (statusRequests.length === 0) {
+        console.log('✅ Completion status sync complete - no Canvas lessons to check');
+        return;
+      }
+      
+      // One batch call for the whole board instead of one request per card
+      const response = await api.post('/api/v1/canvas/lesson-status/batch',
+        statusRequests.map(({ course_id, module_id, module_item_id }) => ({ course_id, module_id, module_item_id }))
+      );
+      const results = response.data.results || [];
+      
       let updatedCards = false;
       let syncedCount = 0;
       const newBoardData = { ...boardData };
       
-      // Iterate through all columns and cards to find lessons with Canvas data
-      for (const [columnId, cards] of Object.entries(boardData)) {
-        if (!cards || cards.length === 0) continue;
+      statusRequests.forEach((request, position) => {
+        const result = results[position];
+        const card = boardData[request.columnId][request.index];
         
-        const updatedColumnCards = [...cards];
+        if (!result || !result.success) {
+          console.debug(`Failed to get Canvas status for ${card.subject} Lesson ${card.lesson}: ${result?.error}`);
+          return;
+        }
+        
+        const newStatus = result.completed ? 'done' : 'todo';
         
-        for (let i = 0; i < cards.length; i++) {
-          const card = cards[i];
+        // Only update if status actually changed
+        if (card.status !== newStatus) {
+          console.log(`✅ Status change: ${card.subject} Lesson ${card.lesson}: ${card.status} → ${newStatus}`);
           
-          // Only sync lesson cards that have Canvas course data and canvas links
-          if (card.type === 'lesson' && card.courseId && card.moduleId && card.canvasLink) {
-            try {
-              // Extract module_item_id from Canvas URL
-              // URL format: https://learning.acc.edu.au/courses/{course_id}/modules/items/{module_item_id}
-              const urlMatch = card.canvasLink.match(/\/modules\/items\/(\d+)/);
-              
-              if (urlMatch && urlMatch[1]) {
-                const moduleItemId = parseInt(urlMatch[1]);
-                const moduleId = card.moduleId;
-                
-                // Make targeted API call with correct format: course_id/module_id/module_item_id
-                const response = await api.get(`/api/v1/canvas/lesson-status/${card.courseId}/${moduleId}/${moduleItemId}`);
-                
-                if (response.data.success) {
-                  const canvasCompleted = response.data.completed || false;
-                  const currentStatus = card.status;
-                  const newStatus = canvasCompleted ? 'done' : 'todo';
-                  
-                  // Only update if status actually changed
-                  if (currentStatus !== newStatus) {
-                    console.log(`✅ Status change: ${card.subject} Lesson ${card.lesson}: ${currentStatus} → ${newStatus}`);
-                    
-                    updatedColumnCards[i] = {
-                      ...card,
-                      status: newStatus
-                    };
-                    
-                    updatedCards = true;
-                  }
-                  
-                  syncedCount++;
-                } else {
-                  console.debug(`Failed to get Canvas status for ${card.subject} Lesson ${card.lesson}: ${response.data.error}`);
-                }
-              } else {
-                console.debug(`Could not extract module item ID from URL: ${card.canvasLink}`);
-              }
-            } catch (error) {
-              // Silently ignore errors for individual lessons to avoid spam
-              console.debug(`Failed to sync status for ${card.subject} Lesson ${card.lesson}:`, error.message);
-            }
+          if (newBoardData[request.columnId] === boardData[request.columnId]) {
+            newBoardData[request.columnId] = [...boardData[request.columnId]];
           }
+          newBoardData[request.columnId][request.index] = {
+            ...card,
+            status: newStatus
+          };
+          
+          updatedCards = true;
         }
         
-        newBoardData[columnId] = updatedColumnCards;
-      }
+        syncedCount++;
+      });
       
       // Only update state if we actually found changes
       if (updatedCards) {
@@ -302,6 +311,12 @@ const KanbanBoard = () => {
       const planData = response.data.data;
       setWeekPlan(planData);
       
+      // Refreshes run in the background; pick up the new plan once it lands
+      if (forceRefresh && response.data.refresh_in_progress) {
+        showNotification('Checking Canvas for updates...', 'info');
+        waitForPlanRefresh(response.data.plan_updated_at, sessionId);
+      }
+      
       // Check if we have saved board state
       if (response.data.saved_board_state && sessionId) {
         console.log('Loading saved board state');
@@ -373,6 +388,30 @@ const KanbanBoard = () => {
     }
   };
 
+  const waitForPlanRefresh = async (planUpdatedAt, sessionId, attempt = 0) => {
+    try {
+      const response = await api.get('/api/v1/week-plan/refresh/status');
+      
+      if (response.data.refreshing) {
+        if (attempt < 60) {
+          setTimeout(() => waitForPlanRefresh(planUpdatedAt, sessionId, attempt + 1), 3000);
+        }
+        return;
+      }
+      
+      if (response.data.last_error) {
+        showNotification('Could not refresh from Canvas - showing saved plan', 'warning');
+      } else if (response.data.plan_updated_at !== planUpdatedAt) {
+        await fetchWeekPlan(false, sessionId);
+        showNotification('Weekly plan updated from Canvas', 'success');
+      } else {
+        showNotification('Weekly plan is up to date', 'success');
+      }
+    } catch (err) {
+      console.error('Failed to check weekly plan refresh status:', err);
+    }
+  };
+
   // Helper function to assign cards to weekdays based on their days array
   const assignCardToDay = (days) => {
     if (!days || days.length === 0) return 'monday'; // Default to Monday if no days specified
@@ -439,6 +439,67 @@ const LessonViewer = ({
     }
   }, [open, lessonId, courseId, moduleItemId, demoLessonNumber, pageSlug, isAiConverted]);
 
+  // Read the NDJSON component stream, updating the view as each event arrives
+  const streamAiConvertedContent = async (onStart) => {
+    const response = await fetch(
+      `${api.defaults.baseURL}/api/v1/courses/${courseId}/pages/${pageSlug}/stream`
+    );
+    
+    if (!response.ok || !response.body) {
+      throw new Error(`Streaming request failed: ${response.status}`);
+    }
+    
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    
+    const handleEvent = (event) => {
+      if (event.event === 'page') {
+        onStart();
+        setAiConvertedContent({
+          title: event.title,
+          page_id: event.page_id,
+          updated_at: event.updated_at,
+          url: event.url,
+          course_id: event.course_id,
+          components: [],
+          processed: true,
+          cached: false,
+          processing_info: { status: 'streaming', components_count: 0 }
+        });
+        setLoading(false);
+      } else if (event.event === 'component') {
+        setAiConvertedContent((current) => current && {
+          ...current,
+          components: [...current.components, event.component],
+          processing_info: { ...current.processing_info, components_count: current.components.length + 1 }
+        });
+      } else if (event.event === 'done') {
+        setAiConvertedContent((current) => current && {
+          ...current,
+          cached: event.cached ?? current.cached,
+          processing_info: event.processing_info
+        });
+      } else if (event.event === 'error') {
+        throw new Error(event.message);
+      }
+    };
+    
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      
+      buffer += decoder.decode(value, { stream: true });
+      const lines = buffer.split('\n');
+      buffer = lines.pop();
+      lines.filter((line) => line.trim()).forEach((line) => handleEvent(JSON.parse(line)));
+    }
+    
+    if (buffer.trim()) {
+      handleEvent(JSON.parse(buffer));
+    }
+  };
+
   const fetchLessonContent = async () => {
     try {
       setLoading(true);
@@ -449,11 +510,25 @@ const LessonViewer = ({
       // Phase 1.4: Handle AI-converted lessons
       if (isAiConverted && courseId && pageSlug) {
         console.log('🤖 Fetching AI-converted lesson content:', { courseId, pageSlug });
+        setCompleted(false); // Reset completion status for new content
+        
+        // Render components as they stream in; fall back to the regular
+        // endpoint if streaming is unavailable before anything arrives
+        let streamStarted = false;
+        try {
+          await streamAiConvertedContent(() => { streamStarted = true; });
+          return;
+        } catch (streamError) {
+          if (streamStarted) {
+            throw streamError;
+          }
+          console.warn('Streaming unavailable, fetching full content:', streamError);
+        }
+        
         response = await api.get(`/api/v1/courses/${courseId}/pages/${pageSlug}`);
         
         if (response?.data?.components) {
           setAiConvertedContent(response.data);
-          setCompleted(false); // Reset completion status for new content
           return;
         } else {
           throw new Error('Invalid AI-converted content structure');